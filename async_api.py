@@ -0,0 +1,220 @@
+"""
+asyncio node runtime serving the same routes as `api.py`.
+
+Handlers never block the event loop: chain, pool and disk work runs in worker
+threads through `asyncio.to_thread`, and peer broadcasts are background tasks
+owned by NodeService. Run with `python async_api.py`.
+"""
+import asyncio
+import json
+import os
+
+from aiohttp import web
+
+from blockchain.encoding import BLOCK_CONTENT_TYPE
+from network.service import create_node_service
+
+port = int(os.getenv("PORT", 5000))
+routes = web.RouteTableDef()
+
+
+def reply(result):
+    body, status = result
+    return web.json_response(body, status=status)
+
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class StreamReaderAdapter:
+    """
+    Blocking `read(size)` over an aiohttp request body, for parsers running in a worker thread.
+    """
+
+    def __init__(self, content, loop):
+        self.content = content
+        self.loop = loop
+
+    def read(self, size=-1):
+        return asyncio.run_coroutine_threadsafe(self.content.read(size), self.loop).result()
+
+
+@routes.post("/add_transaction")
+async def add_transaction(request):
+    data = await read_json(request)
+    return reply(await asyncio.to_thread(request.app["service"].add_transaction, data))
+
+
+@routes.post("/add_transactions")
+async def add_transactions(request):
+    stream = StreamReaderAdapter(request.content, asyncio.get_running_loop())
+    return reply(await asyncio.to_thread(request.app["service"].add_transactions, stream))
+
+
+@routes.get("/transaction_pool")
+async def get_transaction_pool(request):
+    return reply(await asyncio.to_thread(request.app["service"].transaction_pool))
+
+
+@routes.get("/peers")
+async def get_peers(request):
+    return reply(request.app["service"].peers())
+
+
+@routes.get("/network_stats")
+async def get_network_stats(request):
+    return reply(request.app["service"].network_stats())
+
+
+@routes.get("/signature_stats")
+async def get_signature_stats(request):
+    return reply(request.app["service"].signature_stats())
+
+
+@routes.get("/round_stats")
+async def get_round_stats(request):
+    return reply(request.app["service"].round_stats())
+
+
+@routes.get("/blockchain")
+async def get_blockchain(request):
+    chain = request.app["service"].blockchain.chain
+    response = web.StreamResponse(headers={"Content-Type": "application/json"})
+    await response.prepare(request)
+    await response.write(b"[")
+    for height in range(len(chain)):
+        block = await asyncio.to_thread(chain.__getitem__, height)
+        await response.write((("," if height else "") + json.dumps(block.to_dict())).encode())
+    await response.write(b"]")
+    await response.write_eof()
+    return response
+
+
+def block_response(request, block):
+    if block is None:
+        return web.json_response({"error": "Block not found"}, status=404)
+    accept = request.headers.get("Accept", "")
+    if BLOCK_CONTENT_TYPE in accept and "application/json" not in accept:
+        return web.Response(body=block.to_bytes(), content_type=BLOCK_CONTENT_TYPE)
+    return web.json_response(block.to_dict())
+
+
+@routes.get("/block/{block_hash}")
+async def get_block_by_hash(request):
+    blockchain = request.app["service"].blockchain
+    block = await asyncio.to_thread(blockchain.get_block_by_hash, request.match_info["block_hash"])
+    return block_response(request, block)
+
+
+@routes.get("/block/height/{height:\\d+}")
+async def get_block_by_height(request):
+    blockchain = request.app["service"].blockchain
+    block = await asyncio.to_thread(blockchain.get_block_by_height, int(request.match_info["height"]))
+    return block_response(request, block)
+
+
+@routes.get("/block/{block_hash}/proof/{transaction_id}")
+async def get_transaction_proof(request):
+    service = request.app["service"]
+    return reply(await asyncio.to_thread(
+        service.transaction_proof, request.match_info["block_hash"], request.match_info["transaction_id"]
+    ))
+
+
+@routes.get("/get_leader")
+async def get_leader(request):
+    return reply(request.app["service"].get_leader())
+
+
+@routes.post("/set_leader")
+async def set_leader(request):
+    return reply(request.app["service"].set_leader(await read_json(request)))
+
+
+@routes.post("/elect_leader")
+async def elect_leader(request):
+    return reply(request.app["service"].elect_leader(await read_json(request)))
+
+
+@routes.post("/receive_entropy")
+async def receive_entropy(request):
+    data = await read_json(request)
+    return reply(await asyncio.to_thread(request.app["service"].receive_entropy, data))
+
+
+@routes.post("/send_entropy")
+async def send_entropy(request):
+    return reply(await asyncio.to_thread(request.app["service"].send_entropy))
+
+
+@routes.post("/receive_aggregate_entropy")
+async def receive_aggregate_entropy(request):
+    data = await read_json(request) or {}
+    return reply(request.app["service"].receive_aggregate_entropy(data))
+
+
+@routes.post("/aggregate_entropy")
+async def aggregate_entropy(request):
+    return reply(await asyncio.to_thread(request.app["service"].aggregate_entropy))
+
+
+@routes.post("/propose_block")
+async def propose_block(request):
+    return reply(await asyncio.to_thread(request.app["service"].propose_block))
+
+
+@routes.post("/receive_proposed_block")
+async def receive_proposed_block(request):
+    body = await request.read()
+    return reply(await asyncio.to_thread(request.app["service"].receive_proposed_block, request.content_type, body))
+
+
+@routes.post("/receive_compact_block")
+async def receive_compact_block(request):
+    body = await request.read()
+    return reply(await asyncio.to_thread(request.app["service"].receive_compact_block, request.content_type, body))
+
+
+@routes.post("/block_transactions")
+async def get_block_transactions(request):
+    return reply(request.app["service"].block_transactions(await read_json(request)))
+
+
+@routes.post("/validate_block")
+async def validate_block(request):
+    data = await read_json(request) or {}
+    return reply(await asyncio.to_thread(request.app["service"].validate_block, data))
+
+
+@routes.post("/blockchain_update")
+async def blockchain_update(request):
+    body = await request.read()
+    return reply(await asyncio.to_thread(request.app["service"].blockchain_update, request.content_type, body))
+
+
+async def shutdown(app):
+    service = app["service"]
+    if service.scheduler:
+        await asyncio.to_thread(service.scheduler.stop)
+    if service.gossip:
+        await asyncio.to_thread(service.gossip.stop)
+    service.background.shutdown(wait=False)
+    await asyncio.to_thread(service.blockchain.reputation.close)  # Fold the reputation log into its snapshot
+
+
+def create_app(service=None):
+    app = web.Application()
+    app["service"] = service or create_node_service()
+    app.add_routes(routes)
+    app.on_shutdown.append(shutdown)
+    return app
+
+
+if __name__ == "__main__":
+    app = create_app()
+    print(f"Starting asyncio node on port {port} for node {app['service'].node.node_id}")
+    web.run_app(app, host="0.0.0.0", port=port)
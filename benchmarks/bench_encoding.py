@@ -0,0 +1,71 @@
+"""
+Compare block hashing through the canonical binary encoding (Merkle root plus
+header hash) with the old string-repr path, and binary transfer encoding with JSON.
+
+Usage: python -m benchmarks.bench_encoding [sizes...]
+"""
+import hashlib
+import json
+import sys
+import time
+
+from blockchain.block import Block
+from blockchain.encoding import decode_block_dict
+
+DEFAULT_SIZES = (10, 1_000, 100_000)
+
+
+def make_transactions(count):
+    return [
+        {
+            "id": f"tx-{i:08d}",
+            "sender": f"sender-{i % 97}",
+            "receiver": f"receiver-{i % 89}",
+            "amount": i % 1000 + 1,
+            "data": "payload",
+            "timestamp": 1732594647.500145 + i / 1e6,
+        }
+        for i in range(count)
+    ]
+
+
+def repr_hash(block):
+    # The pre-encoding Block.compute_hash implementation.
+    block_data = f"{block.index}{block.previous_hash}{block.transactions}{block.entropy}{block.timestamp}"
+    return hashlib.sha256(block_data.encode()).hexdigest()
+
+
+def measure(func, min_time=0.5):
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        func()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs
+
+
+def main(sizes):
+    print(
+        f"{'txs':>8} {'repr hash':>12} {'merkle root':>12} {'header hash':>12} "
+        f"{'json enc+dec':>13} {'binary enc+dec':>15} {'json bytes':>11} {'binary bytes':>13}"
+    )
+    for size in sizes:
+        block = Block(index=1, previous_hash="0" * 64, transactions=make_transactions(size), entropy="0.123456")
+
+        repr_time = measure(lambda: repr_hash(block))
+        merkle_time = measure(block.compute_merkle_root)
+        header_time = measure(block.compute_hash)
+        json_time = measure(lambda: json.loads(json.dumps(block.to_dict())))
+        binary_codec_time = measure(lambda: decode_block_dict(block.to_bytes()))
+
+        print(
+            f"{size:>8} {repr_time * 1e3:>10.3f}ms {merkle_time * 1e3:>10.3f}ms {header_time * 1e3:>10.4f}ms "
+            f"{json_time * 1e3:>11.3f}ms {binary_codec_time * 1e3:>13.3f}ms "
+            f"{len(json.dumps(block.to_dict())):>11} {len(block.to_bytes()):>13}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,67 @@
+"""
+Entropy fusion + leader election: the per-node SHA-256 loops that
+Blockchain.elect_new_leader used versus EntropyTable and the sorted ElectionRound.
+
+Usage: python -m benchmarks.bench_entropy [validator_counts...]
+"""
+import random
+import sys
+import time
+
+from blockchain import entropy_table
+from blockchain.consensus import entropy_to_numeric, weighted_average_fusion, weighted_minkowski_distance
+from blockchain.election import ElectionRound
+from blockchain.entropy_table import EntropyTable
+
+DEFAULT_COUNTS = (10, 100, 1_000, 10_000, 100_000)
+
+
+def reference_round(entropies):
+    aggregated = f"{weighted_average_fusion(entropies):.6f}"
+    closest_node, closest_proximity = None, float("inf")
+    for node_id, entropy in entropies.items():
+        proximity = weighted_minkowski_distance(entropy_to_numeric(entropy), entropy_to_numeric(aggregated))
+        if proximity < closest_proximity:
+            closest_node, closest_proximity = node_id, proximity
+    return closest_node
+
+
+def table_round(entropies):
+    table = EntropyTable(entropies)
+    return elect(table)
+
+
+def elect(table):
+    # Round work once entropies were hashed on arrival (as /receive_entropy does).
+    aggregated = f"{table.fuse():.6f}"
+    return ElectionRound.from_table(table).closest(entropy_to_numeric(aggregated))[0]
+
+
+def best_of(func, argument, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(argument)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(counts):
+    backend = "numpy" if entropy_table.np is not None else "pure Python (numpy not installed)"
+    print(f"EntropyTable backend: {backend}")
+    print(f"{'validators':>10} {'reference':>12} {'table+build':>12} {'table':>12} {'speedup':>8}")
+    rng = random.Random(42)
+    for count in counts:
+        entropies = {f"node{i}": f"{rng.uniform(-1.5, 1.5):.6f}_{rng.uniform(-0.5, 0.5):.6f}" for i in range(count)}
+        reference_time, reference_leader = best_of(reference_round, entropies)
+        build_time, table_leader = best_of(table_round, entropies)
+        elect_time, _ = best_of(elect, EntropyTable(entropies))
+        assert reference_leader == table_leader
+        print(
+            f"{count:>10} {reference_time * 1e3:>10.2f}ms {build_time * 1e3:>10.2f}ms "
+            f"{elect_time * 1e3:>10.3f}ms {reference_time / elect_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_COUNTS)
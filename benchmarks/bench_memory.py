@@ -0,0 +1,58 @@
+"""
+Per-object memory of the slots-based Transaction versus the previous
+dict-backed class.
+
+Usage: python -m benchmarks.bench_memory [transaction_count]
+"""
+import hashlib
+import sys
+import time
+import tracemalloc
+
+from blockchain.encoding import encode_transaction_fields
+from blockchain.transaction import Transaction
+
+DEFAULT_COUNT = 1_000_000
+
+
+class DictTransaction:
+    # The pre-slots Transaction layout: one instance __dict__ per object.
+    def __init__(self, sender, receiver, amount, data=None, timestamp=None):
+        self.sender = sender
+        self.receiver = receiver
+        self.amount = amount
+        self.data = data or ""
+        self.timestamp = timestamp or time.time()
+        self.transaction_id = hashlib.sha256(
+            encode_transaction_fields(self.sender, self.receiver, self.amount, self.data, self.timestamp)
+        ).hexdigest()
+
+
+def traced(build):
+    tracemalloc.start()
+    objects = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objects, size
+
+
+def main(count):
+    # Shared field values so only the per-object overhead is measured.
+    senders = [f"sender-{i}" for i in range(100)]
+    timestamp = 1732594647.5
+
+    def build(cls):
+        return [cls(senders[i % 100], senders[(i + 1) % 100], i % 1000 + 1, "", timestamp) for i in range(count)]
+
+    dict_objects, dict_size = traced(lambda: build(DictTransaction))
+    del dict_objects
+    slot_objects, slot_size = traced(lambda: build(Transaction))
+
+    print(f"{count} transactions")
+    print(f"  dict-backed: {dict_size / 2**20:8.1f} MiB  ({dict_size / count:6.1f} B/object)")
+    print(f"  __slots__:   {slot_size / 2**20:8.1f} MiB  ({slot_size / count:6.1f} B/object)")
+    print(f"  saved:       {(dict_size - slot_size) / 2**20:8.1f} MiB  ({(dict_size - slot_size) / count:6.1f} B/object)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_COUNT)
@@ -0,0 +1,84 @@
+"""
+Signature verification throughput: RSA-2048 PSS versus Ed25519, verified one at a
+time in-process (parsing every sender key, then with the public-key cache) and in
+batches on SignatureVerifier's process pool, plus the rate for re-submitted
+transactions answered from its LRU cache.
+
+Usage: python -m benchmarks.bench_signatures [transaction_count] [workers]
+"""
+import os
+import sys
+import time
+
+from blockchain.signatures import (
+    PUBLIC_KEY_FIELD,
+    SIGNATURE_FIELD,
+    SignatureVerifier,
+    sign_transaction,
+    signing_payload,
+    verify_batch,
+)
+from utils.crypto import (
+    generate_ed25519_keypair,
+    generate_rsa_keypair,
+    load_public_key,
+    public_key_cache,
+    verify_signature,
+)
+
+DEFAULT_COUNT = 5_000
+
+
+def make_transactions(private_key, count):
+    return [
+        sign_transaction({"id": f"{i:064x}", "data": f"transfer {i}", "amount": i % 1000}, private_key)
+        for i in range(count)
+    ]
+
+
+def verify_parsing_keys(transactions):
+    # What every verification paid before the public-key cache.
+    return [
+        verify_signature(
+            load_public_key(tx[PUBLIC_KEY_FIELD].encode("ascii")), signing_payload(tx), bytes.fromhex(tx[SIGNATURE_FIELD])
+        )
+        for tx in transactions
+    ]
+
+
+def rate(func, argument):
+    start = time.perf_counter()
+    results = func(argument)
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return len(argument) / elapsed
+
+
+def main(count, workers):
+    print(f"{count} transactions per scheme, {workers} verification processes")
+    print(f"{'scheme':>8} {'parse keys':>12} {'key cache':>12} {'pool tx/s':>12} {'cached tx/s':>12} {'key hits':>9}")
+    for scheme, generate in (("rsa", generate_rsa_keypair), ("ed25519", generate_ed25519_keypair)):
+        private_key, _ = generate()
+        transactions = make_transactions(private_key, count)
+
+        verifier = SignatureVerifier(workers=workers, inline_below=0)
+        try:
+            verifier.verify_many(transactions[: workers * 2])  # Start the workers outside the timing
+            verifier._cache.clear()
+            parsing = rate(verify_parsing_keys, transactions)
+            public_key_cache.clear()
+            inline = rate(verify_batch, transactions)
+            pooled = rate(verifier.verify_many, transactions)
+            cached = rate(verifier.verify_many, transactions)
+        finally:
+            verifier.close()
+        hit_rate = public_key_cache.stats()["hit_rate"]
+        print(f"{scheme:>8} {parsing:>12,.0f} {inline:>12,.0f} {pooled:>12,.0f} {cached:>12,.0f} {hit_rate:>8.1%}")
+
+
+if __name__ == "__main__":
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    main(
+        arguments[0] if arguments else DEFAULT_COUNT,
+        arguments[1] if len(arguments) > 1 else (os.cpu_count() or 1),
+    )
@@ -0,0 +1,78 @@
+"""
+Token transfer throughput: TokenContract.transfer called once per transfer versus
+whole blocks applied in one batch through AccountState, plus the cost of rolling
+the applied blocks back.
+
+Usage: python -m benchmarks.bench_state [transfer_count] [transfers_per_block] [accounts]
+"""
+import random
+import sys
+import time
+
+from contracts.token_contract import TokenContract
+
+DEFAULT_COUNT = 1_000_000
+DEFAULT_BLOCK_SIZE = 10_000
+DEFAULT_ACCOUNTS = 10_000
+
+
+def make_contract(accounts):
+    contract = TokenContract("Bench", "BEN", accounts * 1_000_000, "acct0")
+    for i in range(1, accounts):
+        contract.transfer("acct0", f"acct{i}", 1_000_000)  # Every account can afford its share
+    return contract
+
+
+def make_transfers(count, accounts):
+    rng = random.Random(7)
+    names = [f"acct{i}" for i in range(accounts)]
+    return [(rng.choice(names), rng.choice(names), rng.randint(1, 100), None) for _ in range(count)]
+
+
+def per_call(contract, transfers, block_size):
+    transfer = contract.transfer
+    for sender, receiver, amount, _ in transfers:
+        transfer(sender, receiver, amount)
+
+
+def batched(contract, transfers, block_size):
+    apply_transfers = contract.state.apply_transfers
+    for index, start in enumerate(range(0, len(transfers), block_size)):
+        apply_transfers(transfers[start:start + block_size], index, f"{index:064x}")
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main(count, block_size, accounts):
+    transfers = make_transfers(count, accounts)
+    blocks = -(-count // block_size)
+    print(f"{count:,} transfers between {accounts:,} accounts, {block_size:,} per block ({blocks} blocks)")
+
+    per_call_contract = make_contract(accounts)
+    per_call_time = timed(per_call, per_call_contract, transfers, block_size)
+
+    batched_contract = make_contract(accounts)
+    batched_contract.state.diffs = type(batched_contract.state.diffs)(maxlen=blocks)  # Keep every block undoable
+    batched_time = timed(batched, batched_contract, transfers, block_size)
+    assert batched_contract.balances == per_call_contract.balances
+
+    rollback_time = timed(lambda: [batched_contract.rollback_block() for _ in range(blocks)])
+    assert batched_contract.balances == make_contract(accounts).balances
+
+    print(f"{'mode':>10} {'seconds':>9} {'transfers/s':>13}")
+    print(f"{'per-call':>10} {per_call_time:>9.2f} {count / per_call_time:>13,.0f}")
+    print(f"{'batched':>10} {batched_time:>9.2f} {count / batched_time:>13,.0f}")
+    print(f"{'rollback':>10} {rollback_time:>9.2f} {count / rollback_time:>13,.0f}")
+
+
+if __name__ == "__main__":
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    main(
+        arguments[0] if arguments else DEFAULT_COUNT,
+        arguments[1] if len(arguments) > 1 else DEFAULT_BLOCK_SIZE,
+        arguments[2] if len(arguments) > 2 else DEFAULT_ACCOUNTS,
+    )
@@ -0,0 +1,49 @@
+"""
+Bytes on the wire for one consensus round: the old JSON proposal (block fields plus
+a duplicate `block_data`) with votes echoing the whole block, versus the binary
+proposal with hash-only votes.
+
+Usage: python -m benchmarks.bench_wire [peer_counts...]
+"""
+import json
+import sys
+
+from blockchain.block import Block
+
+DEFAULT_PEERS = (4, 16, 64)
+BLOCK_SIZES = (50, 500, 5_000)
+
+
+def make_block(transaction_count):
+    transactions = [
+        {"id": f"{i:064x}", "data": f"transfer {i}", "sender": f"account{i % 97}", "amount": i * 7 % 1000}
+        for i in range(transaction_count)
+    ]
+    return Block(1, "ab" * 32, transactions, "0.123456", timestamp=1732894630.5)
+
+
+def old_round_bytes(block, peers):
+    block_data = block.to_dict()
+    proposal = len(json.dumps(dict(block_data, block_data=block_data)))
+    vote = len(json.dumps({"block_index": block.index, "node_id": "node2", "status": "valid", "block_data": block_data}))
+    # Leader sends the proposal to every peer; every validator sends its vote to every peer.
+    return peers * proposal + peers * peers * vote
+
+
+def new_round_bytes(block, peers):
+    proposal = len(block.to_bytes())
+    vote = len(json.dumps({"block_hash": block.hash, "block_index": block.index, "node_id": "node2", "status": "valid"}))
+    return peers * proposal + peers * peers * vote
+
+
+def main(peer_counts):
+    print(f"{'peers':>6} {'txs':>6} {'old':>14} {'new':>14} {'ratio':>8}")
+    for transaction_count in BLOCK_SIZES:
+        block = make_block(transaction_count)
+        for peers in peer_counts:
+            old, new = old_round_bytes(block, peers), new_round_bytes(block, peers)
+            print(f"{peers:>6} {transaction_count:>6} {old:>14,} {new:>14,} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_PEERS)
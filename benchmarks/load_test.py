@@ -0,0 +1,107 @@
+"""
+HTTP load test for a running node: requests per second and latency percentiles.
+
+Each worker thread keeps one keep-alive connection and sends requests back to
+back for the given duration. Point it at `api.py` and then at `async_api.py`
+to compare the two runtimes under the same load.
+
+Usage:
+    python -m benchmarks.load_test http://localhost:5001 --path /transaction_pool
+    python -m benchmarks.load_test http://localhost:5001 --path /add_transaction --transactions
+"""
+import argparse
+import http.client
+import itertools
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def worker(base_url, method, path, body_factory, stop_at, latencies, errors, lock):
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=30)
+    local_latencies = []
+    local_errors = 0
+    while time.monotonic() < stop_at:
+        body = body_factory() if body_factory else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        start = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 500:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            connection.close()
+            connection = connection_class(parts.netloc, timeout=30)
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def transaction_bodies(prefix):
+    counter = itertools.count()
+    lock = threading.Lock()
+
+    def make():
+        with lock:
+            n = next(counter)
+        return json.dumps({"transaction": {"id": f"{prefix}-{n}", "data": f"load test {n}"}})
+
+    return make
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("url", help="Node base URL, e.g. http://localhost:5001")
+    parser.add_argument("--path", default="/transaction_pool")
+    parser.add_argument("--method", default=None, help="Defaults to POST with --transactions, else GET")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds")
+    parser.add_argument("--transactions", action="store_true", help="Send a fresh transaction body per request")
+    args = parser.parse_args()
+
+    method = args.method or ("POST" if args.transactions else "GET")
+    body_factory = transaction_bodies(f"load-{int(time.time())}") if args.transactions else None
+    latencies, errors, lock = [], [], threading.Lock()
+    stop_at = time.monotonic() + args.duration
+
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(args.url, method, args.path, body_factory, stop_at, latencies, errors, lock),
+            daemon=True,
+        )
+        for _ in range(args.concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    print(f"{method} {args.url}{args.path}  concurrency={args.concurrency}  duration={elapsed:.1f}s")
+    print(f"requests: {len(latencies)}  errors: {sum(errors)}  rps: {len(latencies) / elapsed:.1f}")
+    print(
+        f"latency ms  p50={percentile(latencies, 0.50) * 1e3:.2f}  p90={percentile(latencies, 0.90) * 1e3:.2f}  "
+        f"p99={percentile(latencies, 0.99) * 1e3:.2f}  max={(latencies[-1] if latencies else float('nan')) * 1e3:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
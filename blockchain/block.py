@@ -1,28 +1,140 @@
 import hashlib
 import time
 
+from blockchain.encoding import encode_block, decode_block_dict, encode_block_header
+from blockchain.merkle import merkle_root, merkle_proof
+from blockchain.transaction import get_transaction_id
+
 class Block:
-    def __init__(self, index, previous_hash, transactions, entropy, timestamp=None):
-        self.index = index
-        self.previous_hash = previous_hash
-        self.transactions = transactions
-        self.entropy = entropy
-        self.timestamp = timestamp or time.time()
-        self.hash = self.compute_hash()
+    """
+    Immutable block. The header hash is computed once at construction and
+    cached; assigning to any field afterwards raises AttributeError. The
+    transaction dicts are not frozen, so `verify_transactions` always rehashes them.
+    """
+
+    __slots__ = (
+        "index",
+        "previous_hash",
+        "transactions",
+        "entropy",
+        "timestamp",
+        "merkle_root",
+        "proposer",
+        "hash",
+        "_computed_hash",
+    )
+    _FROZEN_FIELDS = frozenset(__slots__)
+
+    def __init__(self, index, previous_hash, transactions, entropy, timestamp=None, merkle_root=None, block_hash=None,
+                 proposer=None):
+        """
+        :param merkle_root: Claimed Merkle root of `transactions`; computed when omitted.
+            A claimed root is only trusted after `verify_transactions()`.
+        :param block_hash: Claimed block hash (e.g. as received from a peer); defaults to
+            the computed hash. Check it with `validate()`.
+        :param proposer: node_id of the elected leader that proposed the block; part of the
+            hashed header, so validators can check the claim (see LeaderElection.verify)
+        """
+        set_field = object.__setattr__
+        set_field(self, "index", index)
+        set_field(self, "previous_hash", previous_hash)
+        set_field(self, "transactions", tuple(transactions))
+        set_field(self, "entropy", entropy)
+        set_field(self, "timestamp", timestamp or time.time())
+        set_field(self, "merkle_root", self.compute_merkle_root() if merkle_root is None else merkle_root)
+        set_field(self, "proposer", proposer)
+        set_field(self, "_computed_hash", self._hash_header())
+        set_field(self, "hash", block_hash if block_hash is not None else self._computed_hash)
+
+    def __setattr__(self, name, value):
+        if name in self._FROZEN_FIELDS:
+            raise AttributeError(f"Block field '{name}' cannot be changed after the block is hashed.")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Block field '{name}' cannot be deleted.")
+
+    def compute_merkle_root(self):
+        return merkle_root(self.transactions)
+
+    def _hash_header(self):
+        block_data = encode_block_header(
+            self.index, self.previous_hash, self.merkle_root, self.entropy, self.timestamp, self.proposer
+        )
+        return hashlib.sha256(block_data).hexdigest()
 
     def compute_hash(self):
-        block_data = f"{self.index}{self.previous_hash}{self.transactions}{self.entropy}{self.timestamp}"
-        return hashlib.sha256(block_data.encode()).hexdigest()
+        """
+        Hash of the block header (cached). Transactions are covered through the Merkle root.
+        """
+        return self._computed_hash
 
     def validate(self):
+        """
+        Check the header hash. Use `verify_transactions` to check the body against the header.
+        """
         return self.hash == self.compute_hash()
 
+    def verify_transactions(self):
+        """
+        Check that the transactions match the header's Merkle root. Always rehashed:
+        the transaction dicts themselves stay mutable, so a cached result could go stale.
+        """
+        return self.merkle_root == self.compute_merkle_root()
+
+    def transaction_proof(self, transaction_id):
+        """
+        Build a Merkle inclusion proof for a transaction in this block.
+        :return: (position, transaction, proof), or None if the transaction is not in the block
+        """
+        for position, transaction in enumerate(self.transactions):
+            if get_transaction_id(transaction) == transaction_id:
+                return position, transaction, merkle_proof(self.transactions, position)
+        return None
+
+    def to_dict(self):
+        return {
+            "index": self.index,
+            "previous_hash": self.previous_hash,
+            "transactions": list(self.transactions),
+            "entropy": self.entropy,
+            "timestamp": self.timestamp,
+            "merkle_root": self.merkle_root,
+            "proposer": self.proposer,
+            "hash": self.hash,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            index=data["index"],
+            previous_hash=data["previous_hash"],
+            transactions=data["transactions"],
+            entropy=data["entropy"],
+            timestamp=data["timestamp"],
+            merkle_root=data.get("merkle_root"),
+            block_hash=data["hash"],
+            proposer=data.get("proposer"),
+        )
+
+    def to_bytes(self):
+        """
+        Canonical binary encoding used for storage and network transfer.
+        """
+        return encode_block(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls.from_dict(decode_block_dict(data))
+
     def __repr__(self):
         return (
             f"Block(Index: {self.index}, "
             f"Hash: {self.hash}, "
             f"Previous Hash: {self.previous_hash}, "
+            f"Merkle Root: {self.merkle_root}, "
             f"Transactions: {self.transactions}, "
             f"Entropy: {self.entropy}, "
+            f"Proposer: {self.proposer}, "
             f"Timestamp: {self.timestamp})"
         )
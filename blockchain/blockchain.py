@@ -1,22 +1,38 @@
 from blockchain.block import Block
+from blockchain.mempool import Mempool
+from blockchain.chain_view import ChainView
+from blockchain.entropy_table import EntropyTable
+from blockchain.election import LeaderElection
+from blockchain.encoding import EncodingError, encode_value
+from blockchain.reputation import ReputationTable
 from config import GENESIS_BLOCK
-from blockchain.consensus import (
-    weighted_average_fusion,
-    weighted_minkowski_distance,
-    entropy_to_numeric,
-)
 from utils.logger import setup_logger, log_transaction, log_block, log_entropy, log_error
-import time
+import threading
 
 class Blockchain:
-    def __init__(self, logger=None):
+    def __init__(self, logger=None, store=None, reputation=None, weighted_fusion=False, signature_verifier=None):
+        """
+        :param reputation: ReputationTable of validator scores (in-memory if omitted)
+        :param weighted_fusion: Weigh each node's entropy by its reputation when aggregating
+        :param signature_verifier: SignatureVerifier; when set, only signed transactions are admitted
+        """
         self.logger = logger
-        self.chain = [self.create_genesis_block()]
-        self.pending_transactions = []  # Global transaction pool
-        self.node_entropies = {}  # Dictionary to store node_id -> entropy
+        self.store = store  # Optional BlockStore for persistence
+        self.signature_verifier = signature_verifier
+        self.reputation = reputation if reputation is not None else ReputationTable(logger=logger)
+        self.chain = [self.create_genesis_block()]  # Height -> block (a lazy ChainView when persisted)
+        self.block_heights = {self.chain[0].hash: 0}  # Block hash -> height
+        self.pending_transactions = Mempool()  # Global transaction pool, keyed by transaction id
+        # node_id -> entropy, with cached numeric values (and running reputation-weighted sums)
+        self.node_entropies = EntropyTable(weights=self.reputation if weighted_fusion else None)
+        self.elections = LeaderElection()  # Block index -> elected proposer
         self.received_entropy = None  # Initialize received entropy
+        self.pending_block = None  # Block proposed in the current round, awaiting votes
         self.nodes = []  # List of nodes in the blockchain system
+        self._chain_lock = threading.Lock()  # Serializes add_block's check-and-append
         self.validate_genesis_block()
+        if self.store is not None:
+            self.load_chain_from_store()
 
     def create_genesis_block(self):
         """
@@ -28,8 +44,8 @@ class Blockchain:
             transactions=GENESIS_BLOCK["transactions"],
             entropy=GENESIS_BLOCK["entropy"],
             timestamp=GENESIS_BLOCK["timestamp"],
+            block_hash=GENESIS_BLOCK["hash"],
         )
-        genesis_block.hash = GENESIS_BLOCK["hash"]
         if self.logger:
             self.logger.info(f"Genesis Block Created: {genesis_block}")
         return genesis_block
@@ -43,15 +59,46 @@ class Blockchain:
             genesis_block.index != GENESIS_BLOCK["index"]
             or genesis_block.previous_hash != GENESIS_BLOCK["previous_hash"]
             or genesis_block.hash != GENESIS_BLOCK["hash"]
-            or genesis_block.transactions != GENESIS_BLOCK["transactions"]
+            or list(genesis_block.transactions) != GENESIS_BLOCK["transactions"]
             or genesis_block.entropy != GENESIS_BLOCK["entropy"]
             or abs(genesis_block.timestamp - GENESIS_BLOCK["timestamp"]) > 1e-6
         ):
             raise ValueError("Genesis Block mismatch! Check configuration.")
 
+    def load_chain_from_store(self):
+        """
+        Rebuild the chain from the block store, or seed an empty store with the genesis block.
+        Blocks are streamed once to verify linkage and build the hash index; only the
+        index is kept, and `self.chain` becomes a lazy view over the store.
+        """
+        if len(self.store) == 0:
+            self.store.append(self.chain[0])
+            self.chain = ChainView(self.store)
+            return
+
+        block_heights = {}
+        previous_hash = None
+        for height, block in enumerate(self.store):
+            if height == 0:
+                if block.hash != GENESIS_BLOCK["hash"]:
+                    raise ValueError("Stored genesis block does not match configuration.")
+            elif block.index != height or block.previous_hash != previous_hash:
+                raise ValueError(f"Stored block at height {height} does not link to its parent.")
+            block_heights[block.hash] = height
+            previous_hash = block.hash
+
+        self.chain = ChainView(self.store)
+        self.block_heights = block_heights
+        self.validate_genesis_block()
+        if self.logger:
+            self.logger.info(f"Loaded {len(self.chain)} blocks from the block store.")
+
     def add_transaction_to_pool(self, transaction):
         if self.validate_transaction(transaction):
-            self.pending_transactions.append(transaction)
+            if not self.pending_transactions.add(transaction):
+                if self.logger:
+                    self.logger.info(f"Transaction {transaction['id']} already in pool. Skipping.")
+                return False
             if self.logger:
                 self.logger.info(f"Transaction added to pool: {transaction}")
             return True
@@ -60,99 +107,152 @@ class Blockchain:
                 self.logger.warning(f"Invalid transaction rejected: {transaction}")
             return False
         
+    def add_transactions_to_pool(self, transactions, verified=False):
+        """
+        Validate and pool a batch of transactions in one pass.
+        :param verified: Signatures were already checked (see `verify_signatures`)
+        :return: List of the transactions that were newly added
+        """
+        valid = [transaction for transaction in transactions if self.is_well_formed(transaction)]
+        if not verified:
+            valid = [transaction for transaction, ok in zip(valid, self.verify_signatures(valid)) if ok]
+        added = self.pending_transactions.add_many(valid)
+        if self.logger:
+            rejected = len(transactions) - len(valid)
+            self.logger.info(
+                f"Batch of {len(transactions)} transactions: {len(added)} added, "
+                f"{len(valid) - len(added)} duplicates, {rejected} invalid."
+            )
+        return added
+
     def validate_transaction(self, transaction):
         """
-        Validate a transaction (basic validation for now).
+        Validate a transaction: required fields, plus its signature when signatures are required.
+        """
+        if not self.is_well_formed(transaction):
+            return False
+        return self.signature_verifier is None or self.signature_verifier.verify(transaction)
+
+    def is_well_formed(self, transaction):
+        """
+        Required fields present, and every value encodable, so the transaction can never
+        make a block built from the pool fail to hash or serialize.
+        """
+        if not (isinstance(transaction, dict) and "id" in transaction and "data" in transaction):
+            return False
+        try:
+            encode_value(transaction)
+        except EncodingError:
+            return False
+        return True
+
+    def verify_signatures(self, transactions):
+        """
+        Check signatures of a batch at once (on the verifier's process pool).
+        :return: One boolean per transaction; all True when signatures are not required
         """
-        # Add specific validation logic (e.g., format, signature)
-        return isinstance(transaction, dict) and "id" in transaction and "data" in transaction
+        if self.signature_verifier is None:
+            return [True] * len(transactions)
+        return self.signature_verifier.verify_many(transactions)
 
     def get_transactions_from_pool(self, limit=50):
         """
         Retrieve a limited number of transactions from the pool.
         """
-        return self.pending_transactions[:limit]
+        return self.pending_transactions.take(limit)
 
     def remove_transactions_from_pool(self, transactions):
         """
         Remove transactions from the pool after they are included in a block.
         """
-        self.pending_transactions = [
-            tx for tx in self.pending_transactions if tx not in transactions
-        ]
+        removed = self.pending_transactions.remove_many(transactions)
         if self.logger:
-            self.logger.info(f"Removed {len(transactions)} transactions from the pool.")
+            self.logger.info(f"Removed {removed} transactions from the pool.")
 
     def add_block(self, block):
-        # Ensure the block is not already in the blockchain
-        if any(b.hash == block.hash for b in self.chain):
-            self.logger.warning(f"Block {block.index} with hash {block.hash} already exists in the blockchain.")
-            return False
+        """
+        Validate a block against the current tip and append it. The checks and the append
+        run under one lock, so concurrent commits of the same block (vote quorum, gossip,
+        /blockchain_update) cannot both pass and both reach the block store.
+        :return: True if the block was appended
+        """
+        with self._chain_lock:
+            # Ensure the block is not already in the blockchain
+            if block.hash in self.block_heights:
+                self.logger.warning(f"Block {block.index} with hash {block.hash} already exists in the blockchain.")
+                return False
 
-        # Ensure the block's previous hash matches the last block
-        if block.previous_hash != self.chain[-1].hash:
-            self.logger.error(f"Block {block.index} rejected: Previous hash mismatch.")
-            return False
+            # Ensure the block's previous hash matches the last block
+            if block.previous_hash != self.chain[-1].hash:
+                self.logger.error(f"Block {block.index} rejected: Previous hash mismatch.")
+                return False
 
-        # Ensure the block's index is valid
-        if block.index != len(self.chain):
-            self.logger.error(f"Block {block.index} rejected: Invalid index.")
-            return False
+            # Ensure the block's index is valid
+            if block.index != len(self.chain):
+                self.logger.error(f"Block {block.index} rejected: Invalid index.")
+                return False
 
-        # Ensure the block hash is correct
-        if block.hash != block.compute_hash():
-            self.logger.error(f"Block {block.index} rejected: Hash mismatch.")
-            return False
+            # Ensure the block hash is correct
+            if block.hash != block.compute_hash():
+                self.logger.error(f"Block {block.index} rejected: Hash mismatch.")
+                return False
 
-        # Add the block to the chain
-        self.pending_transactions = [
-                txn for txn in self.pending_transactions if txn not in block.transactions
-            ]
-            
-        self.chain.append(block)
-        self.logger.info(f"Block {block.index} successfully added to the blockchain.")
-        return True
+            # Ensure the transactions match the header's Merkle root
+            if not block.verify_transactions():
+                self.logger.error(f"Block {block.index} rejected: Merkle root mismatch.")
+                return False
+
+            # Add the block to the chain (a ChainView persists it to the block store)
+            self.pending_transactions.remove_many(block.transactions)
+
+            self.chain.append(block)
+            self.block_heights[block.hash] = block.index
+            self.logger.info(f"Block {block.index} successfully added to the blockchain.")
+            return True
+
+    def get_block_by_hash(self, block_hash):
+        """
+        Look up a block by its hash.
+        :return: The block, or None if it is not on the chain
+        """
+        height = self.block_heights.get(block_hash)
+        if height is None:
+            return None
+        return self.chain[height]
+
+    def get_block_by_height(self, height):
+        """
+        Look up a block by its height.
+        :return: The block, or None if the height is out of range
+        """
+        if height < 0 or height >= len(self.chain):
+            return None
+        return self.chain[height]
 
 
     def calculate_aggregate_entropy(self):
         """
-        Aggregate entropy using weighted average fusion.
+        Aggregate entropy using weighted average fusion (reputation-weighted if enabled).
         """
-        aggregated_entropy = weighted_average_fusion(self.node_entropies)
+        aggregated_entropy = self.node_entropies.fuse()
         if self.logger:
             self.logger.info(f"Aggregated Entropy: {aggregated_entropy}")
         return f"{aggregated_entropy:.6f}"
 
-    def elect_new_leader(self, aggregated_entropy):
+    def elect_new_leader(self, aggregated_entropy, round_index=None):
         """
         Elect a new leader based on proximity to the aggregated entropy.
+        :param round_index: Index of the block the new leader proposes (defaults to the next block)
         """
         self.logger.info(f"Electing a new leader based on Aggregated Entropy: {aggregated_entropy}")
 
-        closest_node = None
-        closest_proximity = float("inf")
-
-        for node_id, entropy in self.node_entropies.items():
-            proximity = weighted_minkowski_distance(
-                entropy_to_numeric(entropy),
-                entropy_to_numeric(aggregated_entropy),
-            )
-            self.logger.info(f"Node {node_id} proximity to Aggregated Entropy: {proximity}")
-
-            if proximity < closest_proximity:
-                closest_proximity = proximity
-                closest_node = node_id
+        round_index = len(self.chain) if round_index is None else round_index
+        closest_node = self.elections.elect(round_index, self.node_entropies, aggregated_entropy)
 
         if closest_node:
             # Update leader flags
             for node in self.nodes:
-                if node.node_id == closest_node:
-                    node.is_leader = True
-                    self.logger.info(f"Node {node.node_id} is now the leader.")
-                else:
-                    if node.is_leader:  # Log if the old leader is being demoted
-                        self.logger.info(f"Node {node.node_id} is no longer the leader.")
-                    node.is_leader = False
-
-        self.logger.info(f"New Leader Elected: {closest_node} with proximity {closest_proximity}")
+                node.is_leader = (node.node_id == closest_node)
+
+        self.logger.info(f"New Leader Elected for block {round_index}: {closest_node}")
         return closest_node
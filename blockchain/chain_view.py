@@ -0,0 +1,73 @@
+import mmap
+import threading
+
+
+class ChainView:
+    """
+    Lazy, list-like view over the blocks in a BlockStore.
+
+    Only the store's compact offset index lives in memory. Indexing decodes the
+    requested block from a read-only memory map of the segment file, so memory
+    use does not grow with transaction volume. The tip block is cached because
+    `chain[-1]` is read on every proposal and validation.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._map = None
+        self._map_lock = threading.Lock()
+        self._tip = None
+
+    def _payload(self, height):
+        start, end = self.store.payload_range(height)
+        with self._map_lock:
+            if self._map is None or end > len(self._map):
+                # The segment grew since it was mapped; remap to cover the new records.
+                if self._map is not None:
+                    self._map.close()
+                self._map = mmap.mmap(self.store.segment_fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map[start:end]
+
+    def _normalize(self, height):
+        length = len(self)
+        if height < 0:
+            height += length
+        if height < 0 or height >= length:
+            raise IndexError("chain index out of range")
+        return height
+
+    def __getitem__(self, height):
+        if isinstance(height, slice):
+            return [self[i] for i in range(*height.indices(len(self)))]
+
+        height = self._normalize(height)
+        tip = self._tip
+        if tip is not None and tip.index == height:
+            return tip
+        block = self.store.decode_block(self._payload(height))
+        if height == len(self) - 1:
+            self._tip = block
+        return block
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        for height in range(len(self)):
+            yield self[height]
+
+    def append(self, block):
+        """
+        Persist a block to the underlying store and make it the cached tip.
+        """
+        self.store.append(block)
+        self._tip = block
+
+    def close(self):
+        with self._map_lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+
+    def __repr__(self):
+        return f"ChainView(Height: {len(self)})"
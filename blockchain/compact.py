@@ -0,0 +1,136 @@
+import hashlib
+
+from blockchain.block import Block
+from blockchain.encoding import EncodingError, decode_value, encode_value
+from blockchain.mempool import Mempool
+from blockchain.transaction import get_transaction_id
+
+COMPACT_BLOCK_CONTENT_TYPE = "application/x-poc-compact-block"
+SHORT_ID_SIZE = 6  # bytes; collisions are caught by the Merkle root check
+
+
+def short_id_key(block_hash):
+    """
+    Per-block key for short ids, so colliding ids cannot be precomputed before the block exists.
+    """
+    return hashlib.sha256(b"compact-block" + bytes.fromhex(block_hash)).digest()
+
+
+def short_id(key, transaction_id):
+    return hashlib.blake2b(str(transaction_id).encode("utf-8"), key=key, digest_size=SHORT_ID_SIZE).digest()
+
+
+def to_compact(block, sender=None):
+    """
+    Header plus ordered short transaction ids.
+    :param sender: node_id receivers fetch missing transactions from (defaults to the block's proposer)
+    :return: Compact block dict
+    """
+    key = short_id_key(block.hash)
+    return {
+        "index": block.index,
+        "previous_hash": block.previous_hash,
+        "merkle_root": block.merkle_root,
+        "entropy": block.entropy,
+        "timestamp": block.timestamp,
+        "hash": block.hash,
+        "proposer": block.proposer,
+        "sender": sender if sender is not None else block.proposer,
+        "short_ids": b"".join(short_id(key, get_transaction_id(tx)) for tx in block.transactions),
+    }
+
+
+def encode_compact(compact):
+    return encode_value(compact)
+
+
+# Header field -> accepted types; checked on decode so malformed peers fail fast, not mid-rebuild.
+_HEADER_TYPES = {
+    "index": (int,),
+    "previous_hash": (str,),
+    "merkle_root": (str,),
+    "entropy": (str,),
+    "timestamp": (int, float),
+    "hash": (str,),
+    "proposer": (str, type(None)),
+    "sender": (str, type(None)),
+}
+
+
+def decode_compact(data):
+    """
+    :raises EncodingError: If the payload is not a well-formed compact block
+    """
+    compact, offset = decode_value(data)
+    if offset != len(data) or not isinstance(compact, dict):
+        raise EncodingError("Malformed compact block")
+    for field, types in _HEADER_TYPES.items():
+        value = compact.get(field)  # A missing field reads as None, which only optional fields accept
+        if type(value) not in types:
+            raise EncodingError(f"Compact block field '{field}' has type {type(value).__name__}")
+    if not 0 <= compact["index"] < 2**64:
+        raise EncodingError("Compact block index out of range")
+    block_hash = compact["hash"]
+    if len(block_hash) != 64 or not all(c in "0123456789abcdef" for c in block_hash):
+        raise EncodingError("Compact block hash is not 64 lowercase hex digits")
+    short_ids = compact.get("short_ids")
+    if not isinstance(short_ids, bytes) or len(short_ids) % SHORT_ID_SIZE:
+        raise EncodingError("Malformed compact block short ids")
+    return compact
+
+
+def split_short_ids(compact):
+    blob = compact["short_ids"]
+    return [blob[i:i + SHORT_ID_SIZE] for i in range(0, len(blob), SHORT_ID_SIZE)]
+
+
+def fill_from_pool(compact, pool):
+    """
+    Match short ids against pooled transactions.
+    :param pool: Mempool, whose short id index for this block is built once and reused,
+        or any iterable of pooled transactions
+    :return: (transactions, missing) where transactions has None at each position listed in missing
+    """
+    key = short_id_key(compact["hash"])
+    if isinstance(pool, Mempool):
+        index = pool.short_id_index(key, short_id)
+
+        def lookup(sid):
+            transaction_id = index.get(sid)
+            return None if transaction_id is None else pool.get(transaction_id)
+    else:
+        candidates = {}
+        for transaction in pool:
+            sid = short_id(key, get_transaction_id(transaction))
+            # Two pooled transactions share a short id; fetch it instead
+            candidates[sid] = None if sid in candidates else transaction
+        lookup = candidates.get
+
+    transactions = []
+    missing = []
+    for position, sid in enumerate(split_short_ids(compact)):
+        transaction = lookup(sid)
+        if transaction is None:
+            missing.append(position)
+        transactions.append(transaction)
+    return transactions, missing
+
+
+def build_block(compact, transactions):
+    """
+    Assemble the full block once every transaction is known.
+    :return: Block whose transactions match the header's Merkle root, or None on mismatch
+    """
+    block = Block(
+        index=compact["index"],
+        previous_hash=compact["previous_hash"],
+        transactions=transactions,
+        entropy=compact["entropy"],
+        timestamp=compact["timestamp"],
+        merkle_root=compact["merkle_root"],
+        block_hash=compact["hash"],
+        proposer=compact.get("proposer"),
+    )
+    if not block.validate() or not block.verify_transactions():
+        return None
+    return block
@@ -1,6 +1,8 @@
 import hashlib
 import random
 import utils.logger 
+from blockchain.encoding import encode_value
+from blockchain.transaction import get_transaction_id
 # 1. Henon Map for Entropy Generation
 def henon_entropy(a=1.4, b=0.3, iterations=10):
     x, y = random.random(), random.random()  # Start with random initial conditions
@@ -9,37 +11,81 @@ def henon_entropy(a=1.4, b=0.3, iterations=10):
     return f"{x:.6f}_{y:.6f}"  # Return as a string for reproducibility
 
 # 2. Deterministic Transaction Reordering
-def reorder_transactions(transactions, entropy, logger=None):
-   
+# Transactions are ordered by a keyed PRF (BLAKE2b keyed with a digest of the
+# entropy) over their ids. No RNG state is involved, so the order is the same on
+# every node and Python version and concurrent callers cannot interfere.
+def ordering_key(entropy):
     if entropy is None:
         raise ValueError("Entropy is None. Cannot reorder transactions without a valid entropy.")
 
     # Normalize the entropy to a consistent format
     entropy = f"{float(entropy):.6f}"
+    return hashlib.sha256(entropy.encode()).digest()
+
+def transaction_rank(key, transaction_id):
+    """
+    PRF value that determines a transaction's position for a given ordering key.
+    """
+    return hashlib.blake2b(str(transaction_id).encode(), key=key, digest_size=16).digest()
+
+def _ordering_material(transaction):
+    transaction_id = get_transaction_id(transaction)
+    if transaction_id is None:
+        # Fall back to the transaction's canonical bytes when it carries no id.
+        return hashlib.sha256(encode_value(transaction)).hexdigest()
+    return transaction_id
+
+def order_transaction_ids(transaction_ids, entropy):
+    """
+    Deterministically order transaction ids without touching the transactions themselves.
+    :param transaction_ids: Iterable of transaction ids (may be a generator)
+    :return: List of ids in consensus order
+    """
+    key = ordering_key(entropy)
+    return sorted(transaction_ids, key=lambda transaction_id: transaction_rank(key, transaction_id))
+
+def reorder_transactions(transactions, entropy, logger=None):
+    """
+    Deterministically reorder transactions based on entropy.
+    :return: New list with the same transaction objects in consensus order
+    """
+    key = ordering_key(entropy)
+    ranks = [transaction_rank(key, _ordering_material(tx)) for tx in transactions]
+    order = sorted(range(len(ranks)), key=ranks.__getitem__)
+    return [transactions[position] for position in order]
+
+def find_order_mismatch(block_transaction_ids, pool_transaction_ids, entropy):
+    """
+    Check a block's transaction ids against the consensus order of the pool's ids.
+    A block holding exactly the pool's ids is checked by comparing the ranks of adjacent
+    block entries, O(k) PRF evaluations with no sort; the pool is only sorted to report
+    where a mismatching block first differs.
+    :return: None if the orders match, else (index, expected_id, found_id); a missing
+        entry on either side is reported as None
+    """
+    block_ids = list(block_transaction_ids)
+    pool_ids = list(pool_transaction_ids)
+    if len(block_ids) == len(pool_ids) and set(block_ids) == set(pool_ids):
+        key = ordering_key(entropy)
+        previous_rank = None
+        for transaction_id in block_ids:
+            rank = transaction_rank(key, transaction_id)
+            if previous_rank is not None and rank <= previous_rank:
+                break
+            previous_rank = rank
+        else:
+            return None
 
-    # Calculate the deterministic seed
-    seed = int(hashlib.sha256(entropy.encode()).hexdigest(), 16)
-
-    # Log entropy and seed details
-    # if logger:
-    #     logger.debug(f"Entropy used for reordering: {entropy}")
-    #     logger.debug(f"Deterministic seed generated: {seed}")
-    
-    # Initialize the random seed
-    random.seed(seed)
-    # if logger:
-    #     logger.debug(f"Random seed initialized with value: {seed}")
-
-    # Create a shuffled copy of the transactions
-    shuffled_transactions = transactions[:]
-    random.shuffle(shuffled_transactions)
-
-    # Log before and after reordering
-    # if logger:
-    #     logger.debug(f"Original transactions: {transactions}")
-    #     logger.debug(f"Shuffled transactions: {shuffled_transactions}")
-
-    return shuffled_transactions
+    expected_ids = order_transaction_ids(pool_ids, entropy)
+    position = -1
+    for position, found_id in enumerate(block_ids):
+        if position >= len(expected_ids):
+            return position, None, found_id
+        if found_id != expected_ids[position]:
+            return position, expected_ids[position], found_id
+    if position + 1 < len(expected_ids):
+        return position + 1, expected_ids[position + 1], None
+    return None
 
 # 3. Weighted Average Fusion for Aggregating Entropies
 def weighted_average_fusion(node_entropies, weights=None):
@@ -0,0 +1,121 @@
+import bisect
+import threading
+from collections import OrderedDict
+
+from blockchain.consensus import entropy_to_numeric
+
+
+class ElectionRound:
+    """
+    One round's numeric entropies, sorted once so every "closest node" query is a binary search.
+    Ties (equal values, or equal distance on both sides) go to the smallest node_id, so any
+    node holding the same entropies elects the same leader regardless of arrival order.
+    """
+
+    __slots__ = ("numerics", "node_ids")
+
+    def __init__(self, entries):
+        """
+        :param entries: Iterable of (node_id, numeric entropy)
+        """
+        ordered = sorted((numeric, node_id) for node_id, numeric in entries)
+        self.numerics = [numeric for numeric, _ in ordered]
+        self.node_ids = [node_id for _, node_id in ordered]
+
+    @classmethod
+    def from_table(cls, table):
+        """
+        Snapshot an EntropyTable, reusing the numerics it computed when each entropy arrived.
+        """
+        return cls((node_id, table.numeric(node_id)) for node_id in table)
+
+    def __len__(self):
+        return len(self.numerics)
+
+    def closest(self, target):
+        """
+        :param target: Numeric aggregate entropy
+        :return: (node_id, proximity) with proximity as `weighted_minkowski_distance`, or (None, inf)
+        """
+        numerics = self.numerics
+        if not numerics:
+            return None, float("inf")
+
+        above = bisect.bisect_left(numerics, target)  # First value >= target (smallest node_id among equals)
+        best = None
+        if above < len(numerics):
+            best = (numerics[above] - target, self.node_ids[above])
+        if above > 0:
+            below = bisect.bisect_left(numerics, numerics[above - 1])
+            candidate = (target - numerics[below], self.node_ids[below])
+            if best is None or candidate < best:
+                best = candidate
+        distance, node_id = best
+        return node_id, distance ** 2
+
+
+class LeaderElection:
+    """
+    The election engine shared by the leader and the validators.
+
+    Rounds are keyed by the index of the block the elected leader proposes. Electing a
+    round twice from the same aggregate returns the memoized leader, and validators that
+    only learn the result from the leader's broadcast `record` it, so checking the
+    proposer of a block is a dictionary lookup rather than a new aggregation.
+    """
+
+    def __init__(self, max_rounds=1024):
+        """
+        :param max_rounds: Rounds remembered; the oldest are dropped first
+        """
+        self.max_rounds = max_rounds
+        self._rounds = OrderedDict()  # block index -> (leader node_id, aggregate it was elected from, or None)
+        self._lock = threading.Lock()
+
+    def elect(self, round_index, entropies, aggregated_entropy):
+        """
+        Elect the proposer of block `round_index` from this round's entropies.
+        :param entropies: EntropyTable, or an ElectionRound already built from it
+        :return: Leader node_id, or None if there are no entropies
+        """
+        with self._lock:
+            known = self._rounds.get(round_index)
+        if known is not None and known[1] == aggregated_entropy:
+            return known[0]
+
+        election_round = entropies if isinstance(entropies, ElectionRound) else ElectionRound.from_table(entropies)
+        leader, _ = election_round.closest(entropy_to_numeric(aggregated_entropy))
+        if leader is not None:
+            self._store(round_index, leader, aggregated_entropy)
+        return leader
+
+    def record(self, round_index, leader):
+        """
+        Remember a leader announced by the network (or set by hand) for block `round_index`.
+        """
+        self._store(round_index, leader, None)
+
+    def _store(self, round_index, leader, aggregated_entropy):
+        with self._lock:
+            self._rounds[round_index] = (leader, aggregated_entropy)
+            self._rounds.move_to_end(round_index)
+            while len(self._rounds) > self.max_rounds:
+                self._rounds.popitem(last=False)
+
+    def leader_for(self, round_index):
+        """
+        :return: The leader for block `round_index`, or None if this node never saw that election
+        """
+        with self._lock:
+            known = self._rounds.get(round_index)
+        return known[0] if known else None
+
+    def verify(self, block):
+        """
+        Check the proposer named in a block header against the election for its index.
+        :return: True or False, or None when the election for that index is unknown here
+        """
+        leader = self.leader_for(block.index)
+        if leader is None:
+            return None
+        return block.proposer == leader
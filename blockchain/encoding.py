@@ -0,0 +1,273 @@
+"""
+Canonical binary encoding for blocks and transactions.
+
+Every value is written as a one-byte type tag followed by a fixed-width or
+length-prefixed body, so the same logical value always produces the same bytes:
+
+    None / False / True   tag only
+    int                   u8 length + big-endian two's complement (minimal width, at most 255 bytes)
+    float                 IEEE 754 binary64, big-endian (exact, no formatting)
+    str / bytes           u32 length + UTF-8 / raw bytes
+    list / tuple          u32 count + items
+    dict                  u32 count + (key, value) pairs sorted by UTF-8 key bytes
+
+Blocks and transactions use a fixed field order on top of this (see
+`encode_block_header` and `encode_transaction_fields`). The same bytes are
+hashed and sent over the wire.
+"""
+import struct
+
+ENCODING_VERSION = 3  # 3 added the block proposer; version 2 blocks still decode
+BLOCK_CONTENT_TYPE = "application/x-poc-block"
+
+_TAG_NONE = 0x00
+_TAG_FALSE = 0x01
+_TAG_TRUE = 0x02
+_TAG_INT = 0x03
+_TAG_FLOAT = 0x04
+_TAG_STR = 0x05
+_TAG_BYTES = 0x06
+_TAG_LIST = 0x07
+_TAG_DICT = 0x08
+
+_U8 = struct.Struct(">B")
+_U32 = struct.Struct(">I")
+_U64 = struct.Struct(">Q")
+_F64 = struct.Struct(">d")
+_TAG_LENGTH = struct.Struct(">BI")
+_FLOAT = struct.Struct(">Bd")
+
+_MAX_INT_BYTES = 255  # The int length prefix is a single byte
+
+_NONE = bytes([_TAG_NONE])
+_FALSE = bytes([_TAG_FALSE])
+_TRUE = bytes([_TAG_TRUE])
+
+
+class EncodingError(ValueError):
+    pass
+
+
+_key_cache = {}  # str key -> encoded (u32 length + UTF-8) key bytes
+
+
+def _encode_key(key):
+    encoded = _key_cache.get(key)
+    if encoded is None:
+        if type(key) is not str:
+            raise EncodingError(f"Dictionary keys must be strings, got {type(key).__name__}.")
+        data = key.encode("utf-8")
+        encoded = _U32.pack(len(data)) + data
+        if len(_key_cache) < 4096:
+            _key_cache[key] = encoded
+    return encoded
+
+
+def _encode_into(value, out):
+    value_type = type(value)
+    if value_type is str:
+        data = value.encode("utf-8")
+        out.append(_TAG_LENGTH.pack(_TAG_STR, len(data)))
+        out.append(data)
+    elif value_type is dict:
+        append = out.append
+        append(_TAG_LENGTH.pack(_TAG_DICT, len(value)))
+        # Code point order of str keys is the same as their UTF-8 byte order.
+        for key in sorted(value):
+            append(_encode_key(key))
+            item = value[key]
+            item_type = type(item)
+            # Inline the common scalar cases to avoid a call per field.
+            if item_type is str:
+                data = item.encode("utf-8")
+                append(_TAG_LENGTH.pack(_TAG_STR, len(data)))
+                append(data)
+            elif item_type is float:
+                append(_FLOAT.pack(_TAG_FLOAT, item))
+            else:
+                _encode_into(item, out)
+    elif value_type is int:
+        length = (value.bit_length() + 8) // 8
+        if length > _MAX_INT_BYTES:
+            raise EncodingError(f"Integer of {length} bytes exceeds the {_MAX_INT_BYTES}-byte limit.")
+        out.append(bytes((_TAG_INT, length)))
+        out.append(value.to_bytes(length, "big", signed=True))
+    elif value_type is float:
+        out.append(_FLOAT.pack(_TAG_FLOAT, value))
+    elif value_type is list or value_type is tuple:
+        out.append(_TAG_LENGTH.pack(_TAG_LIST, len(value)))
+        for item in value:
+            _encode_into(item, out)
+    elif value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif value_type is bytes:
+        out.append(_TAG_LENGTH.pack(_TAG_BYTES, len(value)))
+        out.append(value)
+    else:
+        raise EncodingError(f"Cannot encode value of type {value_type.__name__}.")
+
+
+def encode_value(value):
+    """
+    Encode a JSON-like value (None, bool, int, float, str, bytes, list, dict).
+    """
+    out = []
+    _encode_into(value, out)
+    return b"".join(out)
+
+
+def _decode_from(data, offset):
+    tag = data[offset]
+    offset += 1
+    if tag == _TAG_STR:
+        (length,) = _U32.unpack_from(data, offset)
+        offset += 4
+        return str(data[offset:offset + length], "utf-8"), offset + length
+    if tag == _TAG_INT:
+        length = data[offset]
+        offset += 1
+        return int.from_bytes(data[offset:offset + length], "big", signed=True), offset + length
+    if tag == _TAG_FLOAT:
+        return _F64.unpack_from(data, offset)[0], offset + 8
+    if tag == _TAG_DICT:
+        (count,) = _U32.unpack_from(data, offset)
+        offset += 4
+        result = {}
+        for _ in range(count):
+            (length,) = _U32.unpack_from(data, offset)
+            offset += 4
+            key = str(data[offset:offset + length], "utf-8")
+            offset += length
+            # Inline the common scalar cases to avoid a call per field.
+            item_tag = data[offset]
+            if item_tag == _TAG_STR:
+                (length,) = _U32.unpack_from(data, offset + 1)
+                offset += 5
+                result[key] = str(data[offset:offset + length], "utf-8")
+                offset += length
+            elif item_tag == _TAG_FLOAT:
+                result[key] = _F64.unpack_from(data, offset + 1)[0]
+                offset += 9
+            elif item_tag == _TAG_INT:
+                length = data[offset + 1]
+                offset += 2
+                result[key] = int.from_bytes(data[offset:offset + length], "big", signed=True)
+                offset += length
+            else:
+                result[key], offset = _decode_from(data, offset)
+        return result, offset
+    if tag == _TAG_LIST:
+        (count,) = _U32.unpack_from(data, offset)
+        offset += 4
+        result = []
+        for _ in range(count):
+            item, offset = _decode_from(data, offset)
+            result.append(item)
+        return result, offset
+    if tag == _TAG_NONE:
+        return None, offset
+    if tag == _TAG_TRUE:
+        return True, offset
+    if tag == _TAG_FALSE:
+        return False, offset
+    if tag == _TAG_BYTES:
+        (length,) = _U32.unpack_from(data, offset)
+        offset += 4
+        return bytes(data[offset:offset + length]), offset + length
+    raise EncodingError(f"Unknown type tag {tag:#04x} at offset {offset - 1}.")
+
+
+def decode_value(data, offset=0):
+    """
+    Decode one value starting at `offset`.
+    :return: (value, offset just past the value)
+    """
+    try:
+        return _decode_from(memoryview(data), offset)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise EncodingError(f"Truncated or malformed encoding: {e}") from e
+
+
+def encode_block_header(index, previous_hash, merkle_root, entropy, timestamp, proposer=None):
+    """
+    Canonical encoding of the hashed block header fields, in fixed order.
+    Transactions are covered through `merkle_root`. The proposer is only appended
+    when set, so blocks without one (genesis, older blocks) keep their hashes.
+    """
+    out = [_U64.pack(index)]
+    _encode_into(str(previous_hash), out)
+    _encode_into(str(merkle_root), out)
+    _encode_into(str(entropy), out)
+    out.append(_F64.pack(float(timestamp)))
+    if proposer is not None:
+        _encode_into(str(proposer), out)
+    return b"".join(out)
+
+
+def encode_transaction_fields(sender, receiver, amount, data, timestamp):
+    """
+    Canonical encoding of the hashed transaction fields, in fixed order.
+    """
+    out = []
+    _encode_into(sender, out)
+    _encode_into(receiver, out)
+    _encode_into(amount, out)
+    _encode_into(data, out)
+    out.append(_F64.pack(float(timestamp)))
+    return b"".join(out)
+
+
+def encode_block(block):
+    """
+    Wire/storage encoding of a block: version, header, proposer, block hash, then transactions.
+    """
+    out = [
+        _U8.pack(ENCODING_VERSION),
+        encode_block_header(block.index, block.previous_hash, block.merkle_root, block.entropy, block.timestamp),
+    ]
+    _encode_into(block.proposer, out)
+    _encode_into(block.hash, out)
+    _encode_into(block.transactions, out)
+    return b"".join(out)
+
+
+def decode_block_dict(data):
+    """
+    Decode `encode_block` output into a dict with the same keys as `Block.to_dict`.
+    """
+    view = memoryview(data)
+    try:
+        version = view[0]
+        if version not in (2, ENCODING_VERSION):
+            raise EncodingError(f"Unsupported block encoding version {version}.")
+        (index,) = _U64.unpack_from(view, 1)
+        previous_hash, offset = _decode_from(view, 9)
+        merkle_root, offset = _decode_from(view, offset)
+        entropy, offset = _decode_from(view, offset)
+        (timestamp,) = _F64.unpack_from(view, offset)
+        offset += 8
+        proposer = None
+        if version >= 3:
+            proposer, offset = _decode_from(view, offset)
+            if proposer is not None and not isinstance(proposer, str):
+                raise EncodingError("Block proposer must be a string.")
+        block_hash, offset = _decode_from(view, offset)
+        transactions, offset = _decode_from(view, offset)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise EncodingError(f"Truncated or malformed block encoding: {e}") from e
+    if offset != len(view):
+        raise EncodingError(f"{len(view) - offset} trailing bytes after block encoding.")
+    return {
+        "index": index,
+        "previous_hash": previous_hash,
+        "transactions": transactions,
+        "entropy": entropy,
+        "timestamp": timestamp,
+        "merkle_root": merkle_root,
+        "proposer": proposer,
+        "hash": block_hash,
+    }
@@ -0,0 +1,146 @@
+import threading
+from collections.abc import MutableMapping
+
+from blockchain.consensus import entropy_to_numeric
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is an accelerator; the pure-Python path gives identical results.
+    np = None
+
+_INT64_MAX = 2**63 - 1
+_NUMERIC_BOUND = 2**32  # entropy_to_numeric values are in [0, 2**32)
+
+
+class EntropyTable(MutableMapping):
+    """
+    node_id -> entropy mapping that hashes each entropy once.
+
+    Numeric values (`entropy_to_numeric`) are computed when an entropy is stored
+    and packed into arrays on demand, so fusion is a single vectorized pass instead
+    of a per-node SHA-256 loop; results match `weighted_average_fusion`. Leader
+    election reuses the cached numerics through `ElectionRound.from_table`.
+
+    With `weights` (a ReputationTable), the weighted sum and total weight are kept up
+    to date as entropies arrive and reputations change, so `fuse()` is O(1) per round.
+    """
+
+    def __init__(self, entropies=None, weights=None):
+        """
+        :param weights: Optional ReputationTable; `fuse()` then weighs each node by its score
+        """
+        self._entropies = {}
+        self._numerics = {}
+        self._arrays = None  # Cached (node_ids, numerics) snapshot, rebuilt after writes
+        self._weights = weights
+        self._applied_weights = {}  # node_id -> weight currently included in the running sums
+        self._weighted_sum = 0
+        self._total_weight = 0
+        self._weight_lock = threading.Lock()
+        if weights is not None:
+            weights.subscribe(self._reweigh)
+        if entropies:
+            self.update(entropies)
+
+    def __getitem__(self, node_id):
+        return self._entropies[node_id]
+
+    def __setitem__(self, node_id, entropy):
+        numeric = entropy_to_numeric(entropy)
+        if self._weights is not None:
+            with self._weight_lock:
+                self._remove_weight(node_id)
+                self._numerics[node_id] = numeric
+                self._add_weight(node_id)
+        else:
+            self._numerics[node_id] = numeric
+        self._entropies[node_id] = entropy
+        self._arrays = None
+
+    def __delitem__(self, node_id):
+        del self._entropies[node_id]
+        if self._weights is not None:
+            with self._weight_lock:
+                self._remove_weight(node_id)
+                del self._numerics[node_id]
+        else:
+            del self._numerics[node_id]
+        self._arrays = None
+
+    def _reweigh(self, node_id, old_weight, new_weight):
+        # Re-read the current score rather than trusting `new_weight`, so listeners
+        # running out of order still leave the sums matching the table.
+        with self._weight_lock:
+            if node_id in self._applied_weights:
+                self._remove_weight(node_id)
+                self._add_weight(node_id)
+
+    def _add_weight(self, node_id):
+        weight = self._weights[node_id]
+        self._applied_weights[node_id] = weight
+        self._weighted_sum += weight * self._numerics[node_id]
+        self._total_weight += weight
+
+    def _remove_weight(self, node_id):
+        weight = self._applied_weights.pop(node_id, None)
+        if weight is not None:
+            self._weighted_sum -= weight * self._numerics[node_id]
+            self._total_weight -= weight
+
+    def __iter__(self):
+        return iter(self._entropies)
+
+    def __len__(self):
+        return len(self._entropies)
+
+    def __repr__(self):
+        return f"EntropyTable({self._entropies!r})"
+
+    def numeric(self, node_id):
+        return self._numerics[node_id]
+
+    def _snapshot(self):
+        if self._arrays is None:
+            node_ids = list(self._numerics)
+            values = list(self._numerics.values())
+            if np is not None:
+                values = np.fromiter(values, dtype=np.int64, count=len(values))
+            self._arrays = (node_ids, values)
+        return self._arrays
+
+    def fuse(self, weights=None):
+        """
+        Weighted average of the numeric entropies (see `weighted_average_fusion`).
+        :param weights: Optional node_id -> weight mapping; missing nodes weigh 1. Without
+            it, a table built with `weights` uses its running reputation-weighted sums.
+        """
+        if weights is None and self._weights is not None:
+            with self._weight_lock:
+                weighted_sum, total_weight = self._weighted_sum, self._total_weight
+            return weighted_sum / total_weight if total_weight > 0 else 0
+
+        node_ids, values = self._snapshot()
+        if not node_ids:
+            return 0
+
+        if weights is None:
+            total = values.sum() if np is not None else sum(values)
+            return int(total) / len(node_ids)
+
+        weight_list = [weights.get(node_id, 1) for node_id in node_ids]
+        if np is None:
+            weighted_sum = sum(value * weight for value, weight in zip(values, weight_list))
+            total_weight = sum(weight_list)
+        elif all(type(weight) is int for weight in weight_list) and (
+            max(map(abs, weight_list)) * _NUMERIC_BOUND * len(weight_list) <= _INT64_MAX
+        ):
+            # Integer weights small enough to stay exact in int64.
+            weight_array = np.array(weight_list, dtype=np.int64)
+            weighted_sum = int(values @ weight_array)
+            total_weight = int(weight_array.sum())
+        else:
+            weight_array = np.array(weight_list, dtype=np.float64)
+            weighted_sum = float(values.astype(np.float64) @ weight_array)
+            total_weight = float(weight_array.sum())
+
+        return weighted_sum / total_weight if total_weight > 0 else 0
@@ -0,0 +1,156 @@
+import threading
+from collections import OrderedDict
+
+from blockchain.transaction import get_transaction_id
+
+MAX_SHORT_ID_INDEXES = 4  # Compact block keys whose short id index is kept up to date
+
+
+class Mempool:
+    """
+    Pending transaction pool keyed by transaction id.
+
+    Insert, lookup and removal are O(1); iteration and `take` return
+    transactions in insertion order so block proposals stay FIFO.
+    """
+
+    def __init__(self):
+        self._transactions = OrderedDict()  # transaction id -> transaction
+        self._short_ids = OrderedDict()  # compact block key -> (short id function, {short id: transaction id})
+        self._lock = threading.RLock()
+
+    def add(self, transaction):
+        """
+        Add a transaction to the pool.
+        :param transaction: Transaction dict
+        :return: True if added, False if a transaction with the same id is already pooled
+        """
+        transaction_id = get_transaction_id(transaction)
+        with self._lock:
+            if transaction_id in self._transactions:
+                return False
+            self._transactions[transaction_id] = transaction
+            self._index_short_ids(transaction_id)
+            return True
+
+    def add_many(self, transactions):
+        """
+        Add a batch of transactions under a single lock acquisition.
+        Duplicates of pooled transactions, and repeats within the batch, are skipped.
+        :param transactions: Iterable of transaction dicts
+        :return: List of the transactions that were added, in batch order
+        """
+        added = []
+        with self._lock:
+            pool = self._transactions
+            for transaction in transactions:
+                transaction_id = get_transaction_id(transaction)
+                if transaction_id not in pool:
+                    pool[transaction_id] = transaction
+                    self._index_short_ids(transaction_id)
+                    added.append(transaction)
+        return added
+
+    def get(self, transaction_id, default=None):
+        """
+        Look up a pooled transaction by id.
+        """
+        return self._transactions.get(transaction_id, default)
+
+    def remove(self, transaction_id):
+        """
+        Remove a transaction by id.
+        :return: The removed transaction, or None if it was not pooled
+        """
+        with self._lock:
+            transaction = self._transactions.pop(transaction_id, None)
+            if transaction is not None:
+                self._unindex_short_ids(transaction_id)
+            return transaction
+
+    def remove_many(self, transactions):
+        """
+        Remove every transaction in `transactions` from the pool.
+        :param transactions: Iterable of transaction dicts
+        :return: Number of transactions actually removed
+        """
+        removed = 0
+        with self._lock:
+            for transaction in transactions:
+                transaction_id = get_transaction_id(transaction)
+                if self._transactions.pop(transaction_id, None) is not None:
+                    self._unindex_short_ids(transaction_id)
+                    removed += 1
+        return removed
+
+    def take(self, limit=50):
+        """
+        Return up to `limit` transactions in insertion order without removing them.
+        """
+        with self._lock:
+            result = []
+            for transaction in self._transactions.values():
+                if len(result) >= limit:
+                    break
+                result.append(transaction)
+            return result
+
+    def to_list(self):
+        """
+        Snapshot of all pooled transactions in insertion order.
+        """
+        with self._lock:
+            return list(self._transactions.values())
+
+    def clear(self):
+        with self._lock:
+            self._transactions.clear()
+            self._short_ids.clear()
+
+    def short_id_index(self, key, short_id):
+        """
+        Short id -> transaction id for every pooled transaction, for rebuilding compact blocks.
+        The index is built once per key and then kept up to date as transactions are added
+        and removed, so rebuilding a block again only costs lookups of its own ids. Short
+        ids shared by several pooled transactions map to None.
+        :param key: Compact block short id key
+        :param short_id: Function (key, transaction id) -> short id
+        :return: Index dict; only look ids up in it, it changes with the pool
+        """
+        with self._lock:
+            entry = self._short_ids.get(key)
+            if entry is not None:
+                self._short_ids.move_to_end(key)
+                return entry[1]
+            index = {}
+            for transaction_id in self._transactions:
+                sid = short_id(key, transaction_id)
+                index[sid] = None if sid in index else transaction_id
+            self._short_ids[key] = (short_id, index)
+            if len(self._short_ids) > MAX_SHORT_ID_INDEXES:
+                self._short_ids.popitem(last=False)
+            return index
+
+    def _index_short_ids(self, transaction_id):
+        for key, (short_id, index) in self._short_ids.items():
+            sid = short_id(key, transaction_id)
+            index[sid] = None if sid in index else transaction_id
+
+    def _unindex_short_ids(self, transaction_id):
+        # A short id shared with another transaction stays None: that position is fetched instead.
+        for key, (short_id, index) in self._short_ids.items():
+            sid = short_id(key, transaction_id)
+            if index.get(sid) == transaction_id:
+                del index[sid]
+
+    def __contains__(self, transaction_id):
+        return transaction_id in self._transactions
+
+    def __len__(self):
+        return len(self._transactions)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __repr__(self):
+        return f"Mempool(Size: {len(self)})"
@@ -0,0 +1,78 @@
+import hashlib
+
+from blockchain.encoding import encode_value
+
+# Domain separation between leaves and interior nodes, so an interior node can
+# never be passed off as a transaction (second-preimage protection).
+_LEAF_PREFIX = b"\x00"
+_NODE_PREFIX = b"\x01"
+
+EMPTY_MERKLE_ROOT = hashlib.sha256(b"").hexdigest()
+
+
+def hash_leaf(transaction):
+    """
+    Hash a transaction into a Merkle leaf.
+    :param transaction: Transaction dict
+    :return: 32-byte digest
+    """
+    return hashlib.sha256(_LEAF_PREFIX + encode_value(transaction)).digest()
+
+
+def hash_node(left, right):
+    return hashlib.sha256(_NODE_PREFIX + left + right).digest()
+
+
+def _next_level(level):
+    # An unpaired last node is promoted unchanged rather than duplicated.
+    parents = [hash_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def merkle_root(transactions):
+    """
+    Compute the Merkle root of a list of transactions.
+    :return: Root as a hex string
+    """
+    level = [hash_leaf(tx) for tx in transactions]
+    if not level:
+        return EMPTY_MERKLE_ROOT
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+
+def merkle_proof(transactions, position):
+    """
+    Build an inclusion proof for the transaction at `position`.
+    :return: List of {"hash": hex, "side": "left" | "right"} steps from leaf to root
+    """
+    if position < 0 or position >= len(transactions):
+        raise IndexError("transaction position out of range")
+
+    proof = []
+    level = [hash_leaf(tx) for tx in transactions]
+    while len(level) > 1:
+        sibling = position ^ 1
+        if sibling < len(level):
+            proof.append({"hash": level[sibling].hex(), "side": "left" if sibling < position else "right"})
+        level = _next_level(level)
+        position //= 2
+    return proof
+
+
+def verify_merkle_proof(transaction, proof, root):
+    """
+    Check that `transaction` is included under `root` using an inclusion proof.
+    Runs in O(log n) hashes for a block of n transactions.
+    """
+    current = hash_leaf(transaction)
+    for step in proof:
+        sibling = bytes.fromhex(step["hash"])
+        if step["side"] == "left":
+            current = hash_node(sibling, current)
+        else:
+            current = hash_node(current, sibling)
+    return current.hex() == root
@@ -0,0 +1,215 @@
+import json
+import os
+import tempfile
+import threading
+
+DEFAULT_REPUTATION = 50  # Same starting score as Node.reputation_score
+VALIDATOR_REWARD = 5  # Vote matched the majority
+VALIDATOR_PENALTY = 5  # Vote went against the majority
+LEADER_REWARD = 10  # Proposed block was accepted
+LEADER_PENALTY = 10  # Proposed block was rejected
+
+
+class ReputationTable:
+    """
+    node_id -> integer reputation, used as entropy fusion weights.
+
+    Every change is O(1) and is pushed to listeners (see `EntropyTable(weights=...)`),
+    so weighted fusion never recomputes over all validators. Scores never drop below
+    zero, so they are always usable as weights.
+
+    With a `path`, the table is persisted as a JSON snapshot plus an append-only log
+    (`path + ".log"`). `save()` appends only the scores changed since the last save, so
+    persisting a round costs O(nodes it scored), not O(validators). Every
+    `compact_every` appends, and on `compact()`, the snapshot is rewritten atomically
+    (temporary file + rename) and the log is dropped. Loading replays the log over the
+    snapshot, ignoring a torn last line.
+
+    Durability: each save is flushed to the OS, so a crashed process loses nothing that
+    was saved. The log is only fsynced when it is compacted, so a power loss or OS crash
+    can lose the rounds saved since the last compaction (at most `compact_every`).
+    """
+
+    def __init__(self, path=None, default=DEFAULT_REPUTATION, logger=None, compact_every=1000):
+        """
+        :param path: JSON snapshot the table is persisted to, or None to keep it in memory
+        :param default: Score of nodes that were never scored
+        :param compact_every: Log appends between snapshot rewrites
+        """
+        self.path = path
+        self.log_path = path + ".log" if path else None
+        self.default = default
+        self.logger = logger
+        self.compact_every = compact_every
+        self._scores = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()  # Serializes log appends and compaction
+        self._changed = set()  # Nodes whose score changed since the last save
+        self._log = None  # Open log file, appended to by `save`
+        self._log_entries = 0  # Lines in the log since the last compaction
+        if path and (os.path.exists(path) or os.path.exists(self.log_path)):
+            self.load()
+
+    def __getitem__(self, node_id):
+        return self._scores.get(node_id, self.default)
+
+    def get(self, node_id, default=None):
+        # Mapping-style access so the table can be passed wherever a weights dict is accepted.
+        return self._scores.get(node_id, self.default if default is None else default)
+
+    def __contains__(self, node_id):
+        return node_id in self._scores
+
+    def __len__(self):
+        return len(self._scores)
+
+    def to_dict(self):
+        with self._lock:
+            return dict(self._scores)
+
+    def subscribe(self, listener):
+        """
+        :param listener: Called as listener(node_id, old_score, new_score) after every change
+        """
+        self._listeners.append(listener)
+
+    def adjust(self, node_id, delta):
+        """
+        Add `delta` to a node's score, flooring it at zero.
+        :return: The new score
+        """
+        with self._lock:
+            old = self._scores.get(node_id, self.default)
+            new = max(0, old + int(delta))
+            self._scores[node_id] = new
+            self._changed.add(node_id)
+        if new != old:
+            for listener in self._listeners:
+                listener(node_id, old, new)
+        return new
+
+    def record_round(self, votes, decision, proposer=None):
+        """
+        Score one decided round: validators for agreeing with the majority, the proposer
+        for the outcome of its block.
+        :param votes: node_id -> "valid" or "invalid"
+        :param decision: "accepted" or "rejected"
+        """
+        majority_status = "valid" if decision == "accepted" else "invalid"
+        for node_id, status in votes.items():
+            if node_id == proposer:
+                continue
+            self.adjust(node_id, VALIDATOR_REWARD if status == majority_status else -VALIDATOR_PENALTY)
+        if proposer is not None:
+            self.adjust(proposer, LEADER_REWARD if decision == "accepted" else -LEADER_PENALTY)
+
+    def load(self):
+        """
+        Read the snapshot, then replay the log over it.
+        """
+        scores = {}
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    scores = json.load(f)
+            entries = 0
+            if os.path.exists(self.log_path):
+                with open(self.log_path, "r+b") as f:
+                    valid_end = 0
+                    for line in f:
+                        try:
+                            if not line.endswith(b"\n"):
+                                raise ValueError("unterminated entry")
+                            scores.update(json.loads(line))
+                        except ValueError:
+                            # Only the last line can be torn (crash mid-append); it was never saved.
+                            # Cut it off so later appends start on a fresh line.
+                            if self.logger:
+                                self.logger.warning(f"Dropping a torn entry at the end of {self.log_path}.")
+                            f.truncate(valid_end)
+                            break
+                        valid_end += len(line)
+                        entries += 1
+            self._scores = {str(node_id): max(0, int(score)) for node_id, score in scores.items()}
+            self._log_entries = entries
+            if self.logger:
+                self.logger.info(f"Loaded {len(self._scores)} reputation scores from {self.path} ({entries} log entries).")
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Could not load reputation scores from {self.path}: {str(e)}")
+
+    def save(self):
+        """
+        Append the scores that changed since the last save to the log, compacting it every
+        `compact_every` appends.
+        :return: True if anything was written
+        """
+        if not self.path:
+            return False
+        with self._lock:
+            if not self._changed:
+                return False
+            changed = {node_id: self._scores[node_id] for node_id in self._changed}
+            self._changed = set()
+
+        try:
+            with self._file_lock:
+                if self._log is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                    self._log = open(self.log_path, "a", encoding="utf-8")
+                self._log.write(json.dumps(changed, sort_keys=True) + "\n")
+                self._log.flush()
+                self._log_entries += 1
+                compact = self._log_entries >= self.compact_every
+        except Exception:
+            with self._lock:
+                self._changed.update(changed)
+            raise
+        if compact:
+            self.compact()
+        return True
+
+    def compact(self):
+        """
+        Rewrite the snapshot with every score and drop the log. The snapshot is replaced
+        atomically, so a crash mid-write leaves the previous snapshot and the log intact.
+        :return: True if the snapshot was written
+        """
+        if not self.path:
+            return False
+        with self._file_lock:
+            with self._lock:
+                scores = dict(self._scores)
+                changed, self._changed = self._changed, set()
+
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".reputation-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(scores, f, sort_keys=True)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_path, self.path)
+            except Exception:
+                with self._lock:
+                    self._changed.update(changed)
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+
+            # Replaying the log over the new snapshot would change nothing, so dropping it is safe.
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            if os.path.exists(self.log_path):
+                os.remove(self.log_path)
+            self._log_entries = 0
+        return True
+
+    def close(self):
+        """
+        Compact the log on shutdown.
+        """
+        self.compact()
@@ -0,0 +1,200 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from blockchain.encoding import encode_value
+from utils.crypto import load_public_key_cached, public_key_cache, serialize_public_key, sign_data, verify_signature
+
+PUBLIC_KEY_FIELD = "public_key"  # PEM (SubjectPublicKeyInfo) of the signer; Ed25519 or RSA
+SIGNATURE_FIELD = "signature"  # Hex signature over `signing_payload`
+
+
+def signing_payload(transaction):
+    """
+    Bytes a transaction signature covers: the canonical encoding of every field but the signature.
+    """
+    return encode_value({key: value for key, value in transaction.items() if key != SIGNATURE_FIELD})
+
+
+def sign_transaction(transaction, private_key):
+    """
+    :param private_key: Ed25519 (recommended) or RSA private key
+    :return: Copy of `transaction` carrying the signer's public key and signature
+    """
+    signed = {key: value for key, value in transaction.items() if key != SIGNATURE_FIELD}
+    signed[PUBLIC_KEY_FIELD] = serialize_public_key(private_key.public_key()).decode("ascii")
+    signed[SIGNATURE_FIELD] = sign_data(private_key, signing_payload(signed)).hex()
+    return signed
+
+
+def is_signed(transaction):
+    return (
+        isinstance(transaction, dict)
+        and isinstance(transaction.get(PUBLIC_KEY_FIELD), str)
+        and isinstance(transaction.get(SIGNATURE_FIELD), str)
+    )
+
+
+def verify_transaction_signature(transaction):
+    """
+    :return: True if the transaction is signed by the key it carries, False otherwise
+    """
+    try:
+        public_key = load_public_key_cached(transaction[PUBLIC_KEY_FIELD])  # Repeat senders skip PEM parsing
+        signature = bytes.fromhex(transaction[SIGNATURE_FIELD])
+        return verify_signature(public_key, signing_payload(transaction), signature)
+    except Exception:
+        return False
+
+
+def verify_batch(transactions):
+    """
+    Worker entry point: verify a batch in one task, so IPC is paid per batch, not per signature.
+    """
+    return [verify_transaction_signature(transaction) for transaction in transactions]
+
+
+def _verify_chunk(transactions):
+    """
+    Pool task: verdicts for one chunk, plus this worker's public-key cache counters,
+    which the parent cannot read directly.
+    """
+    return os.getpid(), verify_batch(transactions), public_key_cache.stats()
+
+
+def _cache_key(transaction):
+    # Covers the signed content and the signature, not just the client-chosen id, so a
+    # different transaction reusing a verified id is never answered from the cache.
+    try:
+        digest = hashlib.blake2b(signing_payload(transaction), digest_size=16)
+        digest.update(transaction[SIGNATURE_FIELD].encode("ascii"))
+    except Exception:
+        return None  # Not encodable, so it cannot verify either
+    return digest.digest()
+
+
+class SignatureVerifier:
+    """
+    Verifies transaction signatures in batches on a process pool, remembering verified
+    transactions in an LRU cache so gossip repeats and re-submissions are not re-verified.
+
+    Small batches (fewer than `inline_below` uncached signatures) are verified in the
+    calling thread, where pool round trips would cost more than the verification.
+    """
+
+    def __init__(self, workers=None, batch_size=256, inline_below=64, cache_size=100_000, logger=None):
+        """
+        :param workers: Verification processes (default: CPU count)
+        :param batch_size: Most signatures sent to a worker in one task
+        :param inline_below: Verify smaller batches without the pool
+        :param cache_size: Verified transactions remembered
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.inline_below = inline_below
+        self.cache_size = cache_size
+        self.logger = logger
+        self.stats = {"verified": 0, "rejected": 0, "cache_hits": 0}
+        self._cache = OrderedDict()  # cache key -> None, least recently used first
+        self._worker_key_stats = {}  # worker pid -> latest public-key cache stats reported by it
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                # Spawned workers: forking a multithreaded server process can deadlock.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    def verify(self, transaction):
+        return self.verify_many([transaction])[0]
+
+    def verify_many(self, transactions):
+        """
+        :param transactions: List of transaction dicts
+        :return: List of booleans, one per transaction
+        """
+        results = [False] * len(transactions)
+        keys = [_cache_key(transaction) if is_signed(transaction) else None for transaction in transactions]
+        pending = OrderedDict()  # cache key -> (transaction, positions), first occurrence verified once
+        hits = 0
+        with self._lock:
+            for position, (transaction, key) in enumerate(zip(transactions, keys)):
+                if key is None:
+                    continue
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    results[position] = True
+                    hits += 1
+                elif key in pending:
+                    pending[key][1].append(position)
+                else:
+                    pending[key] = (transaction, [position])
+            self.stats["cache_hits"] += hits
+
+        if not pending:
+            return results
+
+        batch = [transaction for transaction, _ in pending.values()]
+        verdicts = self._verify_uncached(batch)
+
+        with self._lock:
+            for (key, (_, positions)), valid in zip(pending.items(), verdicts):
+                for position in positions:
+                    results[position] = valid
+                if valid:
+                    self._cache[key] = None
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            accepted = sum(verdicts)
+            self.stats["verified"] += accepted
+            self.stats["rejected"] += len(verdicts) - accepted
+        return results
+
+    def _verify_uncached(self, transactions):
+        if len(transactions) < self.inline_below or self.workers == 1:
+            return verify_batch(transactions)
+
+        # Spread the work over every worker, in chunks of at most `batch_size`.
+        chunk_size = max(1, min(self.batch_size, -(-len(transactions) // self.workers)))
+        chunks = [transactions[i:i + chunk_size] for i in range(0, len(transactions), chunk_size)]
+        verdicts = []
+        try:
+            for pid, chunk_verdicts, key_stats in self._pool().map(_verify_chunk, chunks):
+                verdicts.extend(chunk_verdicts)
+                with self._lock:
+                    self._worker_key_stats[pid] = key_stats
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Signature worker pool failed, verifying {len(transactions)} inline: {str(e)}")
+            with self._lock:
+                self._executor = None  # A broken pool is replaced on the next batch
+            return verify_batch(transactions)
+        return verdicts
+
+    def key_cache_stats(self):
+        """
+        Public-key cache counters for this process and, summed, for the pool workers
+        (as of each worker's latest chunk; a replaced pool's workers are still counted).
+        :return: {"in_process": {...}, "workers": {...}}, each as `PublicKeyCache.stats()`
+        """
+        with self._lock:
+            reports = list(self._worker_key_stats.values())
+        workers = {
+            field: sum(report[field] for report in reports) for field in ("size", "hits", "misses", "evictions")
+        }
+        lookups = workers["hits"] + workers["misses"]
+        workers["hit_rate"] = workers["hits"] / lookups if lookups else None
+        return {"in_process": public_key_cache.stats(), "workers": workers}
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,219 @@
+import os
+from array import array
+import struct
+import time
+import zlib
+
+from blockchain.block import Block
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class BlockStore:
+    """
+    Append-only on-disk block store.
+
+    Blocks are written to a single segment file as length-prefixed records
+    (`length`, `crc32`, `payload`). A companion index file holds one fixed-size
+    (`offset`, `length`) entry per height so reads are a single seek.
+
+    On open, the index is reconciled with the segment: index entries that point
+    past the end of the segment are dropped, records written after the last
+    index entry are re-indexed, and a torn or corrupt record at the tail of the
+    segment (e.g. from a crash mid-write) is truncated away.
+    """
+
+    SEGMENT_FILE = "blocks.dat"
+    INDEX_FILE = "blocks.idx"
+    RECORD_HEADER = struct.Struct(">II")  # payload length, payload crc32
+    INDEX_ENTRY = struct.Struct(">QI")  # record offset, payload length
+
+    def __init__(self, directory, fsync_policy="always", fsync_interval=1.0, logger=None):
+        """
+        Open (or create) a block store.
+        :param directory: Directory holding the segment and index files
+        :param fsync_policy: "always" (fsync every append), "interval" (at most
+            once per `fsync_interval` seconds) or "never" (leave it to the OS)
+        :param fsync_interval: Seconds between fsyncs for the "interval" policy
+        :param logger: Optional logger
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync_policy!r}. Expected one of {FSYNC_POLICIES}.")
+
+        self.directory = directory
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+        self.logger = logger
+        self._last_fsync = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        self.segment_path = os.path.join(directory, self.SEGMENT_FILE)
+        self.index_path = os.path.join(directory, self.INDEX_FILE)
+        self._segment = self._open(self.segment_path)
+        self._index = self._open(self.index_path)
+        self._offsets = array("Q")  # height -> record offset
+        self._lengths = array("I")  # height -> payload length
+        self._recover()
+
+    @staticmethod
+    def _open(path):
+        if not os.path.exists(path):
+            open(path, "wb").close()
+        return open(path, "r+b")
+
+    def _recover(self):
+        """
+        Load the index and reconcile it with the segment file.
+        """
+        segment_size = os.fstat(self._segment.fileno()).st_size
+
+        # Load whole index entries; a torn trailing entry is dropped.
+        self._index.seek(0)
+        raw_index = self._index.read()
+        entry_size = self.INDEX_ENTRY.size
+        for offset, length in self.INDEX_ENTRY.iter_unpack(raw_index[:len(raw_index) - len(raw_index) % entry_size]):
+            self._offsets.append(offset)
+            self._lengths.append(length)
+
+        # Drop index entries whose record is missing or corrupt in the segment.
+        while self._offsets:
+            offset, length = self._offsets[-1], self._lengths[-1]
+            if offset + self.RECORD_HEADER.size + length <= segment_size and self._record_intact(offset, length):
+                break
+            self._offsets.pop()
+            self._lengths.pop()
+
+        # Re-index any complete records written after the last index entry.
+        if self._offsets:
+            position = self._offsets[-1] + self.RECORD_HEADER.size + self._lengths[-1]
+        else:
+            position = 0
+
+        self._segment.seek(position)
+        while position < segment_size:
+            header = self._segment.read(self.RECORD_HEADER.size)
+            if len(header) < self.RECORD_HEADER.size:
+                break
+            length, checksum = self.RECORD_HEADER.unpack(header)
+            payload = self._segment.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                break
+            self._offsets.append(position)
+            self._lengths.append(length)
+            position += self.RECORD_HEADER.size + length
+
+        if position < segment_size:
+            if self.logger:
+                self.logger.warning(
+                    f"Truncating torn block store tail at offset {position} ({segment_size - position} bytes)."
+                )
+            self._segment.truncate(position)
+
+        # Rewrite the index so it matches the recovered entries exactly.
+        if len(raw_index) != len(self) * entry_size:
+            self._index.seek(0)
+            self._index.truncate()
+            self._index.write(b"".join(map(self.INDEX_ENTRY.pack, self._offsets, self._lengths)))
+            self._index.flush()
+            os.fsync(self._index.fileno())
+
+        self._segment.seek(0, os.SEEK_END)
+        self._index.seek(0, os.SEEK_END)
+
+        if self.logger:
+            self.logger.info(f"Block store opened at {self.directory} with {len(self)} blocks.")
+
+    def _record_intact(self, offset, length):
+        header = os.pread(self._segment.fileno(), self.RECORD_HEADER.size, offset)
+        if len(header) < self.RECORD_HEADER.size:
+            return False
+        stored_length, checksum = self.RECORD_HEADER.unpack(header)
+        payload = os.pread(self._segment.fileno(), length, offset + self.RECORD_HEADER.size)
+        return stored_length == length and zlib.crc32(payload) == checksum
+
+    @staticmethod
+    def encode_block(block):
+        return block.to_bytes()
+
+    @staticmethod
+    def decode_block(payload):
+        return Block.from_bytes(payload)
+
+    def append(self, block):
+        """
+        Append a block to the segment and index.
+        :return: Height of the stored block
+        """
+        payload = self.encode_block(block)
+        offset = self._segment.seek(0, os.SEEK_END)
+        self._segment.write(self.RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        self._segment.flush()
+
+        # The record is made durable before its index entry is written, so a
+        # crash can leave unindexed records (re-indexed on open) but never an
+        # index entry without its record.
+        fsync_due = self._fsync_due()
+        if fsync_due:
+            os.fsync(self._segment.fileno())
+        self._index.write(self.INDEX_ENTRY.pack(offset, len(payload)))
+        self._index.flush()
+        if fsync_due:
+            os.fsync(self._index.fileno())
+            self._last_fsync = time.monotonic()
+
+        self._offsets.append(offset)
+        self._lengths.append(len(payload))
+        return len(self) - 1
+
+    def _fsync_due(self):
+        if self.fsync_policy == "never":
+            return False
+        if self.fsync_policy == "interval":
+            return time.monotonic() - self._last_fsync >= self.fsync_interval
+        return True
+
+    def payload_range(self, height):
+        """
+        Byte range (start, end) of the payload stored at `height` within the segment file.
+        """
+        start = self._offsets[height] + self.RECORD_HEADER.size
+        return start, start + self._lengths[height]
+
+    def segment_fileno(self):
+        return self._segment.fileno()
+
+    def read_payload(self, height):
+        start, end = self.payload_range(height)
+        return os.pread(self._segment.fileno(), end - start, start)
+
+    def read(self, height):
+        """
+        Read the block stored at `height`.
+        """
+        return self.decode_block(self.read_payload(height))
+
+    def __iter__(self):
+        """
+        Iterate over all stored blocks in height order.
+        """
+        for height in range(len(self)):
+            yield self.read(height)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def sync(self):
+        """
+        Flush and fsync both files regardless of the fsync policy.
+        """
+        self._segment.flush()
+        self._index.flush()
+        os.fsync(self._segment.fileno())
+        os.fsync(self._index.fileno())
+        self._last_fsync = time.monotonic()
+
+    def close(self):
+        if self.fsync_policy != "never":
+            self.sync()
+        self._segment.close()
+        self._index.close()
@@ -1,20 +1,51 @@
 import hashlib
 import time
 
+from blockchain.encoding import encode_transaction_fields
+
+def get_transaction_id(transaction):
+    """
+    Return the id of a transaction dict ("id", falling back to "transaction_id").
+    """
+    transaction_id = transaction.get("id")
+    if transaction_id is None:
+        transaction_id = transaction.get("transaction_id")
+    return transaction_id
+
 class Transaction:
+    """
+    Immutable transaction. The id (hash) is computed once at construction;
+    assigning to a hashed field afterwards raises AttributeError.
+    """
+
+    __slots__ = ("sender", "receiver", "amount", "data", "timestamp", "transaction_id")
+
     def __init__(self, sender, receiver, amount, data=None, timestamp=None):
-   
-        self.sender = sender
-        self.receiver = receiver
-        self.amount = amount
-        self.data = data or ""
-        self.timestamp = timestamp or time.time()
-        self.transaction_id = self.compute_hash()
+        set_field = object.__setattr__
+        set_field(self, "sender", sender)
+        set_field(self, "receiver", receiver)
+        set_field(self, "amount", amount)
+        set_field(self, "data", data or "")
+        set_field(self, "timestamp", timestamp or time.time())
+        set_field(self, "transaction_id", self._hash_fields())
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Transaction field '{name}' cannot be changed after the transaction is hashed.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Transaction field '{name}' cannot be deleted.")
+
+    def _hash_fields(self):
+        transaction_data = encode_transaction_fields(
+            self.sender, self.receiver, self.amount, self.data, self.timestamp
+        )
+        return hashlib.sha256(transaction_data).hexdigest()
 
     def compute_hash(self):
-      
-        transaction_data = f"{self.sender}{self.receiver}{self.amount}{self.data}{self.timestamp}"
-        return hashlib.sha256(transaction_data.encode()).hexdigest()
+        """
+        Hash of the transaction fields (cached as `transaction_id`).
+        """
+        return self.transaction_id
 
     def validate(self):
       
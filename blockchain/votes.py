@@ -0,0 +1,178 @@
+import threading
+import time
+from collections import OrderedDict
+
+VALID = "valid"
+INVALID = "invalid"
+
+
+class VoteRound:
+    """
+    Votes for one proposed block. Counters are updated per vote, so checking for a
+    quorum never rescans the votes.
+    """
+
+    __slots__ = (
+        "block_index", "block_hash", "voters", "valid", "invalid", "decision", "result", "created_at", "decided_at",
+        "settled",
+    )
+
+    def __init__(self, block_index, block_hash, created_at):
+        self.block_index = block_index
+        self.block_hash = block_hash
+        self.voters = {}  # node_id -> status, until the round is decided
+        self.valid = 0
+        self.invalid = 0
+        self.decision = None  # "accepted" or "rejected" once a majority agrees
+        self.result = None  # Whatever the quorum callback returned ("error" if it raised)
+        self.created_at = created_at
+        self.decided_at = None  # Set with `decision`, before the quorum callback runs
+        self.settled = False  # True once the quorum callback has returned (or raised)
+
+    def __repr__(self):
+        return (
+            f"VoteRound(Index: {self.block_index}, Hash: {self.block_hash}, "
+            f"Valid: {self.valid}, Invalid: {self.invalid}, Decision: {self.decision})"
+        )
+
+
+class VoteTracker:
+    """
+    Validation votes keyed by (block index, block hash).
+
+    Each node votes at most once per round. The first vote that gives either side a
+    strict majority of `total_nodes` decides the round and fires `on_quorum(round)`
+    exactly once. Rounds older than `round_timeout` seconds, decided or not, are evicted;
+    the keys and decisions of evicted decided rounds are kept in a bounded LRU, so a late
+    or replayed vote for one is answered "decided" instead of opening the round again.
+    """
+
+    def __init__(
+        self, total_nodes, on_quorum=None, round_timeout=120.0, clock=time.monotonic, logger=None,
+        max_closed_rounds=10_000,
+    ):
+        """
+        :param total_nodes: Network size, or a callable returning it (peers can change)
+        :param on_quorum: Called with the VoteRound when it is decided; its return value is kept as `round.result`
+        :param round_timeout: Seconds a round is kept after its first vote
+        :param max_closed_rounds: Evicted decided rounds remembered to refuse late votes
+        """
+        self._total_nodes = total_nodes if callable(total_nodes) else (lambda: total_nodes)
+        self.on_quorum = on_quorum
+        self.logger = logger
+        self.round_timeout = round_timeout
+        self._clock = clock
+        self._rounds = OrderedDict()  # (block_index, block_hash) -> VoteRound, oldest first
+        self._closed = OrderedDict()  # (block_index, block_hash) -> decision of evicted decided rounds, LRU
+        self.max_closed_rounds = max_closed_rounds
+        self._lock = threading.Lock()
+        self._decided = threading.Condition(self._lock)
+
+    def record(self, block_index, block_hash, node_id, status):
+        """
+        Count one vote.
+        :param status: "valid" or "invalid"
+        :return: "accepted" or "rejected" for the deciding vote, "decided" for votes after
+                 the decision, "duplicate" for a repeat voter, otherwise "pending"
+        """
+        if status not in (VALID, INVALID):
+            raise ValueError(f"Unknown vote status: {status!r}")
+
+        now = self._clock()
+        key = (block_index, block_hash)
+        with self._lock:
+            self._evict(now)
+            if key in self._closed:
+                self._closed.move_to_end(key)
+                return "decided"
+            vote_round = self._rounds.get(key)
+            if vote_round is None:
+                vote_round = self._rounds[key] = VoteRound(block_index, block_hash, now)
+            if vote_round.decision is not None:
+                return "decided"
+            if node_id in vote_round.voters:
+                return "duplicate"
+
+            vote_round.voters[node_id] = status
+            if status == VALID:
+                vote_round.valid += 1
+            else:
+                vote_round.invalid += 1
+
+            majority = self._total_nodes() // 2
+            if vote_round.valid > majority:
+                vote_round.decision = "accepted"
+            elif vote_round.invalid > majority:
+                vote_round.decision = "rejected"
+            else:
+                return "pending"
+            vote_round.decided_at = now
+
+        # Outside the lock, so the callback may record votes or query the tracker.
+        # It still sees `voters`; later votes are answered from `decision`.
+        try:
+            if self.on_quorum:
+                vote_round.result = self.on_quorum(vote_round)
+        except Exception as e:
+            vote_round.result = "error"
+            if self.logger:
+                self.logger.error(f"Quorum callback failed for block {block_index} ({block_hash}): {str(e)}")
+        finally:
+            with self._decided:
+                vote_round.voters = {}
+                vote_round.settled = True
+                self._decided.notify_all()
+        return vote_round.decision
+
+    def get(self, block_index, block_hash):
+        with self._lock:
+            return self._rounds.get((block_index, block_hash))
+
+    def decision(self, block_index, block_hash):
+        key = (block_index, block_hash)
+        with self._lock:
+            vote_round = self._rounds.get(key)
+            return vote_round.decision if vote_round else self._closed.get(key)
+
+    def wait_for_decision(self, block_index, block_hash, timeout=None):
+        """
+        Block until the round is decided and `on_quorum` has returned (or raised), even if
+        no vote for it has arrived yet.
+        :return: The decided VoteRound, or None if `timeout` seconds pass first
+        """
+        key = (block_index, block_hash)
+
+        def settled():
+            vote_round = self._rounds.get(key)
+            return vote_round if vote_round and vote_round.settled else None
+
+        with self._decided:
+            return self._decided.wait_for(settled, timeout)
+
+    def evict_stale(self):
+        """
+        Drop rounds older than `round_timeout`, remembering the decisions of decided ones.
+        :return: Number of rounds evicted
+        """
+        with self._lock:
+            return self._evict(self._clock())
+
+    def _evict(self, now):
+        evicted = 0
+        cutoff = now - self.round_timeout
+        rounds = self._rounds
+        while rounds:
+            key, vote_round = next(iter(rounds.items()))
+            if vote_round.created_at > cutoff:
+                break
+            del rounds[key]
+            evicted += 1
+            if vote_round.decision is not None:
+                closed = self._closed
+                closed[key] = vote_round.decision
+                if len(closed) > self.max_closed_rounds:
+                    closed.popitem(last=False)
+        return evicted
+
+    def __len__(self):
+        return len(self._rounds)
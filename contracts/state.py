@@ -0,0 +1,157 @@
+from collections import deque
+
+
+class StateError(ValueError):
+    """
+    Raised when a batch of transfers cannot be applied; nothing from the batch is committed.
+    """
+
+    def __init__(self, message, position=None):
+        super().__init__(message)
+        self.position = position  # Index of the first failing transfer in the batch
+
+
+class BlockDiff:
+    """
+    Values a block overwrote, so the block can be undone. None marks an entry that did not exist.
+    """
+
+    __slots__ = ("block_index", "block_hash", "balances", "allowances")
+
+    def __init__(self, block_index, block_hash, balances, allowances):
+        self.block_index = block_index
+        self.block_hash = block_hash
+        self.balances = balances  # address -> previous balance
+        self.allowances = allowances  # (owner, spender) -> previous allowance
+
+    def __repr__(self):
+        return (
+            f"BlockDiff(Index: {self.block_index}, Hash: {self.block_hash}, "
+            f"Accounts: {len(self.balances)}, Allowances: {len(self.allowances)})"
+        )
+
+
+class AccountState:
+    """
+    Balances and allowances updated one block at a time.
+
+    `apply_transfers` checks a whole batch against a scratch overlay first, in order,
+    and only then writes the touched accounts back, so a failing transfer leaves the
+    state untouched. Each applied batch keeps a diff of the values it overwrote, which
+    makes undoing recent blocks (on a reorg) proportional to the accounts they touched.
+    """
+
+    def __init__(self, balances=None, allowances=None, max_diffs=100):
+        """
+        :param balances: address -> balance dict to update in place (e.g. TokenContract.balances)
+        :param allowances: {owner: {spender: amount}} dict to update in place
+        :param max_diffs: Most recent blocks that can be rolled back
+        """
+        self.balances = {} if balances is None else balances
+        self.allowances = {} if allowances is None else allowances
+        self.diffs = deque(maxlen=max_diffs)  # Oldest first; rollback pops from the right
+
+    def apply_transfers(self, transfers, block_index=None, block_hash=None):
+        """
+        Apply a batch of transfers atomically.
+        :param transfers: Iterable of (sender, receiver, amount, spender) tuples; spender is None
+            for a plain transfer, otherwise the transfer spends the sender's allowance for spender
+        :return: BlockDiff of the batch
+        :raises StateError: If any transfer is invalid; nothing is applied
+        """
+        balances = self.balances
+        allowances = self.allowances
+        touched = {}  # address -> balance after the transfers so far
+        touched_allowances = {}  # (owner, spender) -> allowance after the transfers so far
+        balance = balances.get
+        touched_balance = touched.get
+
+        position = 0
+        try:
+            for position, (sender, receiver, amount, spender) in enumerate(transfers):
+                if amount <= 0:
+                    raise StateError(f"Transfer {position}: amount must be greater than 0", position)
+
+                sender_balance = touched_balance(sender)
+                if sender_balance is None:
+                    sender_balance = balance(sender, 0)
+                if sender_balance < amount:
+                    raise StateError(f"Transfer {position}: insufficient balance for {sender}", position)
+
+                if spender is not None:
+                    key = (sender, spender)
+                    allowed = touched_allowances.get(key)
+                    if allowed is None:
+                        allowed = allowances.get(sender, {}).get(spender, 0)
+                    if allowed < amount:
+                        raise StateError(f"Transfer {position}: amount exceeds allowance of {spender}", position)
+                    touched_allowances[key] = allowed - amount
+
+                touched[sender] = sender_balance - amount
+                receiver_balance = touched_balance(receiver)
+                if receiver_balance is None:
+                    receiver_balance = balance(receiver, 0)
+                touched[receiver] = receiver_balance + amount
+        except (TypeError, ValueError) as e:
+            if isinstance(e, StateError):
+                raise
+            raise StateError(f"Transfer {position}: malformed transfer: {str(e)}", position) from e
+
+        # Every check passed: record what is overwritten, then write back in one pass.
+        diff = BlockDiff(
+            block_index,
+            block_hash,
+            {address: balances.get(address) for address in touched},
+            {key: allowances.get(key[0], {}).get(key[1]) for key in touched_allowances},
+        )
+        balances.update(touched)
+        for (owner, spender), allowed in touched_allowances.items():
+            allowances.setdefault(owner, {})[spender] = allowed
+        self.diffs.append(diff)
+        return diff
+
+    def rollback(self, block_hash=None):
+        """
+        Undo the most recently applied batch.
+        :param block_hash: If given, the batch must belong to this block
+        :return: The BlockDiff that was undone
+        :raises StateError: If there is nothing to roll back or the latest batch is another block's
+        """
+        if not self.diffs:
+            raise StateError("No applied blocks left to roll back")
+        diff = self.diffs[-1]
+        if block_hash is not None and diff.block_hash != block_hash:
+            raise StateError(f"Latest applied block is {diff.block_hash}, not {block_hash}")
+        self.diffs.pop()
+
+        balances = self.balances
+        for address, previous in diff.balances.items():
+            if previous is None:
+                balances.pop(address, None)
+            else:
+                balances[address] = previous
+
+        allowances = self.allowances
+        for (owner, spender), previous in diff.allowances.items():
+            if previous is None:
+                spenders = allowances.get(owner, {})
+                spenders.pop(spender, None)
+                if not spenders:
+                    allowances.pop(owner, None)
+            else:
+                allowances.setdefault(owner, {})[spender] = previous
+        return diff
+
+
+def block_transfers(block):
+    """
+    Token transfers in a block, in block order: transactions with sender, receiver and
+    amount fields (plus an optional spender for allowance transfers). Other
+    transactions are ignored.
+    :return: List of (sender, receiver, amount, spender) tuples
+    """
+    return [
+        (transaction["sender"], transaction["receiver"], transaction["amount"], transaction.get("spender"))
+        for transaction in block.transactions
+        if isinstance(transaction, dict) and "sender" in transaction and "receiver" in transaction and "amount" in transaction
+    ]
@@ -1,3 +1,6 @@
+from contracts.state import AccountState, block_transfers
+
+
 class TokenContract:
     def __init__(self, name, symbol, total_supply, creator_address):
         """
@@ -12,6 +15,7 @@ class TokenContract:
         self.total_supply = total_supply
         self.balances = {creator_address: total_supply}  # Assign all tokens to the creator
         self.allowances = {}  # {owner: {spender: amount}}
+        self.state = AccountState(self.balances, self.allowances)  # Block-level batches over the same dicts
 
     def transfer(self, sender, receiver, amount):
         """
@@ -76,3 +80,21 @@ class TokenContract:
         self.allowances[owner][spender] -= amount
         self.balances[receiver] = self.balances.get(receiver, 0) + amount
         return True
+
+    def apply_block(self, block):
+        """
+        Apply every token transfer in a block as one batch: all of them are checked before
+        any balance changes, so a failing transfer leaves the contract untouched.
+        :param block: Block whose transactions carry sender, receiver and amount (and optionally spender)
+        :return: BlockDiff that `rollback_block` uses to undo the block
+        :raises StateError: If any transfer in the block is invalid
+        """
+        return self.state.apply_transfers(block_transfers(block), block.index, block.hash)
+
+    def rollback_block(self, block=None):
+        """
+        Undo the most recently applied block, e.g. when a reorg drops it.
+        :param block: If given, the block expected to be undone
+        :return: The BlockDiff that was undone
+        """
+        return self.state.rollback(block.hash if block is not None else None)
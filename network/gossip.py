@@ -0,0 +1,111 @@
+import threading
+import time
+
+
+class TransactionGossip:
+    """
+    Batches outgoing transactions so peers receive one `/add_transactions` request
+    per batch instead of one `/add_transaction` request per transaction.
+
+    A batch is flushed when it reaches `max_batch` transactions or when its oldest
+    transaction has waited `max_delay` seconds, whichever comes first.
+    """
+
+    def __init__(self, p2p_network, max_batch=500, max_delay=0.05, logger=None):
+        """
+        :param p2p_network: P2PNetwork used to fan batches out to peers
+        :param max_batch: Maximum transactions per batch
+        :param max_delay: Maximum seconds a transaction waits before its batch is sent
+        """
+        self.p2p_network = p2p_network
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.logger = logger
+        self.batches_sent = 0
+        self.transactions_sent = 0
+        self._pending = []
+        self._first_pending_at = None
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, name="transaction-gossip", daemon=True)
+        self._thread.start()
+
+    def stop(self, flush=True):
+        """
+        Stop the sender thread, sending whatever is still pending unless `flush` is False.
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self._send(self._drain())
+
+    def submit(self, transaction):
+        self.submit_many([transaction])
+
+    def submit_many(self, transactions):
+        """
+        Queue transactions for the next batch.
+        """
+        if not transactions:
+            return
+        with self._condition:
+            if not self._pending:
+                self._first_pending_at = time.monotonic()
+            self._pending.extend(transactions)
+            if len(self._pending) >= self.max_batch or len(self._pending) == len(transactions):
+                # Wake the sender for a full batch, or to start timing a new one.
+                self._condition.notify()
+
+    def flush(self):
+        """
+        Send everything pending now, on the calling thread.
+        """
+        self._send(self._drain())
+
+    def _drain(self):
+        with self._condition:
+            batch, self._pending = self._pending, []
+            self._first_pending_at = None
+            return batch
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running:
+                    if len(self._pending) >= self.max_batch:
+                        break
+                    if self._pending:
+                        remaining = self._first_pending_at + self.max_delay - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                if not self._running:
+                    return
+                batch = self._pending[:self.max_batch]
+                del self._pending[:self.max_batch]
+                self._first_pending_at = time.monotonic() if self._pending else None
+            self._send(batch)
+
+    def _send(self, batch):
+        if not batch:
+            return
+        try:
+            self.p2p_network.fan_out("add_transactions", batch, description=f"transaction batch ({len(batch)})")
+            self.batches_sent += 1
+            self.transactions_sent += len(batch)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to gossip batch of {len(batch)} transactions: {str(e)}")
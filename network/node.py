@@ -1,8 +1,10 @@
-from blockchain.consensus import henon_entropy, reorder_transactions, weighted_minkowski_distance, entropy_to_numeric
+from blockchain.consensus import henon_entropy, reorder_transactions, entropy_to_numeric, find_order_mismatch
 from blockchain.block import Block
+from blockchain.transaction import get_transaction_id
+from blockchain.reputation import LEADER_PENALTY, LEADER_REWARD, VALIDATOR_PENALTY, VALIDATOR_REWARD
+from blockchain.votes import VoteTracker
 from utils.logger import setup_logger
-import random
-import requests 
+import threading
 
 node_logger = setup_logger(name="BlockchainNode", log_file="blockchain_system.log", level="DEBUG")
 
@@ -14,19 +16,22 @@ def leader_only(func):
     return wrapper
 
 class Node:
-    def __init__(self, node_id, blockchain,logger=None,p2p_network=None):
+    def __init__(self, node_id, blockchain,logger=None,p2p_network=None,gossip=None):
         self.node_id = node_id
         self.blockchain = blockchain
         self.logger = logger or setup_logger(name=node_id)  # Use provided logger or default
-        self.transaction_pool = []  # Local transaction pool
+        self.transaction_pool = blockchain.pending_transactions  # Shared Mempool with the blockchain
         self.entropy = None  # Node-specific entropy
         self.is_leader = False  # Indicates if the node is the leader
         self.leader_id = None  # Track the current leader ID
-        self.reputation_score = 50  # Default reputation score for the node
         self.p2p_network = p2p_network  # Reference to the P2P network instance
+        self.gossip = gossip  # Optional TransactionGossip batching outgoing transactions
         self.processed_transactions = set()  # Track processed transaction IDs
-        self.processed_blocks = set()  # Track processed block indices (to prevent reprocessing)
-        self.validation_responses = {}  # Store validation responses for each block index
+        self.votes = VoteTracker(total_nodes=self.network_size, on_quorum=self._on_quorum, logger=self.logger)  # (index, hash) -> votes
+        self._commit_lock = threading.RLock()  # Orders quorum commits against late proposals
+
+        if p2p_network:
+            p2p_network.attach_node(self)
 
         print(f"Node {self.node_id} initialized.")  # Debug print
 
@@ -37,6 +42,17 @@ class Node:
             if isinstance(blockchain.aggregate_entropy, str):
                 self.logger.error("aggregate_entropy is incorrectly a string. Investigate assignment conflicts.")
 
+    @property
+    def reputation_score(self):
+        """
+        This node's score in the blockchain's ReputationTable (shared with entropy fusion).
+        """
+        return self.blockchain.reputation[self.node_id]
+
+    @reputation_score.setter
+    def reputation_score(self, score):
+        self.blockchain.reputation.adjust(self.node_id, score - self.reputation_score)
+
     def generate_entropy(self):
         """
         Generate entropy using the Henon Map from consensus.py.
@@ -77,17 +93,16 @@ class Node:
             self.logger.info(f"Transaction {transaction_id} already processed. Skipping.")
             return False
 
-        # Add the transaction to the blockchain's transaction pool
+        # Add the transaction to the shared transaction pool
         if self.blockchain.add_transaction_to_pool(transaction):
             # Mark the transaction as processed
             self.processed_transactions.add(transaction_id)
 
-            # Add the transaction to the local transaction pool
-            self.transaction_pool.append(transaction)
-            
             # Log and broadcast the transaction
             self.logger.info(f"Transaction {transaction_id} added to the pool: {transaction}")
-            if self.p2p_network:
+            if self.gossip:
+                self.gossip.submit(transaction)
+            elif self.p2p_network:
                 self.logger.info(f"Broadcasting transaction: {transaction}")
                 self.p2p_network.broadcast_transaction(transaction)
 
@@ -95,12 +110,74 @@ class Node:
 
         return False
 
+    def add_transactions_to_pool(self, transactions, verified=False):
+        """
+        Add a batch of transactions, skipping ids already processed, and gossip the new ones.
+        :param transactions: List of transaction dicts
+        :param verified: Signatures were already checked
+        :return: List of the transactions that were newly added
+        """
+        processed = self.processed_transactions
+        fresh = [tx for tx in transactions if not (isinstance(tx, dict) and tx.get("id") in processed)]
+        added = self.blockchain.add_transactions_to_pool(fresh, verified=verified)
+        processed.update(tx["id"] for tx in added)
+
+        if added:
+            if self.gossip:
+                self.gossip.submit_many(added)
+            elif self.p2p_network:
+                for transaction in added:
+                    self.p2p_network.broadcast_transaction(transaction)
+        return added
+
+    def ingest_transactions(self, transactions, results=None, batch_size=1000):
+        """
+        Validate and pool a stream of transactions, inserting them in batches.
+        :param transactions: Iterable of transactions, consumed lazily
+        :param results: Optional list to append per-item results to (kept if the stream fails midway)
+        :param batch_size: Transactions inserted per Mempool batch
+        :return: List of {"index", "id", "status"} with status "accepted", "duplicate" or "invalid"
+        """
+        results = [] if results is None else results
+        batch = []
+
+        def flush():
+            # Signatures are checked per batch, so the verifier can spread them over its workers.
+            signed = self.blockchain.verify_signatures([tx for tx, _ in batch])
+            verified = []
+            for (transaction, result), ok in zip(batch, signed):
+                if ok:
+                    verified.append(transaction)
+                else:
+                    result["status"] = "invalid"
+            added = {id(tx) for tx in self.add_transactions_to_pool(verified, verified=True)}
+            for transaction, result in batch:
+                if "status" not in result:
+                    result["status"] = "accepted" if id(transaction) in added else "duplicate"
+            batch.clear()
+
+        try:
+            for index, transaction in enumerate(transactions):
+                valid = self.blockchain.is_well_formed(transaction)
+                result = {"index": index, "id": transaction.get("id") if isinstance(transaction, dict) else None}
+                results.append(result)
+                if not valid:
+                    result["status"] = "invalid"
+                    continue
+                batch.append((transaction, result))
+                if len(batch) >= batch_size:
+                    flush()
+        finally:
+            if batch:
+                flush()
+        return results
+
 
     def get_transactions_from_pool(self, limit=50):
         """
         Retrieve a limited number of transactions from the pool.
         """
-        return self.transaction_pool[:limit]
+        return self.transaction_pool.take(limit)
     
     def remove_transactions_from_pool(self, transactions):
         """
@@ -108,12 +185,8 @@ class Node:
         :param transactions: List of transactions to remove
         """
         try:
-            transaction_ids = {tx["id"] for tx in transactions}
-            self.blockchain.pending_transactions = [
-                tx for tx in self.blockchain.pending_transactions
-                if tx["id"] not in transaction_ids
-            ]
-            self.logger.info(f"Removed transactions from pool: {transaction_ids}")
+            removed = self.transaction_pool.remove_many(transactions)
+            self.logger.info(f"Removed {removed} transactions from pool.")
         except Exception as e:
             self.logger.error(f"Error removing transactions from pool: {str(e)}")
 
@@ -163,8 +236,8 @@ class Node:
                     previous_hash=self.blockchain.chain[-1].hash,
                     transactions=ordered_transactions,
                     entropy=str(aggregated_entropy),
+                    proposer=self.node_id,
                 )
-                new_block.hash = new_block.compute_hash()
 
                 # Remove processed transactions from the pool
                 self.remove_transactions_from_pool(transactions)
@@ -181,6 +254,69 @@ class Node:
     def __repr__(self):
         return f"Node(ID: {self.node_id}, Leader: {self.is_leader})"
 
+    def network_size(self):
+        return len(self.p2p_network.peers) + 1 if self.p2p_network else 1
+
+    def record_vote(self, block_index, block_hash, node_id, status):
+        """
+        Count a validation vote; the vote tracker commits the pending block on quorum.
+        :return: "committed", "failed", "rejected", "pending", "duplicate", "processed", or "error"
+            if the quorum callback raised
+        """
+        outcome = self.votes.record(block_index, block_hash, node_id, status)
+        if outcome == "accepted":
+            return self.votes.get(block_index, block_hash).result
+        if outcome == "decided":
+            return "processed"
+        return outcome
+
+    def accept_proposal(self, block):
+        """
+        Make `block` the pending proposal. If votes already decided it (they can arrive
+        before the proposal), commit it now.
+        """
+        with self._commit_lock:
+            self.blockchain.pending_block = block
+            vote_round = self.votes.get(block.index, block.hash)
+            # `decision` is set before the quorum callback runs, so this also covers a
+            # callback that is about to look for this proposal; `_commit_pending` commits once.
+            if vote_round and vote_round.decision == "accepted":
+                vote_round.result = self._commit_pending(block.hash)
+
+    def _on_quorum(self, vote_round):
+        with self._commit_lock:
+            self._score_round(vote_round)
+            if vote_round.decision == "rejected":
+                self.logger.warning(f"Block {vote_round.block_index} ({vote_round.block_hash}) rejected by majority.")
+                return "rejected"
+            return self._commit_pending(vote_round.block_hash)
+
+    def _score_round(self, vote_round):
+        """
+        Update reputations from a decided round (each vote once) and persist them.
+        """
+        pending = self.blockchain.pending_block
+        proposer = pending.proposer if pending is not None and pending.hash == vote_round.block_hash else None
+        reputation = self.blockchain.reputation
+        try:
+            reputation.record_round(vote_round.voters, vote_round.decision, proposer)
+            reputation.save()
+        except Exception as e:
+            self.logger.error(f"Error updating reputation for block {vote_round.block_index}: {str(e)}")
+
+    def _commit_pending(self, block_hash):
+        if self.blockchain.get_block_by_hash(block_hash) is not None:
+            return "committed"  # Already committed by the other of quorum and late proposal
+        block = self.blockchain.pending_block
+        if block is None or block.hash != block_hash:
+            self.logger.warning(f"Majority reached for block {block_hash}, but it is not the pending proposal here.")
+            return "pending"
+        if not self.blockchain.add_block(block):
+            self.logger.error(f"Failed to add block to blockchain: {block}")
+            return "failed"
+        self.logger.info(f"Block {block.index} accepted by majority and added to the chain.")
+        return "committed"
+
     def validate_block(self, block):
         """
         Validate a block using the transaction pool and consensus rules.
@@ -194,18 +330,28 @@ class Node:
             self.logger.error(f"Validation failed: Previous hash mismatch. Expected {self.blockchain.chain[-1].hash}, Found {block.previous_hash}")
             return False
 
+        # Check the proposer against the election for this block (or the leader this node follows)
+        expected_proposer = self.blockchain.elections.leader_for(block.index) or self.leader_id
+        if expected_proposer is not None and block.proposer != expected_proposer:
+            self.logger.error(f"Validation failed: Block proposed by {block.proposer}, but the leader is {expected_proposer}.")
+            return False
+
         # Retrieve transactions from the pool
         transactions_from_pool = self.get_transactions_from_pool(limit=50)
 
         try:
-            # Reorder transactions using the block's entropy
-            reordered_transactions = reorder_transactions(transactions_from_pool, block.entropy, logger=self.logger)
-
-            # Compare reordered transactions with block transactions
-            if reordered_transactions != block.transactions:
-                self.logger.error("Validation failed: Transaction order mismatch.")
-                self.logger.error(f"Expected order: {reordered_transactions}")
-                self.logger.error(f"Block order: {block.transactions}")
+            # Compare the block's transaction ids with the expected order of the pool's ids
+            mismatch = find_order_mismatch(
+                (get_transaction_id(tx) for tx in block.transactions),
+                (get_transaction_id(tx) for tx in transactions_from_pool),
+                block.entropy,
+            )
+            if mismatch is not None:
+                position, expected_id, found_id = mismatch
+                self.logger.error(
+                    f"Validation failed: Transaction order mismatch at index {position}. "
+                    f"Expected {expected_id}, found {found_id}."
+                )
                 return False
         except Exception as e:
             self.logger.error(f"Validation failed during transaction reordering: {e}")
@@ -216,7 +362,7 @@ class Node:
             self.logger.error("Validation failed: Block entropy is None.")
             return False
 
-        # Check block hash
+        # Check block hash (header only)
         computed_hash = block.compute_hash()
         if block.hash != computed_hash:
             self.logger.error("Validation failed: Block hash mismatch.")
@@ -224,6 +370,11 @@ class Node:
             self.logger.error(f"Block hash: {block.hash}")
             return False
 
+        # Check the transactions against the header's Merkle root
+        if not block.verify_transactions():
+            self.logger.error(f"Validation failed: Merkle root mismatch. Header root: {block.merkle_root}")
+            return False
+
         self.logger.info(f"Node {self.node_id} successfully validated Block {block.index}.")
         return True
     
@@ -240,26 +391,50 @@ class Node:
         # For validators: reward/penalize for alignment with the majority
         if not is_leader:
             if is_valid == majority_valid:
-                self.reputation_score += 5  # Reward for aligning with the majority
+                self.reputation_score += VALIDATOR_REWARD  # Reward for aligning with the majority
             else:
-                self.reputation_score -= 5  # Penalize for misalignment
+                self.reputation_score -= VALIDATOR_PENALTY  # Penalize for misalignment
 
         # For the leader: reward/penalize based on block acceptance
         if is_leader:
             if block_accepted:
-                self.reputation_score += 10  # Reward for proposing a valid block
+                self.reputation_score += LEADER_REWARD  # Reward for proposing a valid block
                 self.logger.info(f"Leader Node {self.node_id}: Block accepted. Reputation Score increased to {self.reputation_score}.")
             else:
-                self.reputation_score -= 10  # Penalize for proposing an invalid block
+                self.reputation_score -= LEADER_PENALTY  # Penalize for proposing an invalid block
                 self.logger.info(f"Leader Node {self.node_id}: Block rejected. Reputation Score decreased to {self.reputation_score}.")
         
         self.logger.info(f"Node {self.node_id}: Reputation Score updated to {self.reputation_score}.")
 
+    def next_proposal_index(self):
+        """
+        Index of the next block to be proposed: one past the pending proposal while it
+        awaits votes, otherwise the next height.
+        """
+        height = len(self.blockchain.chain)
+        pending = self.blockchain.pending_block
+        if pending is not None and pending.index == height and self.votes.decision(pending.index, pending.hash) != "rejected":
+            return height + 1
+        return height
+
+    def set_leader(self, leader_id, round_index=None):
+        """
+        Adopt a leader announced by the network, and remember it as the proposer of block
+        `round_index` (default: the next block to be proposed) so proposals can be checked.
+        """
+        self.leader_id = leader_id
+        self.is_leader = (self.node_id == leader_id)
+        if leader_id is not None:
+            round_index = self.next_proposal_index() if round_index is None else round_index
+            self.blockchain.elections.record(round_index, leader_id)
+
     @leader_only
-    def calculate_aggregate_entropy_and_elect_leader(self):
+    def calculate_aggregate_entropy_and_elect_leader(self, run_broadcast=None):
         """
         Leader aggregates entropy from all nodes, determines the next leader,
         and broadcasts both the aggregate entropy and the new leader.
+        :param run_broadcast: Optional callable(func, *args) that runs the broadcast, e.g.
+            NodeService.run_in_background; by default it runs before this returns
         """
         if not self.blockchain.node_entropies:
             self.logger.error("No entropy values received from nodes. Cannot calculate aggregate entropy.")
@@ -270,31 +445,22 @@ class Node:
         self.logger.info(f"Aggregated entropy: {aggregated_entropy}")
 
         try:
-            # Convert aggregate entropy to numeric
-            next_entropy = entropy_to_numeric(aggregated_entropy)
-
-            # Determine the next leader
-            closest_node = None
-            closest_distance = float('inf')
-
-            for node_id, node_entropy in self.blockchain.node_entropies.items():
-                numeric_entropy = entropy_to_numeric(node_entropy)  # Convert each entropy to numeric
-                distance = weighted_minkowski_distance(next_entropy, numeric_entropy)
-                if distance < closest_distance:
-                    closest_distance = distance
-                    closest_node = node_id
+            # Determine the proposer of the next block (numeric entropies are cached in the table)
+            round_index = self.next_proposal_index()
+            closest_node = self.blockchain.elections.elect(round_index, self.blockchain.node_entropies, aggregated_entropy)
 
             # Update the leader
-            self.logger.info(f"Aggregate entropy: {aggregated_entropy}, Next leader: {closest_node}")
+            self.logger.info(f"Aggregate entropy: {aggregated_entropy}, Next leader: {closest_node} (block {round_index})")
             self.leader_id = closest_node
             self.is_leader = (self.node_id == closest_node)
 
             # Broadcast the new leader and aggregate entropy
             if self.p2p_network:
-                self.p2p_network.broadcast_message(
-                    "broadcast_aggregate_entropy",
-                    {"aggregate_entropy": aggregated_entropy, "next_leader": closest_node}
-                )
+                broadcast = self.p2p_network.broadcast_aggregate_entropy
+                if run_broadcast is None:
+                    broadcast(aggregated_entropy, closest_node, round_index)
+                else:
+                    run_broadcast(broadcast, aggregated_entropy, closest_node, round_index)
 
             return closest_node
 
@@ -315,7 +481,7 @@ class Node:
         leader_url = [peer for peer in self.p2p_network.peers if self.leader_id in peer][0]
 
         try:
-            response = requests.post(
+            response = self.p2p_network.http.post(
                 f"{leader_url}/receive_entropy",
                 json={"node_id": self.node_id, "entropy": self.entropy},
             )
@@ -1,20 +1,54 @@
 import json
 import threading
-import socket
+from concurrent.futures import ThreadPoolExecutor, wait
 from utils.logger import setup_logger
+from blockchain.block import Block
+from blockchain.compact import COMPACT_BLOCK_CONTENT_TYPE, encode_compact, to_compact
+from blockchain.encoding import BLOCK_CONTENT_TYPE
+from network.http_pool import PeerSessionPool
+from network.transport import FramedTransport
 import requests 
 import time
 class P2PNetwork:
-    
-    def __init__(self, node_id, host="localhost", port=5000,logger=None):
+    # Message type -> Flask endpoint on the receiving peer
+    ENDPOINT_MAP = {
+        "broadcast_aggregate_entropy": "receive_aggregate_entropy",
+        "propose_block": "receive_proposed_block",
+        "propose_compact_block": "receive_compact_block",
+        "block_validation": "validate_block",
+    }
+
+    def __init__(self, node_id, host="localhost", port=5000, logger=None, max_workers=16, broadcast_deadline=10.0, http_pool=None, max_pending_messages=1000, retry_delay=2.0):
+        """
+        :param max_workers: Size of the thread pool used to fan broadcasts out to peers
+        :param broadcast_deadline: Seconds a single broadcast may take across all peers, retries included
+        :param retry_delay: Seconds between attempts to a peer that is unreachable or answers 503
+        :param http_pool: Shared PeerSessionPool for keep-alive connections to peers
+        :param max_pending_messages: Socket messages queued for handlers before peers are paused
+        """
         self.node_id = node_id
         self.host = host
         self.port = port
         self.logger = logger
+        self.broadcast_deadline = broadcast_deadline
+        self.retry_delay = retry_delay
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{node_id}-broadcast")
+        self.http = http_pool or PeerSessionPool(pool_maxsize=max_workers, logger=logger)
+        self.json_only_peers = set()  # Peers that answered 415 to the binary block encoding
+        self.node = None
+        self.blockchain = None
+
+        # Socket transport: one event-loop thread for all connections, one handler thread
+        # so messages are processed in arrival order without blocking the loop.
+        self.transport = None
+        self.handler_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{node_id}-handlers")
+        self.max_pending_messages = max_pending_messages
+        self._pending_messages = 0
+        self._paused_connections = set()
+        self._pending_lock = threading.Lock()
 
         self.peers = []  # List of connected peers (host, port)
         self.handlers = {}  # Message type -> handler function
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.register_handler("broadcast_entropy", self.handle_broadcast_entropy)
         self.register_handler("new_transaction", self.handle_new_transaction)    
         self.register_handler("broadcast_aggregate_entropy", self.handle_broadcast_aggregate_entropy) 
@@ -33,30 +67,59 @@ class P2PNetwork:
         else:
             print(f"[DEBUG] Test logger is None for node {self.node_id}")
 
+    def attach_node(self, node):
+        """
+        Give socket message handlers access to the node and its blockchain.
+        """
+        self.node = node
+        self.blockchain = node.blockchain
+
     def start(self):
-        self.socket.bind((self.host, self.port))
-        self.socket.listen(5)
+        """
+        Listen for framed peer messages on a single event-loop thread.
+        """
+        self.transport = FramedTransport(self.host, self.port, self.receive_frame, logger=self.logger)
+        self.transport.start()
+        self.port = self.transport.port
         print(f"[{self.node_id}] Listening on {self.host}:{self.port}...")
 
-        # Start a thread to accept connections
-        threading.Thread(target=self.accept_connections, daemon=True).start()
+    def stop(self):
+        if self.transport:
+            self.transport.stop()
+            self.transport = None
+        self.handler_executor.shutdown(wait=False)
 
-    def accept_connections(self):
-        while True:
-            conn, addr = self.socket.accept()
-            print(f"[{self.node_id}] Connected to peer {addr}")
-            threading.Thread(target=self.handle_peer, args=(conn,), daemon=True).start()
+    def send_message(self, address, message_type, payload):
+        """
+        Send one framed message to a peer over the socket transport.
+        :param address: (host, port) of the peer's transport listener
+        """
+        self.transport.send(address, json.dumps({"type": message_type, "payload": payload}))
 
-    def handle_peer(self, conn):
-        while True:
-            try:
-                message = conn.recv(1024).decode("utf-8")
-                if message:
-                    self.process_message(message)
-            except Exception as e:
-                print(f"[{self.node_id}] Error handling peer: {e}")
-                conn.close()
-                break
+    def receive_frame(self, frame, connection):
+        """
+        Transport callback: queue a frame for the handler thread. Returns False to pause
+        reading from the sender while too many messages are waiting.
+        """
+        with self._pending_lock:
+            self._pending_messages += 1
+            overloaded = self._pending_messages >= self.max_pending_messages
+            if overloaded:
+                self._paused_connections.add(connection)
+        self.handler_executor.submit(self._handle_frame, frame)
+        return not overloaded
+
+    def _handle_frame(self, frame):
+        try:
+            self.process_message(frame)
+        finally:
+            with self._pending_lock:
+                self._pending_messages -= 1
+                resume = []
+                if self._paused_connections and self._pending_messages <= self.max_pending_messages // 2:
+                    resume, self._paused_connections = list(self._paused_connections), set()
+            for connection in resume:
+                self.transport.resume_reading(connection)
 
     def connect_peer(self, host, port):
         self.peers.append((host, port))
@@ -75,49 +138,136 @@ class P2PNetwork:
         # Pass the message type and payload to the generic broadcast_message function
         self.broadcast_message(message_type, payload)
 
-    def broadcast_message(self, message_type, payload):
+    def broadcast_message(self, message_type, payload, deadline=None):
         """
-        Broadcast a generic message to all connected peers.
+        Broadcast a generic message to all connected peers concurrently.
         :param message_type: The type of message to broadcast.
         :param payload: The payload of the message.
+        :param deadline: Seconds allowed for the whole broadcast (defaults to `broadcast_deadline`).
+        :return: Dict of peer -> {"ok": bool, "status": int | None, "error": str | None}
         """
         self.logger.info(f"[{self.node_id}] Broadcasting message: {message_type} with payload: {payload}")
+        endpoint = self.ENDPOINT_MAP.get(message_type, message_type)
+        return self.fan_out(endpoint, payload, deadline=deadline, description=message_type)
+
+    def broadcast_block(self, message_type, block, deadline=None):
+        """
+        Broadcast a block in the binary encoding (BLOCK_CONTENT_TYPE). Peers that answer
+        415 get JSON instead, and are remembered so later blocks go to them as JSON directly.
+        """
+        self.logger.info(f"[{self.node_id}] Broadcasting {message_type}: block {block.index} ({block.hash})")
+        endpoint = self.ENDPOINT_MAP.get(message_type, message_type)
+        return self.fan_out(
+            endpoint, block.to_dict(), deadline=deadline, description=f"{message_type} {block.index}",
+            binary=block.to_bytes(),
+        )
+
+    def broadcast_compact_block(self, block, deadline=None):
+        """
+        Propose a block as its header plus short transaction ids. Validators rebuild it
+        from their own pools and fetch only what they are missing from `/block_transactions`.
+        """
+        compact = to_compact(block, sender=self.node_id)
+        self.logger.info(
+            f"[{self.node_id}] Broadcasting compact block {block.index} ({len(block.transactions)} short ids)"
+        )
+        return self.fan_out(
+            self.ENDPOINT_MAP["propose_compact_block"], None, deadline=deadline,
+            description=f"propose_compact_block {block.index}",
+            binary=encode_compact(compact), content_type=COMPACT_BLOCK_CONTENT_TYPE,
+        )
+
+    def peer_url(self, node_id):
+        """
+        Base URL of the peer running `node_id`, or None if it is not a known peer.
+        """
+        return next((peer for peer in self.peers if node_id and node_id in peer), None)
+
+    def fan_out(self, endpoint, payload, deadline=None, description=None, binary=None, content_type=BLOCK_CONTENT_TYPE):
+        """
+        POST `payload` to `endpoint` on every peer in parallel and collect per-peer results.
+        The call returns once every peer has answered or the deadline has passed, so its
+        latency tracks the slowest healthy peer rather than the sum over all peers.
+        :param binary: Optional binary encoding of `payload` in `content_type`, preferred over JSON
+        """
+        description = description or endpoint
+        deadline_seconds = self.broadcast_deadline if deadline is None else deadline
+        deadline_at = time.monotonic() + deadline_seconds
+
+        futures = {
+            self.executor.submit(
+                self._post_with_retries, peer, endpoint, payload, deadline_at, description, binary, content_type
+            ): peer
+            for peer in self.peers
+        }
+        done, _ = wait(futures, timeout=deadline_seconds)
+
+        results = {}
+        for future, peer in futures.items():
+            if future in done:
+                results[peer] = future.result()
+            else:
+                results[peer] = {"ok": False, "status": None, "error": "deadline exceeded"}
+                self.logger.error(f"Broadcast {description} to {peer} did not finish within {deadline_seconds}s.")
 
-        for peer in self.peers:
-            retries = 3
-            while retries > 0:
-                try:
-                    # Map message_type to specific Flask endpoint
-                    endpoint_map = {
-                        "broadcast_aggregate_entropy": "receive_aggregate_entropy",
-                        "propose_block": "receive_proposed_block",
-                        "block_validation": "validate_block",
-
-                    }
-                    endpoint = endpoint_map.get(message_type, message_type)
-
-                    response = requests.post(
-                        f"{peer}/{endpoint}",
-                        json=payload,
-                        timeout=5  # Set timeout for safety
+        delivered = sum(1 for result in results.values() if result["ok"])
+        self.logger.info(f"[{self.node_id}] Broadcast {description} delivered to {delivered}/{len(results)} peers.")
+        return results
+
+    def _post_with_retries(self, peer, endpoint, payload, deadline_at, description, binary=None,
+                           content_type=BLOCK_CONTENT_TYPE, retries=3, retry_delay=None):
+        """
+        POST to one peer, retrying connection errors and 503 responses until `retries`
+        is exhausted or the deadline passes. Any other status is the peer's answer to
+        this message, and sending it again would get the same one.
+        """
+        retry_delay = self.retry_delay if retry_delay is None else retry_delay
+        attempt = 0
+        result = {"ok": False, "status": None, "error": "deadline exceeded"}
+        while attempt < retries:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            attempt += 1
+            try:
+                use_binary = binary is not None and (payload is None or peer not in self.json_only_peers)
+                if use_binary:
+                    response = self.http.post(
+                        f"{peer}/{endpoint}", data=binary, headers={"Content-Type": content_type}, timeout=remaining
                     )
-                    if response.status_code == 200:
-                        self.logger.info(f"Message {message_type} broadcasted to {peer}. Response: {response.status_code}")
-                        break  # Exit retry loop on success
-                    else:
-                        self.logger.error(f"Failed to broadcast {message_type} to {peer}: {response.status_code}. Retrying...")
-                except requests.ConnectionError as e:
-                    retries -= 1
-                    self.logger.error(f"Connection error to {peer}. Retrying... ({3 - retries}/3)")
-                    time.sleep(2)  # Wait before retrying
-                except Exception as e:
-                    self.logger.error(f"Failed to broadcast {message_type} to {peer}: {str(e)}")
-                    break  # Exit loop on non-connection-related errors
+                else:
+                    response = self.http.post(f"{peer}/{endpoint}", json=payload, timeout=remaining)
+                if use_binary and payload is not None and response.status_code == 415:
+                    self.logger.info(f"Peer {peer} does not accept {content_type}; falling back to JSON.")
+                    self.json_only_peers.add(peer)
+                    attempt -= 1  # Content negotiation, not a failed attempt
+                    continue
+                if response.status_code == 200:
+                    self.logger.info(f"Message {description} broadcasted to {peer}. Response: {response.status_code}")
+                    return {"ok": True, "status": response.status_code, "error": None}
+                result = {"ok": False, "status": response.status_code, "error": f"HTTP {response.status_code}"}
+                self.logger.error(f"Failed to broadcast {description} to {peer}: {response.status_code}. ({attempt}/{retries})")
+                if response.status_code != 503:
+                    return result  # Only "temporarily unavailable" is worth another attempt
+            except requests.ConnectionError as e:
+                result = {"ok": False, "status": None, "error": f"connection error: {e}"}
+                self.logger.error(f"Connection error to {peer}. ({attempt}/{retries})")
+            except Exception as e:
+                self.logger.error(f"Failed to broadcast {description} to {peer}: {str(e)}")
+                return {"ok": False, "status": None, "error": str(e)}
+
+            if attempt < retries:
+                time.sleep(max(0, min(retry_delay, deadline_at - time.monotonic())))
+        return result
 
     def register_handler(self, message_type, handler):
         self.handlers[message_type] = handler
 
     def process_message(self, message):
+        """
+        Dispatch one JSON message ({"type", "payload"}) to its registered handler.
+        :param message: Message as str or UTF-8 bytes
+        """
         try:
             message_data = json.loads(message)
             message_type = message_data.get("type")
@@ -135,40 +285,16 @@ class P2PNetwork:
         """
         if self.logger:
             self.logger.info(f"Broadcasting transaction: {transaction}")
-
-        for peer in self.peers:
-            retries = 3
-            while retries > 0:
-                try:
-                    response = requests.post(
-                        f"{peer}/add_transaction",
-                        json={"transaction": transaction},
-                        timeout=5  # Add timeout for safety
-                    )
-                    if self.logger:
-                        self.logger.info(f"Transaction broadcasted to {peer}, Response: {response.status_code}")
-                    break  # Exit retry loop on success
-                except requests.exceptions.ConnectionError as e:
-                    retries -= 1
-                    self.logger.error(f"Failed to connect to {peer}. Retrying... ({3 - retries}/3)")
-                    time.sleep(2)  # Wait before retrying
-                except Exception as e:
-                    self.logger.error(f"Failed to broadcast to {peer}: {str(e)}")
-                    break  # Exit loop on non-connection-related errors
+        return self.fan_out("add_transaction", {"transaction": transaction}, description="transaction")
 
     def handle_broadcast_entropy(self, payload):
         try:
-            data = json.loads(message)
-            message_type = data.get("type")
-            payload = data.get("payload")
-
-            if message_type == "broadcast_entropy":
-                aggregated_entropy = payload.get("aggregated_entropy")
-                if aggregated_entropy is None:
-                    self.logger.error("Received entropy is None. Check the broadcasting process.")
-                else:
-                    self.logger.info(f"Received broadcasted entropy: {aggregated_entropy}")
-                    self.blockchain.received_entropy = aggregated_entropy
+            aggregated_entropy = payload.get("aggregated_entropy")
+            if aggregated_entropy is None:
+                self.logger.error("Received entropy is None. Check the broadcasting process.")
+            else:
+                self.logger.info(f"Received broadcasted entropy: {aggregated_entropy}")
+                self.blockchain.received_entropy = aggregated_entropy
         except Exception as e:
             self.logger.error(f"Failed to handle message: {e}")
 
@@ -208,52 +334,27 @@ class P2PNetwork:
         if self.logger:
             self.logger.info("Finished handling new transaction.")
 
-    def broadcast_leader(self, leader_id):
+    def broadcast_leader(self, leader_id, round_index=None, deadline=None):
         """
-        Broadcast the leader ID to all peers.
+        Broadcast the leader ID to all peers, bounded by the broadcast deadline.
+        :param round_index: Index of the block the leader proposes, if known
         """
         if self.logger:
             self.logger.info(f"Broadcasting leader: {leader_id}")
-        for peer in self.peers:
-            while True:  # Retry indefinitely
-                try:
-                    response = requests.post(f"{peer}/set_leader", json={"leader_id": leader_id})
-                    if response.status_code == 200:
-                        self.logger.info(f"Leader broadcasted to {peer}, Response: {response.status_code}")
-                        break  # Exit retry loop for this peer
-                    else:
-                        self.logger.error(f"Failed to broadcast leader to {peer}: {response.status_code}. Retrying...")
-                except requests.ConnectionError as e:
-                    self.logger.error(f"Failed to broadcast leader to {peer}: Connection error. Retrying...")
-                except Exception as e:
-                    self.logger.error(f"Failed to broadcast leader to {peer}: {str(e)}. Retrying...")
-
-                time.sleep(5)  # Wait
-
-    def broadcast_aggregate_entropy(self, aggregate_entropy, next_leader):
-        """
-        Broadcast the aggregate entropy and the next leader to all peers.
+        payload = {"leader_id": leader_id}
+        if round_index is not None:
+            payload["round"] = round_index
+        return self.fan_out("set_leader", payload, deadline=deadline, description=f"leader {leader_id}")
+
+    def broadcast_aggregate_entropy(self, aggregate_entropy, next_leader, round_index=None, deadline=None):
+        """
+        Broadcast the aggregate entropy and the next leader to all peers, bounded by the broadcast deadline.
+        :param round_index: Index of the block the next leader proposes
         """
         payload = {"aggregate_entropy": aggregate_entropy, "next_leader": next_leader}
-
-        for peer in self.peers:
-            while True:  # Retry until successful
-                try:
-                    response = requests.post(
-                        f"{peer}/receive_aggregate_entropy", json=payload
-                    )
-                    if response.status_code == 200:
-                        self.logger.info(f"Aggregate entropy broadcasted to {peer}")
-                        break  # Exit retry loop on success
-                    else:
-                        self.logger.error(
-                            f"Failed to broadcast aggregate entropy to {peer}: {response.status_code}. Retrying..."
-                        )
-                except requests.ConnectionError:
-                    self.logger.error(f"Failed to connect to {peer}. Retrying...")
-                except Exception as e:
-                    self.logger.error(f"Error broadcasting aggregate entropy to {peer}: {str(e)}. Retrying...")
-                time.sleep(5)  # Wait before retrying
+        if round_index is not None:
+            payload["round"] = round_index
+        return self.broadcast_message("broadcast_aggregate_entropy", payload, deadline=deadline)
 
     def handle_broadcast_aggregate_entropy(self, payload):
         """
@@ -268,8 +369,7 @@ class P2PNetwork:
 
         # Update local values
         self.blockchain.aggregate_entropy = aggregate_entropy
-        self.leader_id = next_leader
-        self.is_leader = (self.node_id == next_leader)
+        self.node.set_leader(next_leader, payload.get("round"))
 
         self.logger.info(f"Received broadcast: Aggregate entropy = {aggregate_entropy}, Next leader = {next_leader}")
 
@@ -280,44 +380,32 @@ class P2PNetwork:
         try:
             self.node.logger.info(f"Handling proposed block: {payload}")
             # Simulate the `/receive_proposed_block` logic
-            block_data = payload
-            proposed_block = Block(
-                index=block_data["index"],
-                previous_hash=block_data["previous_hash"],
-                transactions=block_data["transactions"],
-                entropy=block_data["entropy"],
-                timestamp=block_data["timestamp"],
-            )
-            proposed_block.hash = block_data["hash"]
+            proposed_block = Block.from_dict(payload)
 
             # Validate the block
             is_valid = self.node.validate_block(proposed_block)
 
+            self.node.accept_proposal(proposed_block)
+
             # Respond to the leader with validation status
             response_status = "valid" if is_valid else "invalid"
-            self.broadcast_message(
-                "block_validation",
-                {
-                    "block_index": proposed_block.index,
-                    "node_id": self.node.node_id,
-                    "status": response_status,
-                }
-            )
+            self.broadcast_validation(proposed_block, self.node.node_id, response_status)
         except Exception as e:
             self.node.logger.error(f"Error handling proposed block: {str(e)}")
 
 
-    def broadcast_validation(self, block_index, node_id, status, block_data):
+    def broadcast_validation(self, block, node_id, status):
         """
-        Broadcast the validation result of a block.
+        Broadcast a validation vote. Votes name the block by hash; peers already hold
+        the block from the proposal, so it is not sent again.
         """
         payload = {
-            "block_index": block_index,
+            "block_hash": block.hash,
+            "block_index": block.index,
             "node_id": node_id,
             "status": status,
-            "block_data": block_data  # Include block data
         }
-        self.broadcast_message("validate_block", payload)
+        return self.broadcast_message("block_validation", payload)
 
 
     def handle_block_validation(self, payload):
@@ -325,39 +413,16 @@ class P2PNetwork:
         Handle block validation responses from follower nodes.
         """
         try:
+            block_hash = payload.get("block_hash")
             block_index = payload.get("block_index")
             node_id = payload.get("node_id")
             status = payload.get("status")
-            block_data = payload.get("block_data")  # Ensure block data is retrieved
 
-            if not block_index or not node_id or not status or not block_data:
+            if not block_hash or not node_id or status not in ("valid", "invalid"):
                 self.node.logger.error(f"Invalid block validation payload: {payload}")
                 return
 
             self.node.logger.info(f"Validation received for Block {block_index}: Node {node_id}, Status {status}")
-
-            # Track validation responses in the leader node
-            if not hasattr(self.node, "validation_responses"):
-                self.node.validation_responses = {}
-            if block_index not in self.node.validation_responses:
-                self.node.validation_responses[block_index] = []
-            self.node.validation_responses[block_index].append((node_id, status))
-
-            # Check if majority has validated
-            valid_count = sum(1 for _, s in self.node.validation_responses[block_index] if s == "valid")
-            invalid_count = sum(1 for _, s in self.node.validation_responses[block_index] if s == "invalid")
-            total_nodes = len(self.peers) + 1  # Including the leader
-
-            if valid_count > total_nodes // 2:
-                self.node.logger.info(f"Block {block_index} accepted by majority. Adding to blockchain.")
-                block = Block(**block_data)  # Create block from received data
-                if self.node.blockchain.add_block(block):  # Add block to the chain
-                    self.node.logger.info(f"Block {block_index} successfully added to the chain.")
-                else:
-                    self.node.logger.error(f"Failed to add Block {block_index} to the blockchain.")
-                del self.node.validation_responses[block_index]
-            elif invalid_count > total_nodes // 2:
-                self.node.logger.warning(f"Block {block_index} rejected by majority.")
-                del self.node.validation_responses[block_index]
+            self.node.record_vote(block_index, block_hash, node_id, status)
         except Exception as e:
             self.node.logger.error(f"Error handling block validation: {str(e)}")
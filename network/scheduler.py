@@ -0,0 +1,176 @@
+import threading
+import time
+
+PHASES = ("entropy", "propose", "elect", "vote")
+
+
+class PhaseStats:
+    """
+    Running duration totals for one round phase, in seconds.
+    """
+
+    __slots__ = ("count", "total", "last", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.last = None
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.max = max(self.max, seconds)
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "last": self.last,
+            "max": self.max,
+        }
+
+
+class RoundScheduler:
+    """
+    Drives consensus rounds from inside the node on a target block interval, instead of
+    waiting for `/send_entropy`, `/aggregate_entropy` and `/propose_block` calls.
+
+    Every tick, a follower sends fresh entropy to the current leader. The leader waits
+    `entropy_window` seconds to collect it, waits for the previous proposal to be decided,
+    proposes a block, and elects the next leader. Votes for that block are awaited in the
+    background, so the new leader collects entropy for round N+1 while votes for round N
+    are still arriving; only the proposal of N+1 waits for N's decision.
+    """
+
+    def __init__(self, service, interval=5.0, entropy_window=None, vote_timeout=None, logger=None):
+        """
+        :param service: NodeService of this node
+        :param interval: Target seconds between round starts
+        :param entropy_window: Seconds the leader collects entropy per round (default: a third of `interval`)
+        :param vote_timeout: Seconds to wait for a proposal's votes (default: three intervals)
+        """
+        self.service = service
+        self.node = service.node
+        self.blockchain = service.blockchain
+        self.interval = interval
+        self.entropy_window = interval / 3 if entropy_window is None else entropy_window
+        self.vote_timeout = 3 * interval if vote_timeout is None else vote_timeout
+        self.logger = logger or service.logger
+        self.phases = {phase: PhaseStats() for phase in PHASES}
+        self.rounds = {"started": 0, "proposed": 0, "skipped": 0, "overruns": 0}
+        self._stats_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.node.node_id}-rounds", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Round scheduler started with a {self.interval}s block interval.")
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        next_round = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.run_round()
+            except Exception as e:
+                self.logger.error(f"Error in scheduled round: {str(e)}")
+
+            next_round += self.interval
+            now = time.monotonic()
+            if now > next_round:
+                # The round ran past its slot; start the next one now rather than bunching up.
+                self._count("overruns")
+                next_round = now
+            self._stop.wait(next_round - now)
+
+    def run_round(self):
+        """
+        Run this node's part of one round.
+        :return: The proposed block, or None if this node did not propose
+        """
+        self._count("started")
+        if not self.node.is_leader:
+            started = time.monotonic()
+            body, status = self.service.send_entropy()
+            if status == 200:
+                self._record("entropy", time.monotonic() - started)
+            return None
+
+        started = time.monotonic()
+        if self._stop.wait(self.entropy_window):
+            return None
+        self._record("entropy", time.monotonic() - started)
+
+        if not self.blockchain.node_entropies:
+            self.logger.warning("No entropy collected this round; skipping the proposal.")
+            self._count("skipped")
+            return None
+
+        if not self._previous_round_settled():
+            self._count("skipped")
+            return None
+        started = time.monotonic()
+        body, status = self.service.propose_block()
+        if status != 200:
+            self._count("skipped")
+            return None
+        block = self.blockchain.pending_block
+        proposed_at = time.monotonic()
+        self._record("propose", proposed_at - started)
+        self._count("proposed")
+        self.service.run_in_background(self._await_votes, block, proposed_at)
+
+        started = time.monotonic()
+        if self.node.calculate_aggregate_entropy_and_elect_leader():
+            self.blockchain.node_entropies.clear()  # The next collection is for a new round
+        self._record("elect", time.monotonic() - started)
+        return block
+
+    def _previous_round_settled(self):
+        """
+        Wait until the pending proposal, if any, has been decided, so the next block builds on it.
+        """
+        pending = self.blockchain.pending_block
+        if pending is None or self.blockchain.get_block_by_hash(pending.hash) is not None:
+            return True
+        if self.node.votes.wait_for_decision(pending.index, pending.hash, self.vote_timeout) is None:
+            self.logger.warning(f"Block {pending.index} still undecided after {self.vote_timeout}s; not proposing.")
+            return False
+        return True
+
+    def _await_votes(self, block, proposed_at):
+        if self.node.votes.wait_for_decision(block.index, block.hash, self.vote_timeout) is None:
+            self.logger.warning(f"No decision on block {block.index} within {self.vote_timeout}s.")
+            return
+        self._record("vote", time.monotonic() - proposed_at)
+
+    def _record(self, phase, seconds):
+        with self._stats_lock:
+            self.phases[phase].add(seconds)
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.rounds[key] += 1
+
+    def stats(self):
+        """
+        :return: {"interval", "rounds": {...}, "phases": {phase: {"count", "mean", "last", "max"}}}
+        """
+        with self._stats_lock:
+            return {
+                "interval": self.interval,
+                "running": self._thread is not None,
+                "rounds": dict(self.rounds),
+                "phases": {phase: stats.to_dict() for phase, stats in self.phases.items()},
+            }
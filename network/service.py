@@ -0,0 +1,564 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from blockchain.blockchain import Blockchain
+from blockchain.block import Block
+from blockchain.compact import COMPACT_BLOCK_CONTENT_TYPE, build_block, decode_compact, fill_from_pool
+from blockchain.encoding import BLOCK_CONTENT_TYPE
+from blockchain.reputation import ReputationTable
+from blockchain.signatures import SignatureVerifier
+from blockchain.storage import BlockStore
+from network.gossip import TransactionGossip
+from network.http_pool import PeerSessionPool
+from network.node import Node
+from network.p2p import P2PNetwork
+from network.scheduler import RoundScheduler
+from utils.crypto import public_key_cache
+from utils.jsonstream import JSONStreamError, iter_json_values
+from utils.logger import setup_logger
+
+PEER_MAP = {
+    "node1": ["http://pocnew1-node2-1:5000", "http://pocnew1-node3-1:5000", "http://pocnew1-node4-1:5000"],
+    "node2": ["http://pocnew1-node1-1:5000", "http://pocnew1-node3-1:5000", "http://pocnew1-node4-1:5000"],
+    "node3": ["http://pocnew1-node1-1:5000", "http://pocnew1-node2-1:5000", "http://pocnew1-node4-1:5000"],
+    "node4": ["http://pocnew1-node1-1:5000", "http://pocnew1-node2-1:5000", "http://pocnew1-node3-1:5000"],
+}
+
+
+class UnsupportedMediaType(ValueError):
+    """Raised for request bodies in a content type the node does not decode."""
+
+
+def decode_block(mimetype, body):
+    """
+    Decode a block sent either in the binary encoding or as JSON.
+    :param mimetype: Request content type without parameters
+    :param body: Raw request body
+    """
+    if mimetype == BLOCK_CONTENT_TYPE:
+        return Block.from_bytes(body)
+    if mimetype == "application/json":
+        return Block.from_dict(json.loads(body))
+    raise UnsupportedMediaType(f"Unsupported block content type: {mimetype!r}")
+
+
+class NodeService:
+    """
+    Request handling shared by the HTTP runtimes (Flask `api.py`, asyncio `async_api.py`).
+
+    Methods take already-parsed request data and return `(body, status)`. Anything that
+    waits on peers is handed to a background executor, so a slow peer never holds a
+    request open.
+    """
+
+    def __init__(self, node, http_pool=None, gossip=None, background_workers=4, compact_blocks=True):
+        """
+        :param compact_blocks: Propose blocks as short transaction ids instead of full transactions
+        """
+        self.node = node
+        self.blockchain = node.blockchain
+        self.p2p_network = node.p2p_network
+        self.http_pool = http_pool or self.p2p_network.http
+        self.gossip = gossip
+        self.compact_blocks = compact_blocks
+        self.logger = node.logger
+        self.background = ThreadPoolExecutor(max_workers=background_workers, thread_name_prefix=f"{node.node_id}-consensus")
+        self.scheduler = None  # RoundScheduler, when rounds run on a block interval
+
+    def run_in_background(self, func, *args, **kwargs):
+        """
+        Run a consensus step (usually a peer broadcast) off the request path.
+        """
+        def task():
+            try:
+                func(*args, **kwargs)
+            except Exception as e:
+                self.logger.error(f"Background task {getattr(func, '__name__', func)} failed: {str(e)}")
+
+        return self.background.submit(task)
+
+    # Transactions
+
+    def add_transaction(self, data):
+        try:
+            if not data or 'transaction' not in data:
+                return {"error": "Transaction data missing"}, 400
+
+            transaction = data['transaction']
+            if self.node.add_transaction_to_pool(transaction):
+                return {"message": "Transaction added and broadcasted successfully"}, 200
+            else:
+                return {"error": "Invalid transaction"}, 400
+        except Exception as e:
+            self.logger.error(f"Error in add_transaction: {str(e)}")
+            return {"error": "An error occurred"}, 500
+
+    def add_transactions(self, stream):
+        """
+        Bulk-ingest transactions from a byte stream holding a JSON array or NDJSON.
+        :param stream: File-like object with `read(size)`
+        """
+        results = []
+        try:
+            self.node.ingest_transactions(iter_json_values(stream), results)
+        except JSONStreamError as e:
+            self.logger.warning(f"Malformed bulk transaction body after {len(results)} items: {str(e)}")
+            return dict(summarize_ingest(results), error=str(e)), 400
+        except Exception as e:
+            self.logger.error(f"Error in add_transactions: {str(e)}")
+            return {"error": "An error occurred"}, 500
+        return summarize_ingest(results), 200
+
+    def transaction_pool(self):
+        try:
+            return {"transaction_pool": self.node.transaction_pool.to_list()}, 200
+        except Exception as e:
+            self.logger.error(f"Error in get_transaction_pool: {str(e)}")
+            return {"error": "An error occurred while retrieving the transaction pool"}, 500
+
+    # Network
+
+    def peers(self):
+        return {"peers": self.p2p_network.peers}, 200
+
+    def network_stats(self):
+        try:
+            return {"peers": self.http_pool.stats()}, 200
+        except Exception as e:
+            self.logger.error(f"Error in get_network_stats: {str(e)}")
+            return {"error": "An error occurred while retrieving network stats"}, 500
+
+    def signature_stats(self):
+        """
+        Signature verification counters and public-key cache hit rates, including the
+        caches inside the verifier's worker processes.
+        """
+        verifier = self.blockchain.signature_verifier
+        if verifier is None:
+            return {"verifier": None, "public_key_cache": {"in_process": public_key_cache.stats()}}, 200
+        return {"verifier": dict(verifier.stats), "public_key_cache": verifier.key_cache_stats()}, 200
+
+    def round_stats(self):
+        if self.scheduler is None:
+            return {"error": "Round scheduler is not running (set BLOCK_INTERVAL)"}, 404
+        return self.scheduler.stats(), 200
+
+    # Blocks
+
+    def transaction_proof(self, block_hash, transaction_id):
+        block = self.blockchain.get_block_by_hash(block_hash)
+        if block is None:
+            return {"error": "Block not found"}, 404
+
+        result = block.transaction_proof(transaction_id)
+        if result is None:
+            return {"error": "Transaction not found in block"}, 404
+
+        position, transaction, proof = result
+        return {
+            "block_hash": block.hash,
+            "merkle_root": block.merkle_root,
+            "position": position,
+            "transaction": transaction,
+            "proof": proof,
+        }, 200
+
+    # Leadership and entropy
+
+    def get_leader(self):
+        return {"leader": self.node.leader_id}, 200
+
+    def set_leader(self, data):
+        if not data or 'leader_id' not in data:
+            return {"error": "Leader ID missing"}, 400
+
+        leader_id = data['leader_id']
+        self.node.set_leader(leader_id, data.get('round'))
+        self.logger.info(f"Leader updated to {leader_id}")
+        return {"message": f"Leader updated to {leader_id}"}, 200
+
+    def elect_leader(self, data):
+        if not self.node.is_leader:
+            return {"error": "Only the current leader can elect a new leader"}, 403
+
+        if not data or 'new_leader_id' not in data:
+            return {"error": "New leader ID missing"}, 400
+
+        new_leader_id = data['new_leader_id']
+        self.node.set_leader(new_leader_id)
+
+        if self.p2p_network:
+            self.run_in_background(self.p2p_network.broadcast_leader, new_leader_id)
+
+        return {"message": f"Leader changed to {new_leader_id}"}, 200
+
+    def receive_entropy(self, data):
+        if not self.node.is_leader:
+            return {"error": "Only the leader can receive entropy"}, 403
+
+        node_id = data.get("node_id") if data else None
+        entropy = data.get("entropy") if data else None
+        if not node_id or entropy is None:
+            return {"error": "Missing node_id or entropy"}, 400
+
+        self.blockchain.node_entropies[node_id] = entropy
+        self.logger.info(f"Received entropy from Node {node_id}: {entropy}")
+        return {"message": f"Entropy from Node {node_id} received"}, 200
+
+    def send_entropy(self):
+        """
+        Generate entropy and send it to the leader; the response reports the leader's answer.
+        """
+        node = self.node
+        node.entropy = node.generate_entropy()
+        if not node.entropy:
+            self.logger.error("Failed to generate entropy.")
+            return {"error": "Failed to generate entropy"}, 500
+
+        if node.leader_id == node.node_id:
+            self.logger.error("This node is the leader and cannot send entropy to itself.")
+            return {"error": "This node is the leader and cannot send entropy to itself"}, 400
+
+        try:
+            leader_url = [peer for peer in self.p2p_network.peers if node.leader_id in peer][0]
+            response = self.http_pool.post(
+                f"{leader_url}/receive_entropy",
+                json={"node_id": node.node_id, "entropy": node.entropy},
+            )
+            if response.status_code == 200:
+                self.logger.info(f"Successfully sent entropy to leader {node.leader_id}: {node.entropy}")
+                return {"message": "Entropy generated and sent successfully"}, 200
+            else:
+                self.logger.error(f"Failed to send entropy to leader {node.leader_id}: {response.status_code}")
+                return {"error": "Failed to send entropy to leader"}, response.status_code
+        except Exception as e:
+            self.logger.error(f"Error while sending entropy to leader: {str(e)}")
+            return {"error": "Failed to send entropy to leader"}, 500
+
+    def receive_aggregate_entropy(self, data):
+        try:
+            aggregate_entropy = data.get("aggregate_entropy")
+            next_leader = data.get("next_leader")
+
+            if not aggregate_entropy or not next_leader:
+                return {"error": "Missing aggregate_entropy or next_leader"}, 400
+
+            self.blockchain.aggregate_entropy = aggregate_entropy
+            self.node.set_leader(next_leader, data.get("round"))
+
+            self.logger.info(f"Received aggregate_entropy: {aggregate_entropy}, Next leader: {next_leader}")
+            return {"message": "Aggregate entropy and leader updated"}, 200
+        except Exception as e:
+            self.logger.error(f"Error in receive_aggregate_entropy: {str(e)}")
+            return {"error": "Failed to process aggregate entropy"}, 500
+
+    def aggregate_entropy(self):
+        if not self.node.is_leader:
+            return {"error": "Only the leader can aggregate entropy"}, 403
+
+        try:
+            next_leader = self.node.calculate_aggregate_entropy_and_elect_leader(run_broadcast=self.run_in_background)
+            if next_leader:
+                return {"message": "Aggregate entropy calculated and leader elected", "next_leader": next_leader}, 200
+            else:
+                return {"error": "Failed to calculate aggregate entropy"}, 500
+        except Exception as e:
+            self.logger.error(f"Error in aggregate_entropy: {str(e)}")
+            return {"error": "An error occurred"}, 500
+
+    # Block proposal and voting
+
+    def propose_block(self):
+        node = self.node
+        if not node.is_leader:
+            self.logger.error(f"Node {node.node_id} is not the leader. Leader ID: {node.leader_id}")
+            return {"error": "Only the leader can propose a block"}, 403
+
+        try:
+            aggregated_entropy = self.blockchain.calculate_aggregate_entropy()
+            new_block = node.propose_block(str(aggregated_entropy))
+            if not new_block:
+                return {"error": "Failed to propose a block"}, 500
+
+            block_data = new_block.to_dict()
+            self.logger.info(f"Proposing block: {block_data}")
+            # Set before broadcasting so early votes find the proposal.
+            self.node.accept_proposal(new_block)
+            if self.p2p_network and self.compact_blocks:
+                self.run_in_background(self.p2p_network.broadcast_compact_block, new_block)
+            elif self.p2p_network:
+                self.run_in_background(self.p2p_network.broadcast_block, "propose_block", new_block)
+            return {"message": "Block proposed and broadcasted", "block": block_data}, 200
+        except Exception as e:
+            self.logger.error(f"Error in propose_block: {str(e)}")
+            return {"error": "Failed to propose a block"}, 500
+
+    def receive_proposed_block(self, mimetype, body):
+        """
+        Validate a block proposed by the leader and broadcast this node's vote.
+        :param mimetype: BLOCK_CONTENT_TYPE or application/json
+        :param body: Raw request body
+        """
+        try:
+            proposed_block = decode_block(mimetype, body)
+        except UnsupportedMediaType as e:
+            return {"error": str(e)}, 415
+        except Exception as e:
+            self.logger.error(f"Error decoding proposed block: {str(e)}")
+            return {"error": "Malformed block"}, 400
+
+        self.logger.info(f"Received proposed block {proposed_block.index} ({proposed_block.hash})")
+        return self._accept_proposal(proposed_block)
+
+    def receive_compact_block(self, mimetype, body):
+        """
+        Rebuild a compact block proposal from the local pool, fetching only the missing
+        transactions from the proposer, then validate it and vote like a full proposal.
+        """
+        if mimetype != COMPACT_BLOCK_CONTENT_TYPE:
+            return {"error": f"Expected {COMPACT_BLOCK_CONTENT_TYPE}"}, 415
+        try:
+            compact = decode_compact(body)
+        except Exception as e:
+            self.logger.error(f"Error decoding compact block: {str(e)}")
+            return {"error": "Malformed compact block"}, 400
+
+        try:
+            transactions, missing = fill_from_pool(compact, self.node.transaction_pool)
+            if missing:
+                fetched = self._fetch_block_transactions(compact, missing)
+                if fetched is None:
+                    return {"error": "Could not fetch missing transactions"}, 502
+                for position, transaction in zip(missing, fetched):
+                    transactions[position] = transaction
+
+            block = build_block(compact, transactions)
+            if block is None:
+                # A short-id collision picked the wrong pooled transaction; fetch the whole body once.
+                self.logger.warning(f"Compact block {compact['index']} did not match its Merkle root; fetching all transactions.")
+                fetched = self._fetch_block_transactions(compact, list(range(len(transactions))))
+                block = build_block(compact, fetched) if fetched is not None else None
+                if block is None:
+                    return {"error": "Compact block does not match its Merkle root"}, 400
+        except Exception as e:
+            # decode_compact checks the header; this catches anything it cannot, e.g. unencodable fetched transactions.
+            self.logger.error(f"Error rebuilding compact block {compact['index']}: {str(e)}")
+            return {"error": "Malformed compact block"}, 400
+
+        self.logger.info(
+            f"Rebuilt compact block {block.index}: {len(transactions) - len(missing)} transactions from the pool, "
+            f"{len(missing)} fetched"
+        )
+        return self._accept_proposal(block)
+
+    def _fetch_block_transactions(self, compact, positions):
+        sender = compact.get("sender") or compact.get("proposer")
+        proposer_url = self.p2p_network.peer_url(sender)
+        if proposer_url is None:
+            self.logger.error(f"Unknown sender {sender} for compact block {compact['index']}.")
+            return None
+        try:
+            response = self.http_pool.post(
+                f"{proposer_url}/block_transactions",
+                json={"block_hash": compact["hash"], "positions": positions},
+            )
+            if response.status_code != 200:
+                self.logger.error(f"Fetching transactions for block {compact['index']} failed: {response.status_code}")
+                return None
+            transactions = response.json().get("transactions")
+            if not isinstance(transactions, list) or len(transactions) != len(positions):
+                self.logger.error(f"Proposer returned a malformed transaction list for block {compact['index']}.")
+                return None
+            return transactions
+        except Exception as e:
+            self.logger.error(f"Error fetching transactions for block {compact['index']}: {str(e)}")
+            return None
+
+    def block_transactions(self, data):
+        """
+        Serve transactions of a proposed or committed block by position, for compact block relay.
+        """
+        block_hash = data.get("block_hash") if data else None
+        positions = data.get("positions") if data else None
+        pending = self.blockchain.pending_block
+        block = pending if pending is not None and pending.hash == block_hash else self.blockchain.get_block_by_hash(block_hash)
+        if block is None:
+            return {"error": "Block not found"}, 404
+        if not isinstance(positions, list) or not all(
+            type(position) is int and 0 <= position < len(block.transactions) for position in positions
+        ):
+            return {"error": "Invalid transaction positions"}, 400
+        return {"transactions": [block.transactions[position] for position in positions]}, 200
+
+    def _accept_proposal(self, proposed_block):
+        """
+        Cache the proposal as pending, validate it and broadcast this node's vote.
+        """
+        try:
+            self.node.accept_proposal(proposed_block)
+
+            is_valid = self.node.validate_block(proposed_block)
+            response_status = "valid" if is_valid else "invalid"
+            self.run_in_background(
+                self.p2p_network.broadcast_validation, proposed_block, self.node.node_id, response_status
+            )
+            return {"message": "Proposed block processed", "status": response_status}, 200
+        except Exception as e:
+            self.logger.error(f"Error processing proposed block {proposed_block.index}: {str(e)}")
+            return {"error": "Failed to process proposed block"}, 500
+
+    def validate_block(self, data):
+        """
+        Record a validation vote ({"block_hash", "block_index", "node_id", "status"}) and
+        commit or reject the pending block once a majority agrees. Each block is decided once.
+        """
+        try:
+            block_hash = data.get("block_hash")
+            block_index = data.get("block_index")
+            node_id = data.get("node_id")
+            status = data.get("status")
+
+            if not block_hash or not node_id or status not in ("valid", "invalid"):
+                self.logger.error(f"Invalid validation payload: {data}")
+                return {"error": "Missing required fields"}, 400
+
+            self.logger.info(f"Validation response received: Block {block_index}, Node {node_id}, Status {status}")
+            outcome = self.node.record_vote(block_index, block_hash, node_id, status)
+
+            if outcome == "committed":
+                committed = self.blockchain.get_block_by_hash(block_hash)
+                self.run_in_background(self.p2p_network.broadcast_block, "blockchain_update", committed)
+                return {"message": "Block added to blockchain"}, 200
+            if outcome == "failed":
+                return {"error": "Block validation succeeded but failed to add to chain"}, 500
+            if outcome == "error":
+                return {"error": "Failed to apply the block decision"}, 500
+            if outcome == "rejected":
+                return {"message": "Block rejected"}, 200
+            if outcome == "processed":
+                self.logger.info(f"Block {block_index} has already been validated and processed. Ignoring.")
+                return {"message": "Block already processed"}, 200
+            if outcome == "duplicate":
+                self.logger.warning(f"Node {node_id} already voted on block {block_index}. Ignoring.")
+                return {"message": "Duplicate vote ignored"}, 200
+            return {"message": "Waiting for more responses"}, 200
+        except Exception as e:
+            self.logger.error(f"Error in validate_block: {str(e)}")
+            return {"error": "Failed to process validation"}, 500
+
+    def blockchain_update(self, mimetype, body):
+        """
+        Append a block committed by the network.
+        :param mimetype: BLOCK_CONTENT_TYPE or application/json
+        :param body: Raw request body
+        """
+        try:
+            block = decode_block(mimetype, body)
+        except UnsupportedMediaType as e:
+            return {"error": str(e)}, 415
+        except Exception as e:
+            self.logger.error(f"Error in blockchain_update: {str(e)}")
+            return {"error": "Failed to update blockchain"}, 500
+
+        try:
+            if self.blockchain.add_block(block):
+                self.logger.info(f"Blockchain updated with block {block.index}.")
+                return {"message": "Blockchain updated"}, 200
+            elif self.blockchain.get_block_by_hash(block.hash) is not None:
+                # Usually this node committed the block itself from the votes.
+                return {"message": "Block already in blockchain"}, 200
+            else:
+                self.logger.warning(f"Failed to update blockchain with block {block.index}.")
+                return {"error": "Failed to update blockchain"}, 409
+        except Exception as e:
+            self.logger.error(f"Error in blockchain_update: {str(e)}")
+            return {"error": "Failed to update blockchain"}, 500
+
+
+def summarize_ingest(results):
+    accepted = sum(1 for result in results if result["status"] == "accepted")
+    return {
+        "received": len(results),
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results,
+    }
+
+
+def create_node_service():
+    """
+    Build the node, its chain and its peer connections from environment variables.
+    :return: NodeService
+    """
+    node_id = os.getenv("NODE_ID", "default_node")
+    log_file = os.getenv("LOG_FILE", f"logs/{node_id}.log")
+    peer_urls = PEER_MAP.get(node_id, [])
+    data_dir = os.getenv("DATA_DIR")  # Block store directory; in-memory chain if unset
+    block_store_fsync = os.getenv("BLOCK_STORE_FSYNC", "always")  # always | interval | never
+    broadcast_deadline = float(os.getenv("BROADCAST_DEADLINE", 10.0))  # Seconds per broadcast across all peers
+    peer_pool_size = int(os.getenv("PEER_POOL_SIZE", 16))  # Keep-alive connections per peer
+    peer_connect_timeout = float(os.getenv("PEER_CONNECT_TIMEOUT", 3.05))  # Seconds
+    peer_read_timeout = float(os.getenv("PEER_READ_TIMEOUT", 5.0))  # Seconds
+    gossip_batch_size = int(os.getenv("GOSSIP_BATCH_SIZE", 500))  # Transactions per gossip batch
+    gossip_batch_delay = float(os.getenv("GOSSIP_BATCH_DELAY_MS", 50)) / 1000  # Max wait before a batch is sent
+    compact_blocks = os.getenv("COMPACT_BLOCKS", "1") != "0"  # Propose blocks as short transaction ids
+    block_interval = float(os.getenv("BLOCK_INTERVAL", 0))  # Seconds per scheduled round; 0 leaves rounds to the HTTP endpoints
+    entropy_fusion = os.getenv("ENTROPY_FUSION", "equal")  # equal | reputation (weigh entropy by validator reputation)
+    reputation_file = os.getenv("REPUTATION_FILE")  # Reputation scores JSON (default: DATA_DIR/reputation.json)
+    reputation_compact_every = int(os.getenv("REPUTATION_COMPACT_EVERY", 1000))  # Saved rounds between snapshot rewrites
+    signed_transactions = os.getenv("SIGNED_TRANSACTIONS", "0") == "1"  # Admit only transactions with valid signatures
+    signature_workers = int(os.getenv("SIGNATURE_WORKERS", 0)) or None  # Verification processes (default: CPU count)
+    signature_batch_size = int(os.getenv("SIGNATURE_BATCH_SIZE", 256))  # Signatures per worker task
+    signature_cache_size = int(os.getenv("SIGNATURE_CACHE_SIZE", 100_000))  # Verified transactions remembered
+    entropy_window = os.getenv("ENTROPY_WINDOW")  # Seconds the leader collects entropy per round (default: a third of BLOCK_INTERVAL)
+
+    logger = setup_logger(name=node_id, log_file=log_file)
+    http_pool = PeerSessionPool(
+        pool_maxsize=peer_pool_size,
+        connect_timeout=peer_connect_timeout,
+        read_timeout=peer_read_timeout,
+        logger=logger,
+    )
+    p2p_network = P2PNetwork(node_id=node_id, logger=logger, broadcast_deadline=broadcast_deadline, http_pool=http_pool)
+    p2p_network.peers = peer_urls
+
+    block_store = BlockStore(data_dir, fsync_policy=block_store_fsync, logger=logger) if data_dir else None
+    if reputation_file is None and data_dir:
+        reputation_file = os.path.join(data_dir, "reputation.json")
+    reputation = ReputationTable(path=reputation_file, logger=logger, compact_every=reputation_compact_every)
+    signature_verifier = SignatureVerifier(
+        workers=signature_workers,
+        batch_size=signature_batch_size,
+        cache_size=signature_cache_size,
+        logger=logger,
+    ) if signed_transactions else None
+    blockchain = Blockchain(
+        logger=logger,
+        store=block_store,
+        reputation=reputation,
+        weighted_fusion=(entropy_fusion == "reputation"),
+        signature_verifier=signature_verifier,
+    )
+    gossip = TransactionGossip(p2p_network, max_batch=gossip_batch_size, max_delay=gossip_batch_delay, logger=logger)
+    gossip.start()
+    node = Node(node_id, blockchain, logger=logger, p2p_network=p2p_network, gossip=gossip)
+    service = NodeService(node, http_pool=http_pool, gossip=gossip, compact_blocks=compact_blocks)
+
+    if node.node_id == "node1":
+        node.set_leader("node1")
+        service.run_in_background(p2p_network.broadcast_leader, node.leader_id)
+    else:
+        node.leader_id = None
+        node.is_leader = False
+
+    if block_interval > 0:
+        service.scheduler = RoundScheduler(
+            service,
+            interval=block_interval,
+            entropy_window=float(entropy_window) if entropy_window else None,
+            logger=logger,
+        )
+        service.scheduler.start()
+
+    return service
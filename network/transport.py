@@ -0,0 +1,362 @@
+import collections
+import errno
+import selectors
+import socket
+import struct
+import threading
+
+FRAME_HEADER = struct.Struct(">I")  # Payload length, big-endian
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+READ_CHUNK = 256 * 1024
+
+
+class FrameError(ValueError):
+    """Raised when a peer sends a frame the transport refuses to accept."""
+
+
+def encode_frame(payload):
+    """
+    Prefix a payload with its length.
+    :param payload: bytes (str is encoded as UTF-8)
+    :return: Framed bytes ready to write to a socket
+    """
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+class FrameDecoder:
+    """
+    Reassembles length-prefixed frames from an arbitrary split of the byte stream.
+    """
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """
+        Add received bytes.
+        :return: List of complete frame payloads, in order
+        """
+        buffer = self._buffer
+        buffer += data
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= FRAME_HEADER.size:
+            (length,) = FRAME_HEADER.unpack_from(buffer, offset)
+            if length > self.max_frame_size:
+                raise FrameError(f"Frame of {length} bytes exceeds limit of {self.max_frame_size}")
+            end = offset + FRAME_HEADER.size + length
+            if end > len(buffer):
+                break
+            frames.append(bytes(buffer[offset + FRAME_HEADER.size:end]))
+            offset = end
+        if offset:
+            del buffer[:offset]
+        return frames
+
+    def __len__(self):
+        return len(self._buffer)
+
+
+class Connection:
+    def __init__(self, sock, address, max_frame_size):
+        self.sock = sock
+        self.address = address
+        self.decoder = FrameDecoder(max_frame_size)
+        self.outgoing = bytearray()
+        self.write_blocked = False  # Output backlog above the high-water mark
+        self.handler_blocked = False  # Paused by the message handler
+        self.registered = True  # Registered with the selector
+
+    @property
+    def reading(self):
+        return not (self.write_blocked or self.handler_blocked)
+
+    def fileno(self):
+        return self.sock.fileno()
+
+
+class FramedTransport:
+    """
+    Single-threaded, selector-driven transport for length-prefixed messages.
+
+    One thread multiplexes the listening socket and every peer connection. Complete
+    frames are passed to `on_message(payload, connection)`; handlers that may block
+    should hand work off rather than run on the loop thread.
+
+    Backpressure: when a connection's unsent output exceeds `high_water` bytes the
+    loop stops reading from it until the backlog drains below `low_water`, and
+    `send` refuses new messages for it, so a slow peer cannot grow memory without bound.
+    A handler that returns False pauses reading from that connection until
+    `resume_reading` is called, letting slow consumers push back on fast senders.
+    """
+
+    def __init__(self, host, port, on_message, max_frame_size=MAX_FRAME_SIZE,
+                 high_water=4 * 1024 * 1024, low_water=1024 * 1024, logger=None):
+        self.host = host
+        self.port = port
+        self.on_message = on_message
+        self.max_frame_size = max_frame_size
+        self.high_water = high_water
+        self.low_water = low_water
+        self.logger = logger
+        self.connections = {}  # fileno -> Connection
+        self.peers = {}  # (host, port) -> Connection for outbound connections
+        self._resolved = {}  # (host, port) as given -> (ip, port) to connect to
+        self._selector = selectors.DefaultSelector()
+        self._listener = None
+        self._commands = collections.deque()  # Callables queued by other threads for the loop thread
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self._selector.register(self._wakeup_reader, selectors.EVENT_READ, None)
+        self._running = False
+        self._thread = None
+
+    # Lifecycle
+
+    def listen(self, backlog=1024):
+        listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        listener.bind((self.host, self.port))
+        listener.listen(backlog)
+        listener.setblocking(False)
+        self.port = listener.getsockname()[1]
+        self._listener = listener
+        self._selector.register(listener, selectors.EVENT_READ, None)
+
+    def start(self):
+        """
+        Listen and run the event loop on a background thread.
+        """
+        if self._listener is None:
+            self.listen()
+        self._running = True
+        self._thread = threading.Thread(target=self.serve_forever, name=f"transport-{self.port}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        for connection in list(self.connections.values()):
+            self._close(connection)
+        if self._listener:
+            self._selector.unregister(self._listener)
+            self._listener.close()
+            self._listener = None
+
+    def serve_forever(self):
+        self._running = True
+        while self._running:
+            for key, events in self._selector.select(timeout=1.0):
+                if key.fileobj is self._listener:
+                    self._accept()
+                elif key.fileobj is self._wakeup_reader:
+                    self._drain_wakeups()
+                else:
+                    connection = key.data
+                    if events & selectors.EVENT_WRITE:
+                        self._flush(connection)
+                    if events & selectors.EVENT_READ and connection.fileno() in self.connections:
+                        self._read(connection)
+            self._run_commands()
+
+    # Thread-safe API
+
+    def add_peer(self, address):
+        """
+        Resolve a peer's host name ahead of the first send. Safe to call from any thread.
+        :return: True if the address resolved
+        """
+        address = tuple(address)
+        try:
+            infos = socket.getaddrinfo(address[0], address[1], socket.AF_INET, socket.SOCK_STREAM)
+        except OSError as e:
+            if self.logger:
+                self.logger.error(f"Could not resolve peer {address}: {str(e)}")
+            return False
+        self._resolved[address] = infos[0][4]
+        return True
+
+    def send(self, address, payload):
+        """
+        Queue a message for a peer, connecting if needed. Safe to call from any thread.
+        Host names are resolved here, on the caller's thread, never on the loop thread.
+        :param address: (host, port) of the peer
+        :param payload: Message bytes or str (framed by the transport)
+        :return: False if the peer's address does not resolve (the message is dropped)
+        """
+        address = tuple(address)
+        if address not in self._resolved and not self.add_peer(address):
+            return False
+        frame = encode_frame(payload)
+        self._call_soon(self._enqueue, address, frame)
+        return True
+
+    def resume_reading(self, connection):
+        """
+        Undo a pause requested by the message handler. Safe to call from any thread.
+        """
+        self._call_soon(self._resume, connection)
+
+    def pending_bytes(self, address):
+        connection = self.peers.get(tuple(address))
+        return len(connection.outgoing) if connection else 0
+
+    # Loop internals
+
+    def _call_soon(self, func, *args):
+        self._commands.append((func, args))
+        self._wake()
+
+    def _wake(self):
+        try:
+            self._wakeup_writer.send(b"\0")
+        except (BlockingIOError, InterruptedError):
+            pass  # A wakeup is already pending
+
+    def _drain_wakeups(self):
+        try:
+            while self._wakeup_reader.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _run_commands(self):
+        while self._commands:
+            func, args = self._commands.popleft()
+            try:
+                func(*args)
+            except Exception as e:
+                # One bad command must not kill the loop thread and every later send with it.
+                if self.logger:
+                    self.logger.error(f"Transport command {func.__name__} failed: {str(e)}")
+
+    def _enqueue(self, address, frame):
+        connection = self.peers.get(address)
+        if connection is None:
+            connection = self._connect(address)
+            if connection is None:
+                return
+        if len(connection.outgoing) >= self.high_water:
+            if self.logger:
+                self.logger.warning(f"Dropping message to {address}: {len(connection.outgoing)} bytes already queued.")
+            return
+        connection.outgoing += frame
+        self._flush(connection)
+
+    def _resume(self, connection):
+        if connection.handler_blocked and connection.fileno() in self.connections:
+            connection.handler_blocked = False
+            self._update_interest(connection)
+
+    def _connect(self, address):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        try:
+            result = sock.connect_ex(self._resolved.get(address, address))
+        except OSError as e:
+            result = e.errno or str(e)
+        if result not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sock.close()
+            self._resolved.pop(address, None)  # Resolve again on the next send, in case the peer moved
+            if self.logger:
+                self.logger.error(f"Failed to connect to peer {address}: {errno.errorcode.get(result, result)}")
+            return None
+        connection = self._register(sock, address)
+        self.peers[address] = connection
+        return connection
+
+    def _accept(self):
+        while True:
+            try:
+                sock, address = self._listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            self._register(sock, address)
+
+    def _register(self, sock, address):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        connection = Connection(sock, address, self.max_frame_size)
+        self.connections[connection.fileno()] = connection
+        self._selector.register(sock, selectors.EVENT_READ, connection)
+        return connection
+
+    def _update_interest(self, connection):
+        events = 0
+        if connection.reading:
+            events |= selectors.EVENT_READ
+        if connection.outgoing:
+            events |= selectors.EVENT_WRITE
+        if events and connection.registered:
+            self._selector.modify(connection.sock, events, connection)
+        elif events:
+            self._selector.register(connection.sock, events, connection)
+            connection.registered = True
+        elif connection.registered:
+            # Selectors cannot hold a socket with no events; drop it until reading resumes.
+            self._selector.unregister(connection.sock)
+            connection.registered = False
+
+    def _read(self, connection):
+        try:
+            data = connection.sock.recv(READ_CHUNK)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            self._close(connection, f"read error: {e}")
+            return
+        if not data:
+            self._close(connection)
+            return
+
+        try:
+            frames = connection.decoder.feed(data)
+        except FrameError as e:
+            self._close(connection, str(e))
+            return
+
+        for frame in frames:
+            try:
+                if self.on_message(frame, connection) is False:
+                    connection.handler_blocked = True
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Message handler failed for {connection.address}: {str(e)}")
+        if connection.handler_blocked:
+            self._update_interest(connection)
+
+    def _flush(self, connection):
+        if connection.outgoing:
+            try:
+                sent = connection.sock.send(connection.outgoing)
+                del connection.outgoing[:sent]
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError as e:
+                self._close(connection, f"write error: {e}")
+                return
+
+        backlog = len(connection.outgoing)
+        if backlog >= self.high_water:
+            connection.write_blocked = True
+        elif backlog <= self.low_water:
+            connection.write_blocked = False
+        self._update_interest(connection)
+
+    def _close(self, connection, reason=None):
+        if self.connections.pop(connection.fileno(), None) is None:
+            return
+        if self.peers.get(tuple(connection.address)) is connection:
+            del self.peers[tuple(connection.address)]
+        if connection.registered:
+            self._selector.unregister(connection.sock)
+            connection.registered = False
+        connection.sock.close()
+        if reason and self.logger:
+            self.logger.warning(f"Closed connection to {connection.address}: {reason}")
@@ -0,0 +1,36 @@
+import os
+import runpy
+
+import network.service
+from api import create_app
+from tests.test_async_api import make_service
+
+API_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api.py")
+
+
+def test_spawned_workers_do_not_build_a_node(monkeypatch):
+    # A spawned signature verification worker runs the parent's main script as __mp_main__
+    # (multiprocessing.spawn uses runpy.run_path); that must not build a second node.
+    def fail():
+        raise AssertionError("api.py built a node service at import time")
+
+    monkeypatch.setattr(network.service, "create_node_service", fail)
+    namespace = runpy.run_path(API_PATH, run_name="__mp_main__")
+    assert "create_app" in namespace
+    assert "service" not in namespace and "app" not in namespace
+
+
+def test_create_app_serves_the_given_service():
+    service = make_service()
+    client = create_app(service).test_client()
+
+    response = client.post("/add_transaction", json={"transaction": {"id": "tx1", "data": "a"}})
+    assert response.status_code == 200
+    response = client.get("/transaction_pool")
+    assert [transaction["id"] for transaction in response.get_json()["transaction_pool"]] == ["tx1"]
+
+    response = client.get("/blockchain")
+    assert [block["index"] for block in response.get_json()] == [0]
+    response = client.get("/block/height/0")
+    assert response.status_code == 200
+    assert client.get("/block/height/5").status_code == 404
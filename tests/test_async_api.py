@@ -0,0 +1,227 @@
+import asyncio
+import json
+import logging
+import time
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from async_api import create_app
+from blockchain.block import Block
+from blockchain.blockchain import Blockchain
+from blockchain.compact import COMPACT_BLOCK_CONTENT_TYPE, to_compact
+from blockchain.encoding import encode_value
+from network.http_pool import PeerSessionPool
+from network.node import Node
+from network.p2p import P2PNetwork
+from network.service import NodeService
+from tests.test_p2p import StubSession
+
+logger = logging.getLogger("AsyncApiTest")
+
+
+def make_service(node_id="node1", scripts=None, broadcast_deadline=5.0):
+    session = StubSession(scripts or {})
+    p2p_network = P2PNetwork(node_id, logger=logger, http_pool=session, broadcast_deadline=broadcast_deadline, retry_delay=0.01)
+    p2p_network.peers = list(scripts or {})
+    node = Node(node_id, Blockchain(logger=logger), logger=logger, p2p_network=p2p_network)
+    return NodeService(node)
+
+
+def run(service, scenario):
+    """
+    Serve the aiohttp app for `service` on a local port and run `scenario(client)` against it.
+    """
+    async def main():
+        client = TestClient(TestServer(create_app(service)))
+        await client.start_server()
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+
+    return asyncio.run(main())
+
+
+def test_transaction_routes():
+    service = make_service()
+
+    async def scenario(client):
+        response = await client.post("/add_transaction", json={"transaction": {"id": "tx1", "data": "a"}})
+        assert response.status == 200
+        response = await client.post("/add_transaction", json={"wrong": 1})
+        assert response.status == 400
+
+        body = "\n".join(json.dumps({"id": f"bulk{i}", "data": i}) for i in range(3)) + "\n" + json.dumps({"id": "x"})
+        response = await client.post("/add_transactions", data=body.encode())
+        summary = await response.json()
+        assert response.status == 200
+        assert (summary["accepted"], summary["rejected"]) == (3, 1)
+
+        response = await client.get("/transaction_pool")
+        pool = (await response.json())["transaction_pool"]
+        assert [transaction["id"] for transaction in pool] == ["tx1", "bulk0", "bulk1", "bulk2"]
+
+    run(service, scenario)
+
+
+def test_leader_routes_and_round_stats():
+    service = make_service()
+
+    async def scenario(client):
+        response = await client.post("/set_leader", json={"leader_id": "node1"})
+        assert response.status == 200
+        response = await client.get("/get_leader")
+        assert (await response.json()) == {"leader": "node1"}
+        response = await client.post("/set_leader", json={})
+        assert response.status == 400
+        response = await client.get("/round_stats")
+        assert response.status == 404  # No BLOCK_INTERVAL, no scheduler
+
+    run(service, scenario)
+
+
+def test_aggregate_entropy_answers_before_the_broadcast_finishes():
+    service = make_service(scripts={"http://node2": [1.0]})
+    service.node.set_leader("node1")
+    service.blockchain.node_entropies["node1"] = "0.100000_0.200000"
+    service.blockchain.node_entropies["node2"] = "0.300000_0.400000"
+
+    async def scenario(client):
+        start = time.monotonic()
+        response = await client.post("/aggregate_entropy")
+        elapsed = time.monotonic() - start
+        assert response.status == 200
+        assert (await response.json())["next_leader"] in ("node1", "node2")
+        assert elapsed < 0.9  # The slow peer is waited on in the background, not in the request
+
+    run(service, scenario)
+    service.background.shutdown(wait=True)
+    assert [url for url, _, _ in service.p2p_network.http.calls] == ["http://node2/receive_aggregate_entropy"]
+
+
+def test_block_routes_and_duplicate_update():
+    service = make_service()
+    blockchain = service.blockchain
+    block = Block(1, blockchain.chain[-1].hash, [{"id": "tx1", "data": "a"}], "0.5")
+
+    async def scenario(client):
+        headers = {"Content-Type": "application/x-poc-block"}
+        response = await client.post("/blockchain_update", data=block.to_bytes(), headers=headers)
+        assert response.status == 200
+        response = await client.post("/blockchain_update", data=block.to_bytes(), headers=headers)
+        assert response.status == 200  # Already held: not an error the sender should retry
+        response = await client.post("/blockchain_update", data=b"{}", headers={"Content-Type": "text/plain"})
+        assert response.status == 415
+
+        response = await client.get("/blockchain")
+        assert [entry["hash"] for entry in await response.json()] == [blockchain.chain[0].hash, block.hash]
+        response = await client.get(f"/block/{block.hash}", headers={"Accept": "application/x-poc-block"})
+        assert Block.from_bytes(await response.read()).hash == block.hash
+        response = await client.get("/block/height/7")
+        assert response.status == 404
+
+    run(service, scenario)
+
+
+def test_malformed_compact_blocks_are_rejected_with_400():
+    service = make_service()
+    good = to_compact(Block(1, service.blockchain.chain[-1].hash, [{"id": "tx1", "data": "a"}], "0.5"))
+    missing_hash = {key: value for key, value in good.items() if key != "hash"}
+    bad_index = dict(good, index="one")
+
+    async def scenario(client):
+        headers = {"Content-Type": COMPACT_BLOCK_CONTENT_TYPE}
+        for payload in (encode_value(missing_hash), encode_value(dict(good, hash="not hex")), encode_value(bad_index), b"\x08"):
+            response = await client.post("/receive_compact_block", data=payload, headers=headers)
+            assert response.status == 400
+
+    run(service, scenario)
+
+
+def test_network_stats_reports_the_peer_pool():
+    service = make_service()
+    service.http_pool = PeerSessionPool()
+    service.http_pool.session_for("http://node2")
+
+    async def scenario(client):
+        response = await client.get("/network_stats")
+        assert response.status == 200
+        assert (await response.json()) == {
+            "peers": {"http://node2": {"requests": 1, "connections_opened": 0, "connections_reused": 1}}
+        }
+
+    run(service, scenario)
+
+
+def test_block_broadcast_falls_back_to_json_for_peers_answering_415():
+    service = make_service(scripts={"http://legacy": [415, 200], "http://modern": [200]})
+    network, session = service.p2p_network, service.p2p_network.http
+    block = Block(1, service.blockchain.chain[-1].hash, [{"id": "tx1", "data": "a"}], "0.5")
+
+    results = network.broadcast_block("blockchain_update", block)
+    assert all(result["ok"] for result in results.values())
+    legacy = [payload for url, payload, _ in session.calls if url.startswith("http://legacy/")]
+    assert legacy == [None, block.to_dict()]  # Binary first, then JSON after the 415
+    assert network.json_only_peers == {"http://legacy"}
+
+    network.broadcast_block("blockchain_update", block)
+    legacy = [payload for url, payload, _ in session.calls if url.startswith("http://legacy/")]
+    modern = [payload for url, payload, _ in session.calls if url.startswith("http://modern/")]
+    assert legacy[2] == block.to_dict()  # Remembered: straight to JSON
+    assert modern == [None, None]
+
+
+def test_proposal_routes_accept_binary_and_json_and_answer_415_otherwise():
+    service = make_service(scripts={"http://node2": [200]})
+    block = Block(1, service.blockchain.chain[-1].hash, [], "0.5")
+
+    async def scenario(client):
+        response = await client.post("/receive_proposed_block", data=block.to_bytes(),
+                                     headers={"Content-Type": "application/x-poc-block"})
+        assert response.status == 200
+        response = await client.post("/receive_proposed_block", json=block.to_dict())
+        assert response.status == 200
+        response = await client.post("/receive_proposed_block", data=b"x", headers={"Content-Type": "text/plain"})
+        assert response.status == 415
+
+    run(service, scenario)
+
+
+def test_votes_carry_only_the_block_reference_and_commit_the_pending_block():
+    service = make_service(scripts={"http://node2": [200]})
+    block = Block(1, service.blockchain.chain[-1].hash, [], "0.5")
+
+    async def scenario(client):
+        response = await client.post("/receive_proposed_block", json=block.to_dict())
+        assert (await response.json())["status"] == "valid"
+        calls = service.p2p_network.http.calls
+        for _ in range(200):  # The vote is broadcast in the background
+            if calls:
+                break
+            await asyncio.sleep(0.01)
+
+        (url, vote, _), = calls
+        assert url == "http://node2/validate_block"
+        assert vote == {"block_hash": block.hash, "block_index": 1, "node_id": "node1", "status": "valid"}
+
+        # Two of two nodes valid: the peer's slim vote commits the block held from the proposal.
+        service.node.record_vote(1, block.hash, "node1", "valid")
+        response = await client.post("/validate_block", json=dict(vote, node_id="node2"))
+        assert (await response.json()) == {"message": "Block added to blockchain"}
+        assert service.blockchain.get_block_by_hash(block.hash) is not None
+
+    run(service, scenario)
+
+
+def test_signature_stats_without_a_verifier():
+    service = make_service()
+
+    async def scenario(client):
+        response = await client.get("/signature_stats")
+        body = await response.json()
+        assert response.status == 200
+        assert body["verifier"] is None
+        assert set(body["public_key_cache"]["in_process"]) == {"size", "hits", "misses", "evictions", "hit_rate"}
+
+    run(service, scenario)
+
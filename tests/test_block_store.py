@@ -0,0 +1,109 @@
+import logging
+import os
+import threading
+
+from blockchain.blockchain import Blockchain
+from blockchain.block import Block
+from blockchain.chain_view import ChainView
+from blockchain.storage import BlockStore
+
+logger = logging.getLogger("BlockStoreTest")
+
+
+def grow_chain(blockchain, count):
+    for i in range(count):
+        block = Block(
+            index=len(blockchain.chain),
+            previous_hash=blockchain.chain[-1].hash,
+            transactions=[{"id": f"tx{len(blockchain.chain)}-{i}", "data": "payload"}],
+            entropy="0.123456",
+        )
+        assert blockchain.add_block(block)
+
+
+def test_chain_survives_restart(tmp_path):
+    store = BlockStore(str(tmp_path), logger=logger)
+    blockchain = Blockchain(logger=logger, store=store)
+    grow_chain(blockchain, 5)
+    hashes = [block.hash for block in blockchain.chain]
+    store.close()
+
+    restored = Blockchain(logger=logger, store=BlockStore(str(tmp_path), logger=logger))
+    assert [block.hash for block in restored.chain] == hashes
+    assert restored.chain[3].transactions == blockchain.chain[3].transactions
+    assert restored.get_block_by_hash(hashes[4]).index == 4
+
+
+def test_torn_tail_is_truncated(tmp_path):
+    store = BlockStore(str(tmp_path), fsync_policy="never", logger=logger)
+    blockchain = Blockchain(logger=logger, store=store)
+    grow_chain(blockchain, 3)
+    store.close()
+
+    segment_path = os.path.join(str(tmp_path), BlockStore.SEGMENT_FILE)
+    intact_size = os.path.getsize(segment_path)
+    with open(segment_path, "ab") as segment:
+        segment.write(b"\x00\x00\x01\x00partial")
+
+    store = BlockStore(str(tmp_path), logger=logger)
+    assert len(store) == 4
+    assert os.path.getsize(segment_path) == intact_size
+
+
+def test_unindexed_records_are_recovered(tmp_path):
+    store = BlockStore(str(tmp_path), logger=logger)
+    blockchain = Blockchain(logger=logger, store=store)
+    grow_chain(blockchain, 3)
+    store.close()
+
+    # Simulate a crash between the segment write and the index write.
+    index_path = os.path.join(str(tmp_path), BlockStore.INDEX_FILE)
+    with open(index_path, "r+b") as index:
+        index.truncate(2 * BlockStore.INDEX_ENTRY.size + 3)
+
+    restored = Blockchain(logger=logger, store=BlockStore(str(tmp_path), logger=logger))
+    assert len(restored.chain) == 4
+    assert os.path.getsize(index_path) == 4 * BlockStore.INDEX_ENTRY.size
+
+
+def test_persisted_chain_is_lazy_view(tmp_path):
+    store = BlockStore(str(tmp_path), logger=logger)
+    blockchain = Blockchain(logger=logger, store=store)
+    grow_chain(blockchain, 4)
+
+    assert isinstance(blockchain.chain, ChainView)
+    assert len(blockchain.chain) == 5
+    assert blockchain.chain[-1].index == 4
+    assert [block.index for block in blockchain.chain[1:3]] == [1, 2]
+    assert blockchain.chain[2].transactions == ({"id": "tx2-1", "data": "payload"},)
+    assert blockchain.chain[-1].previous_hash == blockchain.chain[3].hash
+
+
+def test_concurrent_commits_store_each_block_once(tmp_path):
+    blockchain = Blockchain(logger=logger, store=BlockStore(str(tmp_path), fsync_policy="never", logger=logger))
+    threads_per_block = 8
+    for i in range(30):
+        block = Block(
+            index=len(blockchain.chain),
+            previous_hash=blockchain.chain[-1].hash,
+            transactions=[{"id": f"tx{i}", "data": "payload"}],
+            entropy="0.123456",
+        )
+        barrier = threading.Barrier(threads_per_block)
+        results = []
+
+        def commit():
+            barrier.wait()
+            results.append(blockchain.add_block(block))
+
+        threads = [threading.Thread(target=commit) for _ in range(threads_per_block)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results.count(True) == 1
+
+    assert len(blockchain.store) == 31
+    restored = Blockchain(logger=logger, store=BlockStore(str(tmp_path), logger=logger))
+    assert len(restored.chain) == 31
+
@@ -0,0 +1,65 @@
+import logging
+
+import pytest
+
+from blockchain.blockchain import Blockchain
+from blockchain.block import Block
+from blockchain.transaction import Transaction
+
+logger = logging.getLogger("ChainTest")
+
+
+def make_block(blockchain, transactions):
+    return Block(
+        index=len(blockchain.chain),
+        previous_hash=blockchain.chain[-1].hash,
+        transactions=transactions,
+        entropy="0.123456",
+    )
+
+
+def test_hash_and_height_lookups():
+    blockchain = Blockchain(logger=logger)
+    block = make_block(blockchain, [{"id": "tx1", "data": "a"}])
+    assert blockchain.add_block(block)
+
+    assert blockchain.get_block_by_hash(block.hash) is block
+    assert blockchain.get_block_by_height(1) is block
+    assert blockchain.get_block_by_height(0) is blockchain.chain[0]
+    assert blockchain.get_block_by_height(2) is None
+    assert blockchain.get_block_by_hash("unknown") is None
+
+
+def test_duplicate_block_rejected():
+    blockchain = Blockchain(logger=logger)
+    block = make_block(blockchain, [{"id": "tx1", "data": "a"}])
+    assert blockchain.add_block(block)
+    assert not blockchain.add_block(block)
+    assert len(blockchain.chain) == 2
+
+
+def test_block_is_immutable_after_hashing():
+    block = Block(1, "0" * 64, [{"id": "tx1", "data": "a"}], "0.5")
+    for field, value in (("index", 2), ("entropy", "0.6"), ("hash", "f" * 64), ("transactions", [])):
+        with pytest.raises(AttributeError):
+            setattr(block, field, value)
+    assert block.compute_hash() == block.hash
+
+
+def test_cached_hash_cannot_be_replaced_and_body_edits_are_caught():
+    blockchain = Blockchain(logger=logger)
+    block = make_block(blockchain, [{"id": "tx1", "data": "a"}])
+    with pytest.raises(AttributeError):
+        block._computed_hash = "f" * 64
+    assert block.verify_transactions()
+
+    block.transactions[0]["data"] = "tampered"
+    assert not block.verify_transactions()
+    assert not blockchain.add_block(block)
+
+
+def test_transaction_is_immutable_after_hashing():
+    transaction = Transaction(sender="Alice", receiver="Bob", amount=50)
+    with pytest.raises(AttributeError):
+        transaction.amount = 500
+    assert transaction.compute_hash() == transaction.transaction_id
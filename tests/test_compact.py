@@ -0,0 +1,119 @@
+import pytest
+
+import blockchain.compact as compact_module
+from blockchain.block import Block
+from blockchain.compact import build_block, decode_compact, encode_compact, fill_from_pool, short_id, to_compact
+from blockchain.encoding import EncodingError, encode_value
+from blockchain.mempool import Mempool
+
+
+def make_block(count):
+    transactions = [{"id": f"tx{i}", "data": f"payload {i}"} for i in range(count)]
+    return Block(1, "ab" * 32, transactions, "0.5", timestamp=1.5, proposer="node1")
+
+
+def test_compact_block_rebuilds_from_pool():
+    block = make_block(20)
+    pool = Mempool()
+    for transaction in reversed(block.transactions):
+        pool.add(transaction)
+    pool.add({"id": "unrelated", "data": "x"})
+
+    compact = decode_compact(encode_compact(to_compact(block)))
+    assert compact["sender"] == "node1"
+    transactions, missing = fill_from_pool(compact, pool)
+    assert missing == []
+
+    rebuilt = build_block(compact, transactions)
+    assert rebuilt.hash == block.hash
+    assert rebuilt.proposer == "node1"
+    assert list(rebuilt.transactions) == list(block.transactions)
+
+
+def test_compact_block_reports_missing_positions():
+    block = make_block(10)
+    pool = Mempool()
+    for position, transaction in enumerate(block.transactions):
+        if position not in (2, 7):
+            pool.add(transaction)
+
+    compact = to_compact(block)
+    transactions, missing = fill_from_pool(compact, pool)
+    assert missing == [2, 7]
+    assert transactions[2] is None
+
+    for position in missing:
+        transactions[position] = block.transactions[position]
+    assert build_block(compact, transactions).hash == block.hash
+
+
+def test_pool_short_ids_are_hashed_once_per_block(monkeypatch):
+    calls = []
+
+    def counting_short_id(key, transaction_id):
+        calls.append(transaction_id)
+        return short_id(key, transaction_id)
+
+    monkeypatch.setattr(compact_module, "short_id", counting_short_id)
+    block = make_block(10)
+    pool = Mempool()
+    pool.add_many(block.transactions[:9])
+    for i in range(500):
+        pool.add({"id": f"other{i}", "data": i})
+
+    compact = to_compact(block)
+    calls.clear()
+    transactions, missing = fill_from_pool(compact, pool)
+    assert missing == [9]
+    assert len(calls) == 509  # The index is built once for this block's key
+
+    # Later pool changes update the index; rebuilding again only looks the block's ids up.
+    pool.add(block.transactions[9])
+    pool.remove("tx3")
+    calls.clear()
+    transactions, missing = fill_from_pool(compact, pool)
+    assert missing == [3]
+    assert transactions[9] == block.transactions[9]
+    assert calls == []
+
+
+def test_compact_block_with_wrong_transaction_fails_merkle_check():
+    block = make_block(3)
+    transactions = list(block.transactions)
+    transactions[1] = {"id": "tx1", "data": "tampered"}
+    assert build_block(to_compact(block), transactions) is None
+
+
+def test_compact_encoding_is_smaller_than_full_block():
+    block = make_block(500)
+    assert len(encode_compact(to_compact(block))) * 5 < len(block.to_bytes())
+
+
+@pytest.mark.parametrize("field, value", [
+    ("hash", None),
+    ("hash", "zz" * 32),
+    ("hash", "ab"),
+    ("index", None),
+    ("index", -1),
+    ("index", "1"),
+    ("previous_hash", None),
+    ("timestamp", "now"),
+    ("entropy", 0.5),
+    ("proposer", 7),
+    ("short_ids", b"12345"),
+])
+def test_malformed_compact_block_rejected(field, value):
+    compact = to_compact(make_block(3))
+    if value is None:
+        del compact[field]
+    else:
+        compact[field] = value
+    with pytest.raises(EncodingError):
+        decode_compact(encode_value(compact))
+
+
+def test_truncated_compact_block_rejected():
+    data = encode_compact(to_compact(make_block(3)))
+    with pytest.raises(EncodingError):
+        decode_compact(data[:-3])
+
@@ -0,0 +1,98 @@
+import random
+
+import pytest
+
+import blockchain.consensus as consensus
+from blockchain.consensus import (
+    entropy_to_numeric,
+    find_order_mismatch,
+    order_transaction_ids,
+    reorder_transactions,
+    weighted_average_fusion,
+    weighted_minkowski_distance,
+)
+from blockchain.election import ElectionRound
+from blockchain.entropy_table import EntropyTable
+
+
+def make_transactions(count):
+    return [{"id": f"tx{i}", "data": i} for i in range(count)]
+
+
+def test_reorder_is_independent_of_input_order():
+    transactions = make_transactions(50)
+    shuffled = transactions[:]
+    random.Random(7).shuffle(shuffled)
+
+    assert reorder_transactions(transactions, "3016671560.8") == reorder_transactions(shuffled, "3016671560.8")
+
+
+def test_reorder_matches_id_ordering():
+    transactions = make_transactions(20)
+    ordered = reorder_transactions(transactions, "12.5")
+    ids = order_transaction_ids((tx["id"] for tx in transactions), "12.5")
+    assert [tx["id"] for tx in ordered] == ids
+    assert ordered != transactions
+    assert ordered != reorder_transactions(transactions, "12.6")
+
+
+def test_reorder_leaves_global_random_untouched():
+    random.seed(1234)
+    expected = random.random()
+    random.seed(1234)
+    reorder_transactions(make_transactions(10), "1.0")
+    assert random.random() == expected
+
+
+def test_find_order_mismatch_reports_first_difference():
+    transactions = make_transactions(10)
+    pool_ids = [tx["id"] for tx in transactions]
+    block_ids = [tx["id"] for tx in reorder_transactions(transactions, "5.0")]
+
+    assert find_order_mismatch(block_ids, pool_ids, "5.0") is None
+
+    swapped = block_ids[:]
+    swapped[3], swapped[4] = swapped[4], swapped[3]
+    assert find_order_mismatch(swapped, pool_ids, "5.0") == (3, block_ids[3], block_ids[4])
+    assert find_order_mismatch(block_ids[:-1], pool_ids, "5.0") == (9, block_ids[9], None)
+    assert find_order_mismatch(block_ids + ["extra"], pool_ids, "5.0") == (10, None, "extra")
+
+
+def test_find_order_mismatch_checks_a_matching_block_without_sorting(monkeypatch):
+    transactions = make_transactions(50)
+    pool_ids = [tx["id"] for tx in transactions]
+    block_ids = [tx["id"] for tx in reorder_transactions(transactions, "5.0")]
+
+    ranked = []
+    transaction_rank = consensus.transaction_rank
+
+    def counting_rank(key, transaction_id):
+        ranked.append(transaction_id)
+        return transaction_rank(key, transaction_id)
+
+    monkeypatch.setattr(consensus, "transaction_rank", counting_rank)
+    monkeypatch.setattr(consensus, "order_transaction_ids", lambda *args: pytest.fail("matching block was sorted"))
+    assert find_order_mismatch(iter(block_ids), iter(pool_ids), "5.0") is None
+    assert ranked == block_ids
+
+    # Same size but a foreign id: only now is the pool ordered, to report the difference.
+    monkeypatch.setattr(consensus, "order_transaction_ids", order_transaction_ids)
+    foreign = block_ids[:-1] + ["foreign"]
+    assert find_order_mismatch(foreign, pool_ids, "5.0") == (49, block_ids[49], "foreign")
+
+
+def test_entropy_table_matches_reference_fusion_and_election():
+    entropies = {f"node{i}": f"{random.Random(i).random():.6f}_{i / 1000:.6f}" for i in range(200)}
+    table = EntropyTable(entropies)
+    weights = {f"node{i}": i % 7 for i in range(200)}
+
+    assert table.fuse() == weighted_average_fusion(entropies)
+    assert table.fuse(weights) == weighted_average_fusion(entropies, weights)
+
+    aggregated = f"{table.fuse():.6f}"
+    target = entropy_to_numeric(aggregated)
+    expected = min(
+        entropies,
+        key=lambda node_id: weighted_minkowski_distance(entropy_to_numeric(entropies[node_id]), target),
+    )
+    assert ElectionRound.from_table(table).closest(target)[0] == expected
@@ -0,0 +1,53 @@
+import random
+
+from blockchain.block import Block
+from blockchain.consensus import entropy_to_numeric
+from blockchain.election import ElectionRound, LeaderElection
+from blockchain.entropy_table import EntropyTable
+
+
+def brute_force(numerics, target):
+    return min(numerics, key=lambda node_id: (abs(numerics[node_id] - target), node_id))
+
+
+def test_bisect_matches_brute_force_with_ties():
+    rng = random.Random(3)
+    for _ in range(200):
+        numerics = {f"node{i}": rng.randrange(20) for i in range(rng.randrange(1, 12))}
+        election_round = ElectionRound(numerics.items())
+        for target in range(-2, 23):
+            assert election_round.closest(target)[0] == brute_force(numerics, target)
+
+
+def test_result_is_independent_of_arrival_order():
+    entropies = {f"node{i}": f"{random.Random(i).random():.6f}_{i / 1000:.6f}" for i in range(50)}
+    reversed_table = EntropyTable(dict(reversed(list(entropies.items()))))
+    aggregated = f"{EntropyTable(entropies).fuse():.6f}"
+
+    first = LeaderElection().elect(1, EntropyTable(entropies), aggregated)
+    second = LeaderElection().elect(1, reversed_table, aggregated)
+    assert first == second
+    assert first == brute_force({node_id: entropy_to_numeric(e) for node_id, e in entropies.items()},
+                                entropy_to_numeric(aggregated))
+
+
+def test_rounds_are_memoized_and_verifiable():
+    table = EntropyTable({"node2": "0.1_0.2", "node3": "0.3_0.4"})
+    elections = LeaderElection()
+    leader = elections.elect(5, table, "0.250000")
+
+    table["node4"] = "0.5_0.6"  # Later arrivals do not change a round already elected
+    assert elections.elect(5, table, "0.250000") == leader
+    assert elections.leader_for(5) == leader
+
+    assert elections.verify(Block(5, "0" * 64, [], "0.25", proposer=leader)) is True
+    assert elections.verify(Block(5, "0" * 64, [], "0.25", proposer="intruder")) is False
+    assert elections.verify(Block(6, "0" * 64, [], "0.25", proposer=leader)) is None
+
+
+def test_recorded_leaders_are_bounded():
+    elections = LeaderElection(max_rounds=3)
+    for index in range(5):
+        elections.record(index, f"node{index}")
+    assert elections.leader_for(1) is None
+    assert elections.leader_for(4) == "node4"
@@ -0,0 +1,117 @@
+import logging
+
+import pytest
+
+from blockchain.block import Block
+from blockchain.blockchain import Blockchain
+from blockchain.encoding import EncodingError, decode_value, encode_value
+from blockchain.merkle import merkle_proof, merkle_root, verify_merkle_proof
+
+logger = logging.getLogger("EncodingTest")
+
+
+def test_value_roundtrip():
+    value = {
+        "id": "tx1",
+        "amount": -12345678901234567890,
+        "timestamp": 1732594647.500145,
+        "flags": [True, False, None],
+        "raw": b"\x00\xff",
+        "nested": {"ü": 0.1, "a": []},
+    }
+    decoded, offset = decode_value(encode_value(value))
+    assert decoded == value
+    assert offset == len(encode_value(value))
+
+
+def test_encoding_ignores_dict_insertion_order():
+    assert encode_value({"a": 1, "b": 2}) == encode_value({"b": 2, "a": 1})
+
+
+def test_encoding_distinguishes_types():
+    assert encode_value(1) != encode_value(1.0)
+    assert encode_value(1) != encode_value(True)
+    assert encode_value("1") != encode_value(1)
+
+
+def test_block_hash_is_canonical():
+    first = Block(1, "0" * 64, [{"id": "tx1", "data": "a", "amount": 5}], "0.5", timestamp=1.5)
+    second = Block(1, "0" * 64, [{"amount": 5, "data": "a", "id": "tx1"}], "0.5", timestamp=1.5)
+    assert first.hash == second.hash
+
+
+def test_block_bytes_roundtrip():
+    block = Block(3, "ab" * 32, [{"id": "tx1", "data": "a"}], "0.123456", timestamp=1732894630.123456)
+    restored = Block.from_bytes(block.to_bytes())
+    assert restored.to_dict() == block.to_dict()
+    assert restored.timestamp == block.timestamp
+
+
+def test_truncated_block_rejected():
+    data = Block(3, "ab" * 32, [{"id": "tx1", "data": "a"}], "0.1").to_bytes()
+    with pytest.raises(EncodingError):
+        Block.from_bytes(data[:-5])
+
+
+def test_merkle_proofs_verify_for_every_position():
+    for count in (1, 2, 3, 5, 8, 13):
+        transactions = [{"id": f"tx{i}", "data": i} for i in range(count)]
+        root = merkle_root(transactions)
+        for position, transaction in enumerate(transactions):
+            proof = merkle_proof(transactions, position)
+            assert verify_merkle_proof(transaction, proof, root)
+            assert not verify_merkle_proof({"id": "forged", "data": 0}, proof, root)
+
+
+def test_block_hash_covers_merkle_root():
+    block = Block(1, "0" * 64, [{"id": "tx1", "data": "a"}], "0.5", timestamp=1.5)
+    tampered = Block.from_dict(dict(block.to_dict(), transactions=[{"id": "tx1", "data": "b"}]))
+    assert tampered.validate()
+    assert not tampered.verify_transactions()
+
+    recomputed = Block(1, "0" * 64, [{"id": "tx1", "data": "b"}], "0.5", timestamp=1.5)
+    assert recomputed.hash != block.hash
+
+
+def test_proposer_is_hashed_only_when_set():
+    block = Block(3, "ab" * 32, [{"id": "tx1", "data": "a"}], "0.1", timestamp=2.5)
+    proposed = Block(3, "ab" * 32, [{"id": "tx1", "data": "a"}], "0.1", timestamp=2.5, proposer="node2")
+    assert proposed.hash != block.hash
+
+    restored = Block.from_bytes(proposed.to_bytes())
+    assert restored.proposer == "node2"
+    assert restored.validate()
+
+
+def test_version_2_blocks_still_decode():
+    block = Block(3, "ab" * 32, [{"id": "tx1", "data": "a"}], "0.1", timestamp=2.5)
+    data = block.to_bytes()
+    # Version 2 had no proposer field between the header and the block hash.
+    header_end = len(data) - len(encode_value(block.hash)) - len(encode_value(block.transactions)) - 1
+    legacy = bytes([2]) + data[1:header_end] + data[header_end + 1:]
+
+    restored = Block.from_bytes(legacy)
+    assert restored.proposer is None
+    assert restored.hash == block.hash
+    assert restored.validate()
+
+
+def test_int_length_limit():
+    largest = 2 ** (255 * 8 - 1) - 1
+    assert decode_value(encode_value(largest))[0] == largest
+    assert decode_value(encode_value(-largest))[0] == -largest
+    with pytest.raises(EncodingError):
+        encode_value(largest + 1)
+
+
+def test_unencodable_transactions_are_not_pooled():
+    blockchain = Blockchain(logger=logger)
+    oversized = {"id": "big", "data": "x", "amount": int("9" * 700)}
+    unsupported = {"id": "set", "data": {1, 2}}
+    assert not blockchain.add_transaction_to_pool(oversized)
+    assert blockchain.add_transactions_to_pool([oversized, unsupported, {"id": "ok", "data": "x"}]) == [
+        {"id": "ok", "data": "x"}
+    ]
+    block = Block(1, blockchain.chain[-1].hash, blockchain.get_transactions_from_pool(), "0.5")
+    assert blockchain.add_block(block)
+
@@ -0,0 +1,49 @@
+import threading
+import time
+
+from network.gossip import TransactionGossip
+
+
+class RecordingNetwork:
+    def __init__(self):
+        self.batches = []
+        self.sent = threading.Event()
+
+    def fan_out(self, endpoint, payload, deadline=None, description=None):
+        self.batches.append((endpoint, list(payload)))
+        self.sent.set()
+        return {}
+
+
+def make_transactions(count):
+    return [{"id": f"tx{i}", "data": i} for i in range(count)]
+
+
+def test_gossip_sends_full_batches():
+    network = RecordingNetwork()
+    gossip = TransactionGossip(network, max_batch=10, max_delay=60)
+    gossip.start()
+    try:
+        gossip.submit_many(make_transactions(25))
+        deadline = time.monotonic() + 2
+        while len(network.batches) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [len(batch) for _, batch in network.batches] == [10, 10]
+    finally:
+        gossip.stop()
+
+    assert [len(batch) for _, batch in network.batches] == [10, 10, 5]
+    assert all(endpoint == "add_transactions" for endpoint, _ in network.batches)
+
+
+def test_gossip_flushes_partial_batch_after_delay():
+    network = RecordingNetwork()
+    gossip = TransactionGossip(network, max_batch=1000, max_delay=0.2)
+    gossip.start()
+    try:
+        for transaction in make_transactions(3):
+            gossip.submit(transaction)
+        assert network.sent.wait(2)
+        assert network.batches == [("add_transactions", make_transactions(3))]
+    finally:
+        gossip.stop()
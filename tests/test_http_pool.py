@@ -0,0 +1,96 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from network.http_pool import PeerSessionPool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections open between requests
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Answers every request itself, recording the timeout it was sent with.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.timeouts = []
+
+    def send(self, request, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        response = requests.Response()
+        response.status_code = 200
+        response.request = request
+        response.url = request.url
+        return response
+
+
+def serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_requests_to_a_peer_reuse_one_session_and_connection():
+    server, peer = serve()
+    pool = PeerSessionPool(pool_maxsize=4)
+    try:
+        for i in range(5):
+            assert pool.post(f"{peer}/add_transaction", json={"n": i}).status_code == 200
+        assert pool.session_for(peer) is pool.session_for(peer)
+        stats = pool.stats()[peer]
+        assert stats["requests"] == 7  # session_for counts as a request
+        assert stats["connections_opened"] == 1
+        assert stats["connections_reused"] == 6
+    finally:
+        pool.close()
+        server.shutdown()
+        server.server_close()
+
+
+def test_sessions_and_stats_are_per_peer():
+    first, first_peer = serve()
+    second, second_peer = serve()
+    pool = PeerSessionPool()
+    try:
+        pool.post(f"{first_peer}/a", json={})
+        pool.post(f"{second_peer}/b", json={})
+        pool.post(f"{second_peer}/b", json={})
+        stats = pool.stats()
+        assert set(stats) == {first_peer, second_peer}
+        assert stats[first_peer]["requests"] == 1 and stats[second_peer]["requests"] == 2
+        assert pool.peer_of(f"{second_peer}/b?x=1") == second_peer
+    finally:
+        pool.close()
+        first.shutdown()
+        first.server_close()
+        second.shutdown()
+        second.server_close()
+
+
+def test_timeouts_default_to_connect_read_and_are_clamped_to_the_deadline():
+    pool = PeerSessionPool(connect_timeout=3.05, read_timeout=5.0)
+    adapter = RecordingAdapter()
+    pool.session_for("http://peer").mount("http://", adapter)
+
+    pool.post("http://peer/x", json={})
+    pool.post("http://peer/x", json={}, timeout=4.0)  # Time left before a broadcast deadline
+    pool.post("http://peer/x", json={}, timeout=0.5)
+    pool.post("http://peer/x", json={}, timeout=(1, 9))  # Explicit tuples pass through
+    assert adapter.timeouts == [(3.05, 5.0), (3.05, 4.0), (0.5, 0.5), (1, 9)]
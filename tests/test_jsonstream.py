@@ -0,0 +1,40 @@
+import io
+import json
+
+import pytest
+
+from utils.jsonstream import JSONStreamError, iter_json_values
+
+
+def parse(body, chunk_size=7):
+    return list(iter_json_values(io.BytesIO(body), chunk_size=chunk_size))
+
+
+def test_array_and_ndjson_bodies():
+    transactions = [{"id": f"tx{i}", "data": "ü" * i, "amount": 10 ** i} for i in range(20)]
+    assert parse(json.dumps(transactions).encode()) == transactions
+    assert parse("\n".join(json.dumps(tx) for tx in transactions).encode()) == transactions
+
+
+def test_values_split_across_chunks():
+    # Numbers and multi-byte characters must not be cut at chunk boundaries.
+    assert parse(b"[123456789, \"\xc3\xbc\xc3\xbc\"]", chunk_size=1) == [123456789, "üü"]
+    assert parse(b"123456789\n42", chunk_size=2) == [123456789, 42]
+
+
+def test_empty_bodies():
+    assert parse(b"") == []
+    assert parse(b" [ ] \n") == []
+
+
+@pytest.mark.parametrize("body", [b"[1, 2", b"[1 2]", b"[1,]", b"[1] 2", b"{\"id\": "])
+def test_malformed_bodies(body):
+    with pytest.raises(JSONStreamError):
+        parse(body)
+
+
+def test_values_are_yielded_before_the_body_ends():
+    values = iter_json_values(io.BytesIO(b"[{\"id\": \"tx1\"}, {\"id\": "), chunk_size=4)
+    assert next(values) == {"id": "tx1"}
+    with pytest.raises(JSONStreamError):
+        next(values)
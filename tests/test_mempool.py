@@ -0,0 +1,72 @@
+from blockchain.blockchain import Blockchain
+from blockchain.mempool import Mempool
+
+
+def make_transactions(count):
+    return [{"id": f"tx{i}", "data": f"payload {i}"} for i in range(count)]
+
+
+def test_mempool_keeps_insertion_order():
+    pool = Mempool()
+    transactions = make_transactions(5)
+    for tx in transactions:
+        assert pool.add(tx)
+
+    assert pool.take(3) == transactions[:3]
+    assert pool.to_list() == transactions
+    assert len(pool) == 5
+
+
+def test_mempool_rejects_duplicate_ids():
+    pool = Mempool()
+    assert pool.add({"id": "tx1", "data": "a"})
+    assert not pool.add({"id": "tx1", "data": "b"})
+    assert pool.get("tx1")["data"] == "a"
+
+
+def test_mempool_remove_many_by_id():
+    pool = Mempool()
+    transactions = make_transactions(10)
+    for tx in transactions:
+        pool.add(tx)
+
+    assert pool.remove_many(transactions[2:5] + [{"id": "missing", "data": ""}]) == 3
+    assert "tx3" not in pool
+    assert pool.take(4) == [transactions[0], transactions[1], transactions[5], transactions[6]]
+
+
+def test_blockchain_pool_is_mempool():
+    blockchain = Blockchain()
+    for tx in make_transactions(3):
+        assert blockchain.add_transaction_to_pool(tx)
+    assert not blockchain.add_transaction_to_pool({"id": "tx0", "data": "again"})
+
+    blockchain.remove_transactions_from_pool(make_transactions(2))
+    assert blockchain.get_transactions_from_pool() == [{"id": "tx2", "data": "payload 2"}]
+
+
+def test_mempool_add_many_dedupes_in_one_pass():
+    pool = Mempool()
+    pool.add({"id": "tx0", "data": "pooled"})
+    batch = make_transactions(3) + [{"id": "tx1", "data": "repeat"}]
+
+    added = pool.add_many(batch)
+    assert [tx["id"] for tx in added] == ["tx1", "tx2"]
+    assert pool.get("tx1")["data"] == "payload 1"
+    assert len(pool) == 3
+
+
+def test_short_id_index_follows_pool_changes():
+    pool = Mempool()
+    pool.add_many([{"id": "tx1"}, {"id": "tx2"}, {"id": "ab1"}])
+    index = pool.short_id_index(b"key", lambda key, transaction_id: transaction_id[:2])
+    assert index == {"tx": None, "ab": "ab1"}  # tx1 and tx2 share a short id
+
+    pool.remove("tx1")
+    pool.remove("ab1")
+    pool.add({"id": "cd1"})
+    assert index == {"tx": None, "cd": "cd1"}  # A shared id stays unresolved
+    assert pool.short_id_index(b"key", None) is index
+
+    pool.clear()
+    assert pool.short_id_index(b"key", lambda key, transaction_id: transaction_id) == {}
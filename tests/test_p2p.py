@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+
+import requests
+
+from network.p2p import P2PNetwork
+
+logger = logging.getLogger("P2PTest")
+
+
+class StubResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class StubSession:
+    """
+    Stands in for PeerSessionPool: each peer answers with the next item of its script,
+    which is a status code, an exception to raise, or a delay in seconds (a float) before a 200.
+    """
+
+    def __init__(self, scripts):
+        self.scripts = {peer: list(script) for peer, script in scripts.items()}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def post(self, url, json=None, data=None, headers=None, timeout=None):
+        peer = url.rsplit("/", 1)[0]
+        with self._lock:
+            self.calls.append((url, json, timeout))
+            script = self.scripts[peer]
+            step = script.pop(0) if len(script) > 1 else script[0]
+        if isinstance(step, Exception):
+            raise step
+        if isinstance(step, float):
+            time.sleep(step)
+            return StubResponse(200)
+        return StubResponse(step)
+
+
+def make_network(scripts, **kwargs):
+    session = StubSession(scripts)
+    network = P2PNetwork("node1", logger=logger, http_pool=session, retry_delay=0.01, **kwargs)
+    network.peers = list(scripts)
+    return network, session
+
+
+def calls_to(session, peer):
+    return [call for call in session.calls if call[0].startswith(peer + "/")]
+
+
+def test_slow_peer_does_not_hold_up_the_broadcast():
+    network, session = make_network({"http://slow": [2.0], "http://fast": [200]})
+    start = time.monotonic()
+    results = network.fan_out("add_transaction", {"transaction": {}}, deadline=0.3)
+    assert time.monotonic() - start < 1.0
+    assert results["http://fast"] == {"ok": True, "status": 200, "error": None}
+    assert results["http://slow"]["error"] == "deadline exceeded"
+    assert calls_to(session, "http://slow")[0][2] <= 0.3  # The request timeout is clamped to the deadline
+
+
+def test_only_unavailable_and_unreachable_peers_are_retried():
+    network, session = make_network({
+        "http://rejects": [500],
+        "http://conflict": [409],
+        "http://busy": [503, 503, 200],
+        "http://down": [requests.ConnectionError("refused")],
+    })
+    results = network.fan_out("blockchain_update", {}, deadline=5)
+
+    assert results["http://rejects"]["status"] == 500 and len(calls_to(session, "http://rejects")) == 1
+    assert results["http://conflict"]["status"] == 409 and len(calls_to(session, "http://conflict")) == 1
+    assert results["http://busy"]["ok"] and len(calls_to(session, "http://busy")) == 3
+    assert not results["http://down"]["ok"] and len(calls_to(session, "http://down")) == 3
+
+
+def test_expired_deadline_sends_nothing():
+    network, session = make_network({"http://a": [200], "http://b": [200]})
+    results = network.fan_out("add_transaction", {}, deadline=0)
+    assert session.calls == []
+    assert all(result["error"] == "deadline exceeded" for result in results.values())
+
+
+def test_leader_and_aggregate_broadcasts_are_bounded_by_the_deadline():
+    network, session = make_network(
+        {"http://down": [requests.ConnectionError("refused")], "http://up": [200]}, broadcast_deadline=0.5
+    )
+    start = time.monotonic()
+    leader_results = network.broadcast_leader("node2", round_index=4)
+    aggregate_results = network.broadcast_aggregate_entropy("0.500000", "node2", round_index=4)
+    assert time.monotonic() - start < 2.0
+    assert leader_results["http://up"]["ok"] and not leader_results["http://down"]["ok"]
+    assert aggregate_results["http://up"]["ok"] and not aggregate_results["http://down"]["ok"]
+
+    sent = {url: payload for url, payload, _ in calls_to(session, "http://up")}
+    assert sent["http://up/set_leader"] == {"leader_id": "node2", "round": 4}
+    assert sent["http://up/receive_aggregate_entropy"] == {
+        "aggregate_entropy": "0.500000", "next_leader": "node2", "round": 4
+    }
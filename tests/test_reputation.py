@@ -0,0 +1,110 @@
+import json
+import random
+
+from blockchain.consensus import weighted_average_fusion
+from blockchain.entropy_table import EntropyTable
+from blockchain.reputation import DEFAULT_REPUTATION, ReputationTable
+from blockchain.votes import VoteTracker
+
+
+def make_entropies(count):
+    return {f"node{i}": f"{random.Random(i).random():.6f}_{i / 1000:.6f}" for i in range(count)}
+
+
+def test_running_weighted_sum_matches_reference_fusion():
+    reputation = ReputationTable()
+    table = EntropyTable(weights=reputation)
+    entropies = make_entropies(100)
+    rng = random.Random(5)
+
+    for node_id, entropy in entropies.items():
+        table[node_id] = entropy
+        reputation.adjust(f"node{rng.randrange(150)}", rng.choice((-5, 5, 10, -10)))
+    table["node3"] = "0.5_0.5"  # Replacing an entropy moves the sums too
+    entropies["node3"] = "0.5_0.5"
+    del table["node7"]
+    del entropies["node7"]
+    reputation.adjust("node9", -1000)  # Floors at zero, dropping the node from fusion
+
+    weights = {node_id: reputation[node_id] for node_id in entropies}
+    assert weights["node9"] == 0
+    assert table.fuse() == weighted_average_fusion(entropies, weights)
+    assert table.fuse(weights) == table.fuse()
+
+
+def test_unweighted_table_is_unchanged():
+    entropies = make_entropies(20)
+    assert EntropyTable(entropies).fuse() == weighted_average_fusion(entropies)
+
+
+def test_record_round_scores_voters_and_proposer():
+    reputation = ReputationTable()
+    reputation.record_round({"node1": "valid", "node2": "valid", "node3": "invalid"}, "accepted", proposer="node1")
+    assert reputation["node1"] == DEFAULT_REPUTATION + 10
+    assert reputation["node2"] == DEFAULT_REPUTATION + 5
+    assert reputation["node3"] == DEFAULT_REPUTATION - 5
+    assert reputation["node4"] == DEFAULT_REPUTATION
+
+
+def test_quorum_callback_sees_every_ballot():
+    seen = []
+    tracker = VoteTracker(total_nodes=3, on_quorum=lambda vote_round: seen.append(dict(vote_round.voters)))
+    tracker.record(1, "h", "node2", "invalid")
+    tracker.record(1, "h", "node3", "valid")
+    tracker.record(1, "h", "node4", "valid")
+    assert seen == [{"node2": "invalid", "node3": "valid", "node4": "valid"}]
+    assert tracker.get(1, "h").voters == {}
+
+
+def test_reputation_persists_atomically(tmp_path):
+    path = tmp_path / "reputation.json"
+    reputation = ReputationTable(path=str(path))
+    assert reputation.save() is False  # Nothing changed yet
+
+    reputation.adjust("node2", 15)
+    assert reputation.save() is True
+    assert reputation.compact() is True
+    assert json.loads(path.read_text()) == {"node2": DEFAULT_REPUTATION + 15}
+    assert [p.name for p in tmp_path.iterdir()] == ["reputation.json"]
+
+    restored = ReputationTable(path=str(path))
+    assert restored["node2"] == DEFAULT_REPUTATION + 15
+    assert restored["node3"] == DEFAULT_REPUTATION
+
+
+def test_saves_append_only_changed_scores_and_compact_periodically(tmp_path):
+    path = tmp_path / "reputation.json"
+    log_path = tmp_path / "reputation.json.log"
+    reputation = ReputationTable(path=str(path), compact_every=3)
+    for node in range(100):
+        reputation.adjust(f"node{node}", 1)
+    assert reputation.save() is True
+    assert not path.exists()
+
+    reputation.record_round({"node1": "valid", "node2": "invalid"}, "accepted", proposer="node3")
+    assert reputation.save() is True
+    entries = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert len(entries[0]) == 100
+    assert entries[1] == {
+        "node1": DEFAULT_REPUTATION + 6, "node2": DEFAULT_REPUTATION - 4, "node3": DEFAULT_REPUTATION + 11,
+    }
+
+    # A restart replays the log over the (missing) snapshot and cuts off a torn last line.
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write('{"node1": 9')
+    restored = ReputationTable(path=str(path), compact_every=3)
+    assert restored.to_dict() == reputation.to_dict()
+    assert log_path.read_text().count("\n") == 2 and log_path.read_text().endswith("\n")
+
+    # Its next save is the third append, which folds the log into the snapshot.
+    restored.adjust("node9", 1)
+    assert restored.save() is True
+    assert not log_path.exists()
+    assert json.loads(path.read_text()) == restored.to_dict()
+
+    restored.adjust("node4", -20)
+    restored.save()
+    assert log_path.exists()
+    restored.close()
+    assert not log_path.exists()
+    assert ReputationTable(path=str(path)).to_dict() == restored.to_dict()
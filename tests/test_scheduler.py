@@ -0,0 +1,148 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from blockchain.entropy_table import EntropyTable
+from blockchain.votes import VoteTracker
+from network.scheduler import RoundScheduler
+
+
+class FakeBlock:
+    def __init__(self, index):
+        self.index = index
+        self.hash = f"hash{index}"
+
+
+class FakeBlockchain:
+    def __init__(self):
+        self.node_entropies = EntropyTable()
+        self.pending_block = None
+        self.committed = {}
+
+    def get_block_by_hash(self, block_hash):
+        return self.committed.get(block_hash)
+
+
+class FakeNode:
+    def __init__(self, blockchain, is_leader):
+        self.node_id = "node1"
+        self.is_leader = is_leader
+        self.blockchain = blockchain
+        self.votes = VoteTracker(total_nodes=3, on_quorum=self.commit)
+        self.elections = 0
+
+    def commit(self, vote_round):
+        self.blockchain.committed[vote_round.block_hash] = self.blockchain.pending_block
+        return "committed"
+
+    def calculate_aggregate_entropy_and_elect_leader(self):
+        self.elections += 1
+        return "node2"
+
+
+class FakeService:
+    def __init__(self, is_leader=True):
+        self.blockchain = FakeBlockchain()
+        self.node = FakeNode(self.blockchain, is_leader)
+        self.logger = logging.getLogger("test_scheduler")
+        self.background = ThreadPoolExecutor(max_workers=2)
+        self.entropy_sent = 0
+
+    def send_entropy(self):
+        self.entropy_sent += 1
+        return {}, 200
+
+    def propose_block(self):
+        self.blockchain.pending_block = FakeBlock(len(self.blockchain.committed) + 1)
+        return {}, 200
+
+    def run_in_background(self, func, *args):
+        return self.background.submit(func, *args)
+
+
+def vote(service, block, voters=("node2", "node3")):
+    for voter in voters:
+        service.node.votes.record(block.index, block.hash, voter, "valid")
+
+
+def test_follower_only_sends_entropy():
+    service = FakeService(is_leader=False)
+    scheduler = RoundScheduler(service, interval=1, entropy_window=0)
+
+    assert scheduler.run_round() is None
+    assert service.entropy_sent == 1
+    assert service.blockchain.pending_block is None
+    assert scheduler.stats()["phases"]["entropy"]["count"] == 1
+
+
+def test_leader_proposes_elects_and_times_votes_in_background():
+    service = FakeService()
+    service.blockchain.node_entropies["node2"] = "entropy"
+    scheduler = RoundScheduler(service, interval=1, entropy_window=0, vote_timeout=5)
+
+    block = scheduler.run_round()
+    assert block.index == 1
+    assert service.node.elections == 1
+    assert len(service.blockchain.node_entropies) == 0  # Cleared for the next round
+
+    vote(service, block)
+    service.background.shutdown(wait=True)
+    stats = scheduler.stats()
+    assert stats["rounds"]["proposed"] == 1
+    assert {phase: values["count"] for phase, values in stats["phases"].items()} == {
+        "entropy": 1, "propose": 1, "elect": 1, "vote": 1,
+    }
+
+
+def test_leader_skips_round_without_entropy():
+    service = FakeService()
+    scheduler = RoundScheduler(service, interval=1, entropy_window=0)
+
+    assert scheduler.run_round() is None
+    assert service.blockchain.pending_block is None
+    assert scheduler.stats()["rounds"]["skipped"] == 1
+
+
+def test_next_proposal_waits_for_the_previous_decision():
+    service = FakeService()
+    scheduler = RoundScheduler(service, interval=1, entropy_window=0, vote_timeout=5)
+    service.blockchain.node_entropies["node2"] = "entropy"
+    first = scheduler.run_round()
+
+    service.blockchain.node_entropies["node3"] = "entropy"
+    voting = threading.Timer(0.1, vote, (service, first))
+    voting.start()
+    second = scheduler.run_round()
+    voting.join()
+
+    assert first.hash in service.blockchain.committed
+    assert second.index == 2
+    vote(service, second)
+    service.background.shutdown(wait=True)
+    assert scheduler.stats()["phases"]["vote"]["count"] == 2
+
+
+def test_undecided_previous_round_blocks_the_proposal():
+    service = FakeService()
+    scheduler = RoundScheduler(service, interval=1, entropy_window=0, vote_timeout=0.05)
+    service.blockchain.node_entropies["node2"] = "entropy"
+    first = scheduler.run_round()
+
+    service.blockchain.node_entropies["node3"] = "entropy"
+    assert scheduler.run_round() is None
+    assert service.blockchain.pending_block is first
+    service.background.shutdown(wait=False)
+
+
+def test_scheduler_thread_runs_rounds_on_the_interval():
+    service = FakeService(is_leader=False)
+    scheduler = RoundScheduler(service, interval=0.02)
+    scheduler.start()
+    try:
+        time.sleep(0.2)
+    finally:
+        scheduler.stop(timeout=1)
+
+    assert service.entropy_sent >= 3
+    assert scheduler.stats()["running"] is False
@@ -0,0 +1,102 @@
+import logging
+
+from blockchain.blockchain import Blockchain
+from blockchain.signatures import SignatureVerifier, sign_transaction, verify_transaction_signature
+from utils.crypto import PublicKeyCache, generate_ed25519_keypair, generate_rsa_keypair, serialize_public_key
+
+ED25519_KEY, _ = generate_ed25519_keypair()
+logger = logging.getLogger("SignatureTest")
+
+
+def make_signed(count, key=ED25519_KEY):
+    return [sign_transaction({"id": f"tx{i}", "data": f"payload {i}"}, key) for i in range(count)]
+
+
+def test_ed25519_and_rsa_signatures_verify():
+    rsa_key, _ = generate_rsa_keypair()
+    for key in (ED25519_KEY, rsa_key):
+        transaction = make_signed(1, key)[0]
+        assert verify_transaction_signature(transaction)
+        assert not verify_transaction_signature(dict(transaction, data="tampered"))
+
+
+def test_verifier_caches_only_valid_transactions():
+    verifier = SignatureVerifier(workers=1)
+    transactions = make_signed(3)
+    forged = dict(transactions[1], id="tx1-forged")
+
+    assert verifier.verify_many(transactions + [forged, {"id": "tx9", "data": "unsigned"}]) == [
+        True, True, True, False, False,
+    ]
+    assert verifier.verify_many(transactions + [forged]) == [True, True, True, False]
+    assert verifier.stats == {"verified": 3, "rejected": 2, "cache_hits": 3}
+
+
+def test_cache_is_bounded():
+    verifier = SignatureVerifier(workers=1, cache_size=2)
+    transactions = make_signed(3)
+    verifier.verify_many(transactions)
+    verifier.verify_many(transactions[:1])
+    assert verifier.stats["cache_hits"] == 0  # tx0 was evicted first
+
+
+def test_process_pool_batches_match_inline_results(caplog):
+    transactions = make_signed(40)
+    transactions[7] = dict(transactions[7], data="tampered")
+    transactions[23] = dict(transactions[23], id="tx23-forged")
+    transactions[31] = {"id": "tx31", "data": "unsigned"}
+    expected = [position not in (7, 23, 31) for position in range(40)]
+    verifier = SignatureVerifier(workers=2, batch_size=8, inline_below=0, logger=logger)
+    try:
+        pool = verifier._pool()
+        chunk_sizes = []
+        pool_map = pool.map
+
+        def recording_map(func, chunks):
+            chunks = list(chunks)
+            chunk_sizes.extend(len(chunk) for chunk in chunks)
+            return pool_map(func, chunks)
+
+        pool.map = recording_map
+        with caplog.at_level(logging.ERROR):
+            assert verifier.verify_many(transactions) == expected
+        assert "inline" not in caplog.text  # Verified in the workers, not by the fallback
+        assert chunk_sizes == [8, 8, 8, 8, 7]  # The unsigned transaction never reaches a worker
+        assert verifier.stats == {"verified": 37, "rejected": 2, "cache_hits": 0}
+    finally:
+        verifier.close()
+
+
+def test_blockchain_admits_only_signed_transactions():
+    blockchain = Blockchain(logger=logger, signature_verifier=SignatureVerifier(workers=1))
+    signed = make_signed(2)
+
+    assert blockchain.add_transaction_to_pool(signed[0])
+    assert not blockchain.add_transaction_to_pool({"id": "tx5", "data": "unsigned"})
+    added = blockchain.add_transactions_to_pool([signed[1], dict(signed[0], id="copy")])
+    assert added == [signed[1]]
+
+
+def test_public_key_cache_skips_repeat_deserialization():
+    cache = PublicKeyCache(max_size=2)
+    pems = [serialize_public_key(generate_ed25519_keypair()[1]) for _ in range(3)]
+
+    first = cache.get(pems[0])
+    assert cache.get(pems[0].decode("ascii")) is first  # Same fingerprint for bytes and str
+    cache.get(pems[1])
+    cache.get(pems[2])  # Evicts pems[0], the least recently used
+    cache.get(pems[0])
+
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 4, "evictions": 2, "hit_rate": 0.2}
+
+
+def test_worker_key_cache_stats_reach_the_parent():
+    verifier = SignatureVerifier(workers=2, batch_size=5, inline_below=0)
+    try:
+        assert all(verifier.verify_many(make_signed(20)))
+        workers = verifier.key_cache_stats()["workers"]
+        assert workers["hits"] + workers["misses"] == 20  # One key lookup per verification, all in the workers
+        assert 1 <= workers["misses"] <= 2  # One sender key, parsed once per worker
+        assert workers["hit_rate"] >= 0.9
+    finally:
+        verifier.close()
@@ -0,0 +1,64 @@
+import pytest
+
+from blockchain.block import Block
+from contracts.state import AccountState, StateError, block_transfers
+from contracts.token_contract import TokenContract
+
+
+def make_block(index, transactions):
+    return Block(index, "0" * 64, transactions, "0.5_0.5")
+
+
+def test_block_is_applied_in_order_and_rolled_back():
+    contract = TokenContract("Test", "TST", 100, "alice")
+    contract.approve("alice", "carol", 30)
+    block = make_block(1, [
+        {"id": "1", "sender": "alice", "receiver": "bob", "amount": 60},
+        {"id": "2", "sender": "bob", "receiver": "dave", "amount": 50},  # Spends what bob just received
+        {"id": "3", "sender": "alice", "receiver": "bob", "amount": 25, "spender": "carol"},
+        {"id": "4", "data": "not a transfer"},
+    ])
+
+    diff = contract.apply_block(block)
+    assert contract.balances == {"alice": 15, "bob": 35, "dave": 50}
+    assert contract.allowance("alice", "carol") == 5
+    assert diff.block_index == 1 and diff.balances == {"alice": 100, "bob": None, "dave": None}
+
+    contract.rollback_block(block)
+    assert contract.balances == {"alice": 100}
+    assert contract.allowance("alice", "carol") == 30
+
+
+def test_failing_transfer_leaves_state_untouched():
+    state = AccountState({"alice": 10})
+    for transfers, position in (
+        ([("alice", "bob", 5, None), ("alice", "carol", 6, None)], 1),  # Overdraws after the first
+        ([("alice", "bob", 5, None), ("bob", "carol", 0, None)], 1),
+        ([("alice", "bob", 5, "carol")], 0),  # No allowance
+        ([("alice", "bob", "5", None)], 0),
+    ):
+        with pytest.raises(StateError) as error:
+            state.apply_transfers(transfers)
+        assert error.value.position == position
+        assert state.balances == {"alice": 10} and state.allowances == {}
+    assert not state.diffs
+
+
+def test_rollback_is_most_recent_first():
+    state = AccountState({"alice": 10})
+    state.apply_transfers([("alice", "bob", 4, None)], 1, "a" * 64)
+    state.apply_transfers([("bob", "carol", 3, None)], 2, "b" * 64)
+
+    with pytest.raises(StateError):
+        state.rollback("a" * 64)  # Block 2 is still applied on top of it
+    assert state.rollback("b" * 64).block_index == 2
+    assert state.balances == {"alice": 6, "bob": 4}
+    state.rollback()
+    assert state.balances == {"alice": 10}
+    with pytest.raises(StateError):
+        state.rollback()
+
+
+def test_block_transfers_skips_other_transactions():
+    block = make_block(3, [{"id": "1", "data": "x"}, {"sender": "a", "receiver": "b", "amount": 2}])
+    assert block_transfers(block) == [("a", "b", 2, None)]
@@ -0,0 +1,86 @@
+import json
+import queue
+
+import pytest
+
+from network.transport import FrameDecoder, FrameError, FramedTransport, encode_frame
+
+
+def test_decoder_handles_split_and_coalesced_frames():
+    messages = [b"a" * 5000, b"", json.dumps({"type": "x", "payload": {"v": "ü"}}).encode()]
+    stream = b"".join(encode_frame(message) for message in messages)
+
+    decoder = FrameDecoder()
+    received = []
+    for i in range(0, len(stream), 7):
+        received.extend(decoder.feed(stream[i:i + 7]))
+    assert received == messages
+    assert len(decoder) == 0
+
+    assert FrameDecoder().feed(stream) == messages
+
+
+def test_decoder_rejects_oversized_frame():
+    decoder = FrameDecoder(max_frame_size=10)
+    with pytest.raises(FrameError):
+        decoder.feed(encode_frame(b"x" * 11))
+
+
+def test_transport_delivers_large_messages_in_order():
+    received = queue.Queue()
+    server = FramedTransport("127.0.0.1", 0, lambda frame, connection: received.put(frame))
+    client = FramedTransport("127.0.0.1", 0, lambda frame, connection: None)
+    server.start()
+    client.start()
+    try:
+        messages = [json.dumps({"type": "t", "payload": {"n": n, "pad": "x" * (n * 997)}}) for n in range(50)]
+        for message in messages:
+            client.send(("127.0.0.1", server.port), message)
+        assert [received.get(timeout=5).decode() for _ in messages] == messages
+    finally:
+        client.stop()
+        server.stop()
+
+
+def test_handler_can_pause_and_resume_a_connection():
+    received = queue.Queue()
+
+    def on_message(frame, connection):
+        received.put((frame, connection))
+        return False  # Pause after every message
+
+    server = FramedTransport("127.0.0.1", 0, on_message)
+    client = FramedTransport("127.0.0.1", 0, lambda frame, connection: None)
+    server.start()
+    client.start()
+    try:
+        client.send(("127.0.0.1", server.port), b"first")
+        frame, connection = received.get(timeout=5)
+        assert frame == b"first"
+
+        client.send(("127.0.0.1", server.port), b"second")
+        with pytest.raises(queue.Empty):
+            received.get(timeout=0.2)
+
+        server.resume_reading(connection)
+        assert received.get(timeout=5)[0] == b"second"
+    finally:
+        client.stop()
+        server.stop()
+
+
+def test_unresolvable_peer_and_failing_command_do_not_stop_the_loop():
+    received = queue.Queue()
+    server = FramedTransport("127.0.0.1", 0, lambda frame, connection: received.put(frame))
+    client = FramedTransport("127.0.0.1", 0, lambda frame, connection: None)
+    server.start()
+    client.start()
+    try:
+        assert client.send(("no-such-peer.invalid", 5000), b"lost") is False
+        client._call_soon(lambda: 1 / 0)
+        assert client.send(("127.0.0.1", server.port), b"delivered")
+        assert received.get(timeout=5) == b"delivered"
+        assert client._thread.is_alive()
+    finally:
+        client.stop()
+        server.stop()
@@ -0,0 +1,156 @@
+import logging
+import threading
+
+import pytest
+
+from blockchain.block import Block
+from blockchain.blockchain import Blockchain
+from blockchain.votes import VoteTracker
+from network.node import Node
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_quorum_fires_once_and_ignores_repeat_voters():
+    decided = []
+    tracker = VoteTracker(total_nodes=5, on_quorum=lambda vote_round: decided.append(vote_round.decision) or "done")
+
+    assert tracker.record(1, "h", "node2", "valid") == "pending"
+    assert tracker.record(1, "h", "node2", "valid") == "duplicate"
+    assert tracker.record(1, "h", "node3", "invalid") == "pending"
+    assert tracker.record(1, "h", "node4", "valid") == "pending"
+    assert tracker.record(1, "h", "node5", "valid") == "accepted"
+    assert tracker.record(1, "h", "node1", "valid") == "decided"
+
+    assert decided == ["accepted"]
+    assert tracker.get(1, "h").result == "done"
+
+
+def test_rounds_are_keyed_by_index_and_hash():
+    tracker = VoteTracker(total_nodes=3)
+    assert tracker.record(1, "a", "node2", "invalid") == "pending"
+    assert tracker.record(1, "b", "node2", "valid") == "pending"
+    assert tracker.record(1, "a", "node3", "invalid") == "rejected"
+    assert tracker.decision(1, "a") == "rejected"
+    assert tracker.decision(1, "b") is None
+
+
+def test_network_size_can_change():
+    peers = ["p1", "p2"]
+    tracker = VoteTracker(total_nodes=lambda: len(peers) + 1)
+    tracker.record(1, "h", "node2", "valid")
+    peers.extend(["p3", "p4"])
+    assert tracker.record(1, "h", "node3", "valid") == "pending"
+    assert tracker.record(1, "h", "node4", "valid") == "accepted"
+
+
+def test_stale_rounds_are_evicted():
+    clock = FakeClock()
+    tracker = VoteTracker(total_nodes=4, round_timeout=10, clock=clock)
+    tracker.record(1, "old", "node2", "valid")
+    clock.now = 5
+    tracker.record(2, "new", "node2", "valid")
+    clock.now = 12
+    assert tracker.evict_stale() == 1
+    assert tracker.get(1, "old") is None
+    assert tracker.get(2, "new") is not None
+
+
+def test_votes_after_a_decided_round_is_evicted_do_not_decide_it_again():
+    clock = FakeClock()
+    decided = []
+    tracker = VoteTracker(
+        total_nodes=3, on_quorum=decided.append, round_timeout=10, clock=clock, max_closed_rounds=2,
+    )
+    tracker.record(1, "h", "node2", "valid")
+    assert tracker.record(1, "h", "node3", "valid") == "accepted"
+    tracker.record(2, "open", "node2", "valid")
+
+    clock.now = 20
+    assert tracker.evict_stale() == 2
+    assert tracker.get(1, "h") is None
+    assert tracker.decision(1, "h") == "accepted"
+
+    # Late or replayed votes for the evicted round are refused, so the callback fires once.
+    assert tracker.record(1, "h", "node1", "valid") == "decided"
+    assert tracker.record(1, "h", "node2", "valid") == "decided"
+    assert tracker.record(1, "h", "node3", "valid") == "decided"
+    assert len(decided) == 1
+    assert len(tracker) == 0
+
+    # An undecided round is not remembered and can start over.
+    assert tracker.decision(2, "open") is None
+    assert tracker.record(2, "open", "node3", "valid") == "pending"
+
+    # Closed rounds are bounded: the least recently seen one is forgotten first.
+    for index in (3, 4):
+        tracker.record(index, "h", "node2", "valid")
+        tracker.record(index, "h", "node3", "valid")
+    clock.now = 40
+    tracker.evict_stale()
+    assert tracker.decision(1, "h") is None
+    assert tracker.decision(3, "h") == tracker.decision(4, "h") == "accepted"
+
+
+def test_unknown_status_rejected():
+    with pytest.raises(ValueError):
+        VoteTracker(total_nodes=3).record(1, "h", "node2", "maybe")
+
+
+def test_wait_for_decision_returns_after_quorum_callback():
+    committed = []
+    tracker = VoteTracker(total_nodes=3, on_quorum=lambda vote_round: committed.append(vote_round.block_hash))
+    assert tracker.wait_for_decision(1, "h", timeout=0.01) is None
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(tracker.wait_for_decision(1, "h", timeout=5)))
+    waiter.start()
+    tracker.record(1, "h", "node2", "valid")
+    tracker.record(1, "h", "node3", "valid")
+    waiter.join(5)
+
+    assert results[0].decision == "accepted"
+    assert committed == ["h"]
+
+
+def test_failing_quorum_callback_still_settles_the_round(caplog):
+    seen = []
+
+    def on_quorum(vote_round):
+        seen.append((vote_round.decided_at, vote_round.settled))
+        raise RuntimeError("disk full")
+
+    tracker = VoteTracker(total_nodes=3, on_quorum=on_quorum, logger=logging.getLogger("VotesTest"))
+    tracker.record(1, "h", "node2", "valid")
+    with caplog.at_level(logging.ERROR):
+        assert tracker.record(1, "h", "node3", "valid") == "accepted"
+
+    (decided_at, settled), = seen
+    assert decided_at is not None and not settled  # Decided before the callback ran
+    vote_round = tracker.wait_for_decision(1, "h", timeout=1)
+    assert vote_round.result == "error" and vote_round.settled
+    assert tracker.record(1, "h", "node1", "valid") == "decided"
+    assert "disk full" in caplog.text
+
+
+def test_proposal_arriving_after_the_quorum_callback_looked_for_it_is_committed():
+    blockchain = Blockchain(logger=logging.getLogger("VotesTest"))
+    node = Node("node1", blockchain, logger=logging.getLogger("VotesTest"))
+    block = Block(1, blockchain.chain[-1].hash, [{"id": "tx1", "data": "a"}], "0.5")
+
+    def callback_then_late_proposal(vote_round):
+        result = node._on_quorum(vote_round)  # No pending proposal yet
+        node.accept_proposal(block)  # Lands before the tracker stores the callback's result
+        return result
+
+    node.votes.on_quorum = callback_then_late_proposal
+    node.record_vote(1, block.hash, "node2", "valid")
+    assert blockchain.get_block_by_hash(block.hash) is block
+    node.accept_proposal(block)  # A repeated proposal does not commit twice
+    assert len(blockchain.chain) == 2
@@ -1,6 +1,8 @@
 import hashlib
 import os
-from cryptography.hazmat.primitives.asymmetric import rsa, padding
+import threading
+from collections import OrderedDict
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa, padding
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -26,10 +28,21 @@ def generate_rsa_keypair():
     public_key = private_key.public_key()
     return private_key, public_key
 
+def generate_ed25519_keypair():
+    """
+    Generate an Ed25519 public/private key pair. Ed25519 signs far faster than
+    RSA-2048 and its signatures are 64 bytes instead of 256; RSA verification
+    (e=65537) is cheap, so compare verification with benchmarks/bench_signatures.py.
+    :return: (private_key, public_key)
+    """
+    private_key = ed25519.Ed25519PrivateKey.generate()
+    public_key = private_key.public_key()
+    return private_key, public_key
+
 def serialize_private_key(private_key, password=None):
     """
     Serialize a private key with optional password encryption.
-    :param private_key: RSA private key
+    :param private_key: RSA or Ed25519 private key
     :param password: Password to encrypt the private key (optional)
     :return: Serialized private key as bytes
     """
@@ -47,7 +60,7 @@ def serialize_private_key(private_key, password=None):
 def serialize_public_key(public_key):
     """
     Serialize a public key.
-    :param public_key: RSA public key
+    :param public_key: RSA or Ed25519 public key
     :return: Serialized public key as bytes
     """
     return public_key.public_bytes(
@@ -60,7 +73,7 @@ def load_private_key(serialized_key, password=None):
     Load a private key from serialized bytes.
     :param serialized_key: Serialized private key bytes
     :param password: Password to decrypt the private key (optional)
-    :return: RSA private key
+    :return: RSA or Ed25519 private key
     """
     return serialization.load_pem_private_key(
         serialized_key, password=password.encode("utf-8") if password else None
@@ -70,20 +83,97 @@ def load_public_key(serialized_key):
     """
     Load a public key from serialized bytes.
     :param serialized_key: Serialized public key bytes
-    :return: RSA public key
+    :return: RSA or Ed25519 public key
     """
     return serialization.load_pem_public_key(serialized_key)
 
+class PublicKeyCache:
+    """
+    Bounded LRU of deserialized public keys, keyed by the `sha256_hash` fingerprint of
+    their serialized form. Repeat senders skip PEM parsing and key setup entirely.
+    """
+
+    def __init__(self, max_size=10_000):
+        """
+        :param max_size: Keys kept; the least recently used is evicted first
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._keys = OrderedDict()  # fingerprint -> public key
+        self._lock = threading.Lock()
+
+    def get(self, serialized_key):
+        """
+        :param serialized_key: PEM public key as bytes or string
+        :return: RSA or Ed25519 public key
+        """
+        if isinstance(serialized_key, str):
+            serialized_key = serialized_key.encode("utf-8")
+        fingerprint = sha256_hash(serialized_key)
+        with self._lock:
+            public_key = self._keys.get(fingerprint)
+            if public_key is not None:
+                self._keys.move_to_end(fingerprint)
+                self.hits += 1
+                return public_key
+            self.misses += 1
+
+        # Parse outside the lock; malformed keys raise and are never cached.
+        public_key = load_public_key(serialized_key)
+        with self._lock:
+            self._keys[fingerprint] = public_key
+            while len(self._keys) > self.max_size:
+                self._keys.popitem(last=False)
+                self.evictions += 1
+        return public_key
+
+    def stats(self):
+        """
+        :return: {"size", "hits", "misses", "evictions", "hit_rate"}
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._keys),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+    def clear(self):
+        """
+        Drop every cached key and reset the metrics.
+        """
+        with self._lock:
+            self._keys.clear()
+            self.hits = self.misses = self.evictions = 0
+
+public_key_cache = PublicKeyCache()  # Process-wide; each verification worker process has its own
+
+def load_public_key_cached(serialized_key, cache=None):
+    """
+    Load a public key, reusing the deserialized key for serialized keys seen before.
+    :param serialized_key: Serialized public key bytes (or string)
+    :param cache: PublicKeyCache to use (defaults to the process-wide `public_key_cache`)
+    :return: RSA or Ed25519 public key
+    """
+    return (cache if cache is not None else public_key_cache).get(serialized_key)
+
 # 3. Digital Signatures
 def sign_data(private_key, data):
     """
-    Sign data using a private key.
-    :param private_key: RSA private key
+    Sign data using a private key (RSA-PSS with SHA-256, or Ed25519).
+    :param private_key: RSA or Ed25519 private key
     :param data: Data to sign as bytes or string
     :return: Digital signature
     """
     if isinstance(data, str):
         data = data.encode("utf-8")
+    if isinstance(private_key, ed25519.Ed25519PrivateKey):
+        return private_key.sign(data)
     return private_key.sign(
         data,
         padding.PSS(
@@ -96,13 +186,16 @@ def sign_data(private_key, data):
 def verify_signature(public_key, data, signature):
     """
     Verify a digital signature.
-    :param public_key: RSA public key
+    :param public_key: RSA or Ed25519 public key
     :param data: Data that was signed
     :param signature: Digital signature to verify
     :return: True if the signature is valid, raises an exception otherwise
     """
     if isinstance(data, str):
         data = data.encode("utf-8")
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        public_key.verify(signature, data)
+        return True
     public_key.verify(
         signature,
         data,
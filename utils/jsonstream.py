@@ -0,0 +1,95 @@
+import codecs
+import json
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class JSONStreamError(ValueError):
+    """Raised when a streamed JSON body is malformed."""
+
+
+def iter_json_values(stream, chunk_size=65536, max_value_size=1 << 20):
+    """
+    Incrementally parse a JSON array or newline-delimited JSON from a byte stream.
+
+    Values are yielded as soon as they are complete, so memory use is bounded by
+    one chunk plus one value rather than by the size of the body.
+    :param stream: File-like object with a `read(size)` method returning bytes
+    :param chunk_size: Bytes read per call
+    :param max_value_size: Largest single value accepted, in characters
+    :return: Generator of decoded values
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    position = 0
+    exhausted = False
+    in_array = None  # Unknown until the first non-whitespace character
+    expect_separator = False
+    after_comma = False
+    closed = False
+
+    def fill():
+        nonlocal buffer, position, exhausted
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            exhausted = True
+            buffer = buffer[position:] + utf8.decode(b"", final=True)
+        else:
+            buffer = buffer[position:] + utf8.decode(chunk)
+        position = 0
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position == len(buffer):
+            if exhausted:
+                if in_array and not closed:
+                    raise JSONStreamError("Unterminated JSON array")
+                return
+            fill()
+            continue
+
+        char = buffer[position]
+        if closed:
+            raise JSONStreamError("Unexpected data after JSON array")
+        if in_array is None:
+            in_array = char == "["
+            if in_array:
+                position += 1
+                continue
+
+        if in_array:
+            if char == "]":
+                if after_comma:
+                    raise JSONStreamError("Trailing comma in JSON array")
+                position += 1
+                closed = True
+                continue
+            if expect_separator:
+                if char != ",":
+                    raise JSONStreamError(f"Expected ',' or ']' but found {char!r}")
+                position += 1
+                expect_separator = False
+                after_comma = True
+                continue
+
+        try:
+            value, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if exhausted:
+                raise JSONStreamError(f"Malformed JSON value: {e.msg}") from None
+            if len(buffer) - position > max_value_size:
+                raise JSONStreamError(f"JSON value larger than {max_value_size} characters") from None
+            fill()
+            continue
+
+        if end == len(buffer) and not exhausted:
+            # A number (or a value we cannot yet tell is complete) may continue in the next chunk.
+            fill()
+            continue
+
+        position = end
+        expect_separator = True
+        after_comma = False
+        yield value